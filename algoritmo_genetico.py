@@ -1,6 +1,14 @@
+import bisect
+import math
 import random
+import time
 import numpy as np
 import copy
+import os
+import janelas
+import metricas
+from checkpoint import assinatura_instancia, carregar_checkpoint, salvar_checkpoint
+from instancia import InstanciaVRP, como_instancia
 
 # --- Funções Auxiliares ---
 
@@ -19,66 +27,142 @@ def calcular_distancia(ponto1, ponto2):
     return np.sqrt((ponto1[0] - ponto2[0]) ** 2 + (ponto1[1] - ponto2[1]) ** 2)
 
 
+def _cortes_capacidade(cargas, cap_max):
+    """
+    Calcula onde cada veículo começa na sequência de cargas (divisão gulosa).
+
+    Cada rota começa com a entrega que não coube na anterior e segue enquanto
+    a carga acumulada não ultrapassa `cap_max`. Em vez de percorrer entrega
+    por entrega, o fim de cada rota é encontrado por busca binária na soma
+    acumulada (uma iteração por veículo).
+
+    Returns:
+        tuple: (inícios das rotas a partir da 2ª, primeira_vazia). `primeira_vazia`
+        indica que a 1ª entrega sozinha já excede a capacidade (rota [0, 0] antes dela).
+    """
+    n = len(cargas)
+    if n == 0:
+        return [], False
+    acumulado = np.cumsum(cargas, dtype=np.int64).tolist()
+    primeira_vazia = acumulado[0] > cap_max
+
+    cortes = []
+    inicio = 0
+    while True:
+        base = acumulado[inicio - 1] if inicio > 0 else 0
+        fim = max(bisect.bisect_right(acumulado, base + cap_max), inicio + 1)
+        if fim >= n:
+            return cortes, primeira_vazia
+        cortes.append(fim)
+        inicio = fim
+
+
+def _cortes(inst, posicoes, cap_max):
+    """
+    Divisão da sequência em rotas: só por capacidade (vetorizada) ou, se a
+    instância tiver janelas de tempo, por capacidade e horário.
+
+    Returns:
+        tuple: (cortes, primeira_vazia, atraso em minutos)
+    """
+    if inst.tem_janelas:
+        return janelas.cortes_janelas(inst, posicoes, cap_max)
+    cortes, primeira_vazia = _cortes_capacidade(inst.cargas[posicoes], cap_max)
+    return cortes, primeira_vazia, 0.0
+
+
 def separar_rotas_por_capacidade(cromossomo, pontos, cap_max):
     """
     Decodifica o cromossomo (sequência linear de IDs) em rotas reais,
     respeitando a capacidade máxima do veículo.
 
     Lógica: Adiciona pontos a um veículo até que ele esteja cheio,
-    então inicia um novo veículo (retorna ao depósito '0').
+    então inicia um novo veículo (retorna ao depósito '0'). Com janelas de
+    tempo, o veículo também volta quando a próxima entrega chegaria atrasada.
 
     Args:
         cromossomo (list): Lista de IDs representando a ordem de visita.
-        pontos (list): Lista de dicionários contendo os dados dos locais.
+        pontos (list | InstanciaVRP): Dados dos locais.
         cap_max (float): Capacidade máxima de carga de cada veículo.
 
     Returns:
         list: Lista de listas, onde cada sublista é uma rota válida (ex: [0, 1, 5, 0]).
     """
-    rotas_finais = []
-    # Inicia a primeira rota saindo do depósito (ID 0)
-    rota_atual = [0]
-    carga_atual = 0
-
-    for id_ponto in cromossomo:
-        # Busca o objeto ponto correspondente ao ID
-        ponto = next(p for p in pontos if p["id"] == id_ponto)
-        peso_entrega = ponto.get("carga", 0)
-
-        # Verifica se cabe no veículo atual
-        if carga_atual + peso_entrega > cap_max:
-            # Se não couber, finaliza a rota atual voltando ao depósito
-            rota_atual.append(0)
-            rotas_finais.append(rota_atual)
-
-            # Inicia nova rota com o ponto atual
-            rota_atual = [0, id_ponto]
-            carga_atual = peso_entrega
-        else:
-            # Se couber, adiciona o ponto à rota atual
-            rota_atual.append(id_ponto)
-            carga_atual += peso_entrega
-
-    # Finaliza a última rota pendente retornando ao depósito
-    rota_atual.append(0)
-    rotas_finais.append(rota_atual)
+    inst = como_instancia(pontos)
+    deposito = int(inst.ids[inst.deposito])
+    cortes, primeira_vazia, _ = _cortes(inst, inst.posicoes(cromossomo), cap_max)
+
+    genes = list(cromossomo)
+    limites = [0] + cortes + [len(genes)]
+    rotas_finais = [[deposito, deposito]] if primeira_vazia else []
+    for a, b in zip(limites, limites[1:]):
+        rotas_finais.append([deposito] + genes[a:b] + [deposito])
 
     return rotas_finais
 
 
-def aplicar_2opt(rota, pontos):
+def _custo_sequencia(inst, posicoes, cap_max):
+    """
+    Custo da solução dada pelas posições (índices nos arrays) das entregas.
+
+    As rotas são concatenadas em uma única sequência com o depósito entre
+    elas (depósito -> depósito tem distância zero), então o custo é uma
+    soma vetorizada sobre todas as arestas. Com janelas de tempo, soma-se a
+    penalidade do atraso que sobrar (entregas inalcançáveis mesmo sozinhas).
+    """
+    deposito = inst.deposito
+    cortes, _, atraso = _cortes(inst, posicoes, cap_max)
+    sequencia = np.concatenate(([deposito], np.insert(posicoes, cortes, deposito), [deposito]))
+
+    trechos = np.diff(inst.coords[sequencia], axis=0)
+    distancias = np.sqrt(trechos[:, 0] ** 2 + trechos[:, 1] ** 2)
+
+    # Regra de Negócio: Pontos críticos têm "desconto" virtual na distância
+    # para incentivar o algoritmo a priorizá-los em rotas mais curtas.
+    distancias[inst.criticos[sequencia[1:]]] *= 0.5
+    custo = float(distancias.sum())
+    if atraso > 0:
+        custo += janelas.penalidade(inst, atraso)
+    return custo
+
+
+def aplicar_2opt(rota, pontos, distancia=calcular_distancia):
     """
     Aplica a heurística de busca local 2-opt para otimizar uma única rota.
     O objetivo é remover cruzamentos no caminho trocando arestas.
+    O primeiro e o último ponto da rota permanecem fixos. Se a instância tiver
+    janelas de tempo, usa `janelas.aplicar_2opt_janelas`.
 
     Args:
         rota (list): Lista de IDs representando uma rota (ex: [0, 1, 5, 0]).
-        pontos (dict): Dicionário de pontos indexado por ID para acesso rápido.
+        pontos (dict | InstanciaVRP): Dicionário de pontos indexado por ID
+            (ou a instância em colunas).
+        distancia (callable): Custo de uma aresta entre duas coordenadas
+            (padrão: distância Euclidiana; deve ser simétrico).
 
     Returns:
         list: A rota otimizada.
     """
-    melhor_rota = rota[:]
+    if isinstance(pontos, InstanciaVRP) and pontos.tem_janelas and distancia is calcular_distancia:
+        # Com janelas, cada inversão também precisa manter os horários
+        return janelas.aplicar_2opt_janelas(rota, pontos)
+
+    if isinstance(pontos, InstanciaVRP):
+        coords = pontos.coords[pontos.posicoes(rota)]
+    else:
+        coords = np.array([pontos[pid]["coord"] for pid in rota], dtype=float).reshape(-1, 2)
+
+    # Custos de todas as arestas da rota calculados uma vez (matriz k x k).
+    # A Euclidiana padrão é vetorizada; custos personalizados usam a função.
+    if distancia is calcular_distancia:
+        delta = coords[:, None, :] - coords[None, :, :]
+        custo = np.sqrt(delta[..., 0] ** 2 + delta[..., 1] ** 2).tolist()
+    else:
+        pares = [tuple(c) for c in coords.tolist()]
+        custo = [[distancia(a, b) for b in pares] for a in pares]
+
+    # Trabalha com as posições na rota original (índices da matriz)
+    melhor_rota = list(range(len(rota)))
     otimizou = True
 
     while otimizou:
@@ -86,20 +170,12 @@ def aplicar_2opt(rota, pontos):
         # Itera sobre todos os pares de arestas possíveis na rota
         for i in range(1, len(melhor_rota) - 2):
             for j in range(i + 1, len(melhor_rota) - 1):
-                # Calcula a distância da configuração atual
-                ponto_i_minus = pontos[melhor_rota[i - 1]]["coord"]
-                ponto_i = pontos[melhor_rota[i]]["coord"]
-                ponto_j = pontos[melhor_rota[j]]["coord"]
-                ponto_j_plus = pontos[melhor_rota[j + 1]]["coord"]
-
-                d_atual = calcular_distancia(
-                    ponto_i_minus, ponto_i
-                ) + calcular_distancia(ponto_j, ponto_j_plus)
+                a, b = melhor_rota[i - 1], melhor_rota[i]
+                c, d = melhor_rota[j], melhor_rota[j + 1]
 
-                # Calcula a distância se trocarmos as conexões (cruzamento das arestas)
-                d_nova = calcular_distancia(
-                    ponto_i_minus, ponto_j
-                ) + calcular_distancia(ponto_i, ponto_j_plus)
+                # Distância da configuração atual x trocando as conexões
+                d_atual = custo[a][b] + custo[c][d]
+                d_nova = custo[a][c] + custo[b][d]
 
                 # Se a nova configuração for mais curta, aplica a inversão
                 if d_nova < d_atual:
@@ -107,7 +183,7 @@ def aplicar_2opt(rota, pontos):
                     melhor_rota[i : j + 1] = reversed(melhor_rota[i : j + 1])
                     otimizou = True
 
-    return melhor_rota
+    return [rota[k] for k in melhor_rota]
 
 
 def funcao_fitness_vrp(cromossomo, pontos, cap_max, custo_por_km=1):
@@ -116,65 +192,63 @@ def funcao_fitness_vrp(cromossomo, pontos, cap_max, custo_por_km=1):
 
     Args:
         cromossomo (list): Sequência de genes (IDs dos locais).
-        pontos (list): Dados dos locais.
+        pontos (list | InstanciaVRP): Dados dos locais.
         cap_max (float): Capacidade do veículo.
         custo_por_km (float): Multiplicador de custo.
 
     Returns:
         float: O custo total da solução (quanto menor, melhor).
     """
-    rotas = separar_rotas_por_capacidade(cromossomo, pontos, cap_max)
-    custo_total = 0
-
-    for rota in rotas:
-        dist_rota = 0
-        ponto_anterior = next(p for p in pontos if p["id"] == 0)
-
-        for id_ponto in rota:
-            ponto_atual = next(p for p in pontos if p["id"] == id_ponto)
-            dist_trecho = calcular_distancia(
-                ponto_anterior["coord"], ponto_atual["coord"]
-            )
+    inst = como_instancia(pontos)
+    return _custo_sequencia(inst, inst.posicoes(cromossomo), cap_max) * custo_por_km
 
-            # Regra de Negócio: Pontos críticos têm "desconto" virtual na distância
-            # para incentivar o algoritmo a priorizá-los em rotas mais curtas.
-            if ponto_atual.get("prioridade") == "crítica":
-                dist_trecho *= 0.5
 
-            dist_rota += dist_trecho
-            ponto_anterior = ponto_atual
-
-        custo_total += dist_rota
+def avaliar(individuo, pontos, cap_max, cache=None):
+    """
+    Calcula a fitness de um indivíduo, reaproveitando o resultado se ele já
+    estiver no cache (dicionário indexado pela tupla de genes).
+    """
+    if cache is None:
+        metricas.contar(metricas.AVALIACOES_FITNESS)
+        return funcao_fitness_vrp(individuo, pontos, cap_max)
 
-    return custo_total * custo_por_km
+    chave = tuple(individuo)
+    custo = cache.get(chave)
+    if custo is None:
+        metricas.contar(metricas.AVALIACOES_FITNESS)
+        custo = cache[chave] = funcao_fitness_vrp(individuo, pontos, cap_max)
+    else:
+        metricas.contar(metricas.ACERTOS_CACHE_FITNESS)
+    return custo
 
 
 # --- Operadores Genéticos ---
 
 
-def criar_individuo(lista_ids_locais):
+def criar_individuo(lista_ids_locais, rng=random, deposito=0):
     """
     Gera um indivíduo aleatório (permutação dos locais de entrega).
-    O depósito (ID 0) é excluído da permutação pois é fixo no início/fim.
+    O depósito (ID `deposito`) é excluído da permutação pois é fixo no início/fim.
     """
-    entregas = [x for x in lista_ids_locais if x != 0]
-    random.shuffle(entregas)
+    entregas = [x for x in lista_ids_locais if x != deposito]
+    rng.shuffle(entregas)
     return entregas
 
 
-def selecao_torneio(populacao, pontos, cap_veiculo, k=3):
+def selecao_torneio(populacao, pontos, cap_veiculo, k=3, cache=None, rng=random):
     """
     Seleciona o melhor indivíduo entre 'k' competidores escolhidos aleatoriamente.
     Preserva a diversidade genética.
+    Com `cache` (ver `avaliar`), os competidores já avaliados não são recalculados.
     """
-    competidores = random.sample(populacao, k)
+    competidores = rng.sample(populacao, k)
     # Retorna aquele que tiver o menor custo (função fitness)
     return min(
-        competidores, key=lambda ind: funcao_fitness_vrp(ind, pontos, cap_veiculo)
+        competidores, key=lambda ind: avaliar(ind, pontos, cap_veiculo, cache)
     )
 
 
-def crossover(pai1, pai2):
+def crossover(pai1, pai2, rng=random):
     """
     Realiza o Crossover de Ordem (Order Crossover - OX).
     Preserva a ordem relativa dos genes e evita duplicatas.
@@ -188,7 +262,7 @@ def crossover(pai1, pai2):
         return pai1
 
     # Define o segmento de corte
-    inicio, fim = sorted(random.sample(range(tamanho), 2))
+    inicio, fim = sorted(rng.sample(range(tamanho), 2))
 
     # Inicializa filho com marcadores
     filho = [-1] * tamanho
@@ -196,10 +270,12 @@ def crossover(pai1, pai2):
     # Herança do Pai 1 (cópia do segmento)
     filho[inicio:fim] = pai1[inicio:fim]
 
-    # Herança do Pai 2 (preenchimento circular)
+    # Herança do Pai 2 (preenchimento circular). Conjunto para a verificação
+    # de pertinência, em vez de percorrer o filho a cada gene (O(n²))
+    herdados = set(filho[inicio:fim])
     pos_atual = fim
     for gene in pai2:
-        if gene not in filho:
+        if gene not in herdados:
             if pos_atual >= tamanho:
                 pos_atual = 0
             filho[pos_atual] = gene
@@ -208,48 +284,309 @@ def crossover(pai1, pai2):
     return filho
 
 
-def mutacao(individuo, taxa_mutacao=0.2):
+def mutacao(individuo, taxa_mutacao=0.2, rng=random):
     """
     Mutação por troca (Swap Mutation).
     Troca dois genes de lugar aleatoriamente para introduzir diversidade.
     """
-    if random.random() < taxa_mutacao:
-        idx1, idx2 = random.sample(range(len(individuo)), 2)
+    if rng.random() < taxa_mutacao:
+        idx1, idx2 = rng.sample(range(len(individuo)), 2)
         individuo[idx1], individuo[idx2] = individuo[idx2], individuo[idx1]
     return individuo
 
 
-def executar_ga(pontos, cap_veiculo, geracoes=200, tam_populacao=50):
+# --- Operadores de Mutação (portfólio do modo adaptativo) ---
+# Aplicam-se sempre (a taxa é decidida por quem chama) e alteram o indivíduo.
+
+
+def mutacao_troca(individuo, rng=random):
+    """
+    Troca dois genes de lugar (a mesma de `mutacao`).
+    """
+    idx1, idx2 = rng.sample(range(len(individuo)), 2)
+    individuo[idx1], individuo[idx2] = individuo[idx2], individuo[idx1]
+    return individuo
+
+
+def mutacao_inversao(individuo, rng=random):
+    """
+    Inverte um trecho (equivale a um movimento 2-opt na sequência).
+    """
+    inicio, fim = sorted(rng.sample(range(len(individuo) + 1), 2))
+    individuo[inicio:fim] = individuo[inicio:fim][::-1]
+    return individuo
+
+
+def mutacao_insercao(individuo, rng=random):
+    """
+    Retira um gene e o reinsere em outra posição (move uma entrega de lugar).
+    """
+    origem, destino = rng.sample(range(len(individuo)), 2)
+    individuo.insert(destino, individuo.pop(origem))
+    return individuo
+
+
+def mutacao_embaralhamento(individuo, rng=random):
+    """
+    Embaralha os genes de um trecho (perturbação maior, para sair de ótimos locais).
+    """
+    inicio, fim = sorted(rng.sample(range(len(individuo) + 1), 2))
+    trecho = individuo[inicio:fim]
+    rng.shuffle(trecho)
+    individuo[inicio:fim] = trecho
+    return individuo
+
+
+OPERADORES_MUTACAO = {
+    "troca": mutacao_troca,
+    "inversao": mutacao_inversao,
+    "insercao": mutacao_insercao,
+    "embaralhamento": mutacao_embaralhamento,
+}
+
+
+# --- Controle Adaptativo ---
+# Faixa alvo de diversidade (fração das arestas que diferem do melhor indivíduo)
+DIVERSIDADE_MIN, DIVERSIDADE_MAX = 0.15, 0.5
+TAXA_MUTACAO_MIN, TAXA_MUTACAO_MAX = 0.05, 0.9
+
+
+class BanditOperadores:
+    """
+    Escolhe o operador de mutação por um multi-armed bandit (UCB1 descontado).
+
+    O crédito de um operador é a taxa de sucesso recente: recompensa 1 quando o
+    filho mutado fica melhor que o melhor dos pais, 0 caso contrário. Somas e
+    contagens são descontadas a cada geração, então operadores que funcionavam
+    no início e deixaram de funcionar perdem a preferência.
+    """
+
+    def __init__(self, nomes, exploracao=0.2, desconto=0.9):
+        self.nomes = list(nomes)
+        self.exploracao = exploracao
+        self.desconto = desconto
+        self.somas = [0.0] * len(self.nomes)
+        self.usos = [0.0] * len(self.nomes)
+
+    def escolher(self):
+        """
+        Índice do operador com maior sucesso estimado mais bônus de exploração
+        (operadores nunca usados vêm primeiro).
+        """
+        for i, usos in enumerate(self.usos):
+            if usos == 0:
+                return i
+        log_total = math.log(sum(self.usos))
+        valores = [
+            soma / usos + self.exploracao * math.sqrt(max(log_total, 0.0) / usos)
+            for soma, usos in zip(self.somas, self.usos)
+        ]
+        return valores.index(max(valores))
+
+    def recompensar(self, i, recompensa):
+        self.somas[i] += recompensa
+        self.usos[i] += 1
+
+    def descontar(self):
+        self.somas = [s * self.desconto for s in self.somas]
+        self.usos = [u * self.desconto for u in self.usos]
+
+    def estado(self):
+        return {"somas": self.somas, "usos": self.usos}
+
+    def restaurar(self, estado):
+        self.somas = list(estado["somas"])
+        self.usos = list(estado["usos"])
+
+
+def diversidade_populacao(populacao, referencia, pontos):
+    """
+    Distância média entre a população e a `referencia` (o melhor indivíduo):
+    fração das arestas de cada indivíduo (pares de entregas consecutivas, em
+    qualquer sentido) que não existem na referência. 0 = população convergida.
+    """
+    if len(referencia) < 2:
+        return 0.0
+    matriz = pontos.posicoes(populacao)
+    ref = pontos.posicoes(referencia)
+
+    sucessor = np.full(len(pontos), -1)
+    antecessor = np.full(len(pontos), -1)
+    sucessor[ref[:-1]] = ref[1:]
+    antecessor[ref[1:]] = ref[:-1]
+
+    a, b = matriz[:, :-1], matriz[:, 1:]
+    compartilhadas = (sucessor[a] == b) | (antecessor[a] == b)
+    return float(1.0 - compartilhadas.mean())
+
+
+def ajustar_parametros(diversidade, taxa_mutacao, tam_populacao):
+    """
+    Regra de ajuste do modo adaptativo, aplicada a cada geração.
+
+    - Diversidade abaixo da faixa alvo: aumenta a taxa de mutação (exploração);
+      acima: reduz (a recombinação já explora o suficiente).
+    - Elitismo proporcional à diversidade: população diversa preserva até 10%
+      dos melhores; convergida, só o melhor (evita dominar a população).
+
+    Returns:
+        tuple: (taxa_mutacao, qtd_elite)
+    """
+    if diversidade < DIVERSIDADE_MIN:
+        taxa_mutacao = min(TAXA_MUTACAO_MAX, taxa_mutacao * 1.25)
+    elif diversidade > DIVERSIDADE_MAX:
+        taxa_mutacao = max(TAXA_MUTACAO_MIN, taxa_mutacao * 0.8)
+
+    elite_max = max(1, tam_populacao // 10)
+    qtd_elite = 1 + round((elite_max - 1) * min(1.0, diversidade / DIVERSIDADE_MAX))
+    return taxa_mutacao, qtd_elite
+
+
+class ExecucaoInterrompida(Exception):
+    """
+    O GA foi interrompido a pedido (`interromper`) antes da última geração.
+    Se havia `checkpoint`, o estado foi salvo e a execução pode ser retomada.
+    """
+
+    def __init__(self, geracao):
+        super().__init__(f"Execução interrompida na geração {geracao}.")
+        self.geracao = geracao
+
+
+def executar_ga(
+    pontos,
+    cap_veiculo,
+    geracoes=200,
+    tam_populacao=50,
+    verbose=True,
+    semente=None,
+    checkpoint=None,
+    intervalo_checkpoint=10,
+    interromper=None,
+    adaptativo=False,
+    tempo_limite=None,
+):
     """
     Executa o Algoritmo Genético principal para o problema de roteamento.
 
     Args:
-        pontos (list): Lista de locais (incluindo depósito).
+        pontos (list | InstanciaVRP): Locais (incluindo depósito), como lista de
+            dicionários ou instância em colunas.
         cap_veiculo (float): Capacidade dos caminhões.
         geracoes (int): Número de iterações do algoritmo.
         tam_populacao (int): Tamanho da população por geração.
+        verbose (bool): Se False, suprime o log por geração (modo em lote).
+        semente (int): Semente do gerador aleatório, para execuções reproduzíveis
+            (sem semente, usa o gerador global do módulo `random`).
+        checkpoint (str): Arquivo '.npz' do checkpoint. Se já existir, a execução
+            é retomada dele (exatamente como se não tivesse parado); senão é
+            criado a cada `intervalo_checkpoint` gerações e ao final.
+        intervalo_checkpoint (int): Gerações entre dois checkpoints.
+        interromper (callable): Consultado a cada geração; se retornar True, salva
+            o checkpoint e lança `ExecucaoInterrompida`.
+        adaptativo (bool): Controle adaptativo: a mutação é escolhida entre
+            `OPERADORES_MUTACAO` por um bandit (`BanditOperadores`) e a taxa de
+            mutação e o elitismo seguem a diversidade da população
+            (`ajustar_parametros`). Sem ele, troca simples com taxa 0.2 e um elite.
+        tempo_limite (float): Orçamento em segundos; ao esgotar, encerra a evolução
+            antes de `geracoes` e segue para o pós-processamento.
 
     Returns:
         tuple: (rotas_otimizadas, historico_fitness)
     """
-    ids_locais = [p["id"] for p in pontos]
-
-    # Cria um dicionário para acesso O(1) no algoritmo 2-opt (performance)
-    dict_pontos = {p["id"]: p for p in pontos}
-
-    # 1. Inicialização da População
-    populacao = [criar_individuo(ids_locais) for _ in range(tam_populacao)]
-
-    melhor_global = None
-    melhor_fitness_global = float("inf")
-    historico_fitness = []
+    inicio = time.perf_counter()
+
+    # Gerador próprio da execução: com semente, outras execuções no mesmo
+    # processo não interferem na sequência (e o estado vai para o checkpoint)
+    rng = random.Random(semente) if semente is not None else random
+
+    # Representação em colunas construída uma única vez (arrays de coordenadas,
+    # cargas e prioridades); o restante do GA trabalha sobre ela
+    pontos = como_instancia(pontos)
+    ids_locais = pontos.ids.tolist()
+
+    parametros = None
+    if checkpoint:
+        parametros = {
+            "instancia": assinatura_instancia(pontos),
+            "cap_veiculo": cap_veiculo,
+            "tam_populacao": tam_populacao,
+            "adaptativo": adaptativo,
+        }
+
+    # Estado do controle adaptativo (também vai para o checkpoint)
+    operadores = list(OPERADORES_MUTACAO.values())
+    bandit = BanditOperadores(OPERADORES_MUTACAO)
+    taxa_mutacao, qtd_elite = 0.2, 1
+    proximo_cache = {}  # Custos já conhecidos da próxima geração (modo adaptativo: elites e filhos)
+
+    if checkpoint and os.path.exists(checkpoint):
+        # Retomada: população, melhor solução, histórico e RNG do ponto salvo
+        estado = carregar_checkpoint(checkpoint, parametros)
+        geracao_inicial = estado["geracao"]
+        populacao = estado["populacao"]
+        melhor_global = estado["melhor_global"]
+        melhor_fitness_global = estado["melhor_fitness"]
+        historico_fitness = estado["historico"]
+        rng.setstate(estado["rng"])
+        if adaptativo:
+            controle = estado["controle"]
+            taxa_mutacao = controle["taxa_mutacao"]
+            bandit.restaurar(controle["bandit"])
+        if verbose:
+            print(f"[INFO] Retomando do checkpoint '{checkpoint}' na geração {geracao_inicial}.")
+    else:
+        geracao_inicial = 0
+        # 1. Inicialização da População
+        id_deposito = ids_locais[pontos.deposito]
+        populacao = [criar_individuo(ids_locais, rng, id_deposito) for _ in range(tam_populacao)]
+
+        melhor_global = None
+        melhor_fitness_global = float("inf")
+        historico_fitness = []
+
+    def salvar(geracao):
+        # Estado no início da geração `geracao` (antes da avaliação)
+        with metricas.fase("checkpoint"):
+            salvar_checkpoint(
+                checkpoint,
+                {
+                    "geracao": geracao,
+                    "populacao": populacao,
+                    "melhor_global": melhor_global,
+                    "melhor_fitness": melhor_fitness_global,
+                    "historico": historico_fitness,
+                    "rng": rng.getstate(),
+                    "parametros": parametros,
+                    "controle": {
+                        "taxa_mutacao": taxa_mutacao,
+                        "bandit": bandit.estado(),
+                    }
+                    if adaptativo
+                    else None,
+                },
+            )
 
     # Loop Principal (Evolução)
-    for g in range(geracoes):
-        # Avaliação de toda a população
-        scores = [
-            (ind, funcao_fitness_vrp(ind, pontos, cap_veiculo)) for ind in populacao
-        ]
+    for g in range(geracao_inicial, geracoes):
+        if interromper is not None and interromper():
+            if checkpoint:
+                salvar(g)
+            raise ExecucaoInterrompida(g)
+        if checkpoint and g > geracao_inicial and g % intervalo_checkpoint == 0:
+            salvar(g)
+        if tempo_limite is not None and g > geracao_inicial:
+            if time.perf_counter() - inicio >= tempo_limite:
+                break
+
+        # Avaliação de toda a população. O cache vale só para a geração atual
+        # (mais o melhor global, que sempre sobrevive), o que limita a memória.
+        cache = proximo_cache
+        if melhor_global is not None:
+            cache[tuple(melhor_global)] = melhor_fitness_global
+
+        with metricas.fase("avaliacao"):
+            scores = [(ind, avaliar(ind, pontos, cap_veiculo, cache)) for ind in populacao]
         # Ordena do melhor (menor custo) para o pior
         scores.sort(key=lambda x: x[1])
 
@@ -262,28 +599,79 @@ def executar_ga(pontos, cap_veiculo, geracoes=200, tam_populacao=50):
 
         # Conversão aproximada para KM (assumindo coordenadas geográficas lat/lon)
         # Nota: 111.139 km é aprox. 1 grau de latitude.
-        distancia_km = melhor_fitness_global * 111.139
-        print(
-            f"[Geração {g:03}] Melhor Rota: {distancia_km:.2f} km (Custo Técnico: {melhor_fitness_global:.4f})"
-        )
+        if verbose:
+            distancia_km = melhor_fitness_global * 111.139
+            print(
+                f"[Geração {g:03}] Melhor Rota: {distancia_km:.2f} km (Custo Técnico: {melhor_fitness_global:.4f})"
+            )
+
+        if adaptativo:
+            with metricas.fase("adaptacao"):
+                diversidade = diversidade_populacao(populacao, melhor_global, pontos)
+                taxa_mutacao, qtd_elite = ajustar_parametros(
+                    diversidade, taxa_mutacao, tam_populacao
+                )
+                bandit.descontar()
+            if verbose:
+                print(
+                    f"            diversidade {diversidade:.2f} | mutação {taxa_mutacao:.2f} "
+                    f"| elite {qtd_elite}"
+                )
 
         # Reprodução
         nova_populacao = [melhor_global]  # Mantém o melhor (Elitismo)
+        proximo_cache = {}
+        if qtd_elite > 1:
+            vistos = {tuple(melhor_global)}
+            for ind, custo in scores:
+                if len(nova_populacao) >= qtd_elite:
+                    break
+                if tuple(ind) not in vistos:
+                    vistos.add(tuple(ind))
+                    nova_populacao.append(ind)
+                    proximo_cache[tuple(ind)] = custo
+
         while len(nova_populacao) < tam_populacao:
-            pai1 = selecao_torneio(populacao, pontos, cap_veiculo)
-            pai2 = selecao_torneio(populacao, pontos, cap_veiculo)
-            filho = mutacao(crossover(pai1, pai2))
+            with metricas.fase("selecao"):
+                pai1 = selecao_torneio(populacao, pontos, cap_veiculo, cache=cache, rng=rng)
+                pai2 = selecao_torneio(populacao, pontos, cap_veiculo, cache=cache, rng=rng)
+            if not adaptativo:
+                with metricas.fase("crossover_mutacao"):
+                    filho = mutacao(crossover(pai1, pai2, rng), rng=rng)
+                nova_populacao.append(filho)
+                continue
+
+            with metricas.fase("crossover_mutacao"):
+                filho = crossover(pai1, pai2, rng)
+                operador = None
+                if rng.random() < taxa_mutacao:
+                    operador = bandit.escolher()
+                    operadores[operador](filho, rng)
+            # O filho é avaliado já aqui (e não na próxima geração) para creditar o operador
+            with metricas.fase("avaliacao"):
+                custo = avaliar(filho, pontos, cap_veiculo, proximo_cache)
+            if operador is not None:
+                referencia = min(cache[tuple(pai1)], cache[tuple(pai2)])
+                bandit.recompensar(operador, 1.0 if custo < referencia else 0.0)
             nova_populacao.append(filho)
 
         populacao = nova_populacao
 
+    # Checkpoint final (o histórico tem uma entrada por geração concluída):
+    # retomar uma execução concluída só refaz o pós-processamento
+    if checkpoint and geracao_inicial < len(historico_fitness):
+        salvar(len(historico_fitness))
+
     # Pós-processamento: Refinamento Local
-    print("\n[INFO] Aplicando Busca Local 2-opt para refinamento final...")
+    if verbose:
+        print("\n[INFO] Aplicando Busca Local 2-opt para refinamento final...")
 
     # Transforma o melhor cromossomo em rotas separadas
-    rotas_finais = separar_rotas_por_capacidade(melhor_global, pontos, cap_veiculo)
+    with metricas.fase("divisao"):
+        rotas_finais = separar_rotas_por_capacidade(melhor_global, pontos, cap_veiculo)
 
     # Aplica 2-opt em cada rota individualmente
-    rotas_otimizadas = [aplicar_2opt(r, dict_pontos) for r in rotas_finais]
+    with metricas.fase("2opt"):
+        rotas_otimizadas = [aplicar_2opt(r, pontos) for r in rotas_finais]
 
     return rotas_otimizadas, historico_fitness
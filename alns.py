@@ -0,0 +1,485 @@
+import math
+import random
+import time
+
+import numpy as np
+
+import algoritmo_genetico as ag
+import janelas
+import metricas
+from instancia import como_instancia
+
+# --- Parâmetros do ALNS (Ropke & Pisinger, 2006) ---
+SEGMENTO = 100  # Iterações entre atualizações dos pesos (e pontos do histórico)
+REACAO = 0.1  # Quanto os pesos seguem o desempenho do último segmento
+# Pontuação do operador: novo melhor global, melhora da atual, piora aceita
+PONTOS_MELHOR, PONTOS_MELHORA, PONTOS_ACEITA = 33, 9, 13
+ALEATORIEDADE = 3  # Expoente p da escolha enviesada (remoção pior/relacionada)
+# Temperatura inicial: aceita com 50% uma solução 5% pior que a inicial;
+# ao final do orçamento, a temperatura chega a 1/1000 da inicial
+PIORA_INICIAL, TEMPERATURA_FINAL = 0.05, 1e-3
+# Teto de entregas removidas por iteração (Ropke & Pisinger usam min(100, ξn)):
+# sem ele, uma única iteração em instâncias grandes custa O(q²·n)
+REMOCAO_MAXIMA = 100
+# Maior instância aceita (locais, com o depósito): `_Problema` guarda matrizes
+# densas n x n de distância, custo e tempo (~72 MB cada com 3000 locais)
+MAXIMO_LOCAIS = 3000
+
+
+class _TempoEsgotado(Exception):
+    """
+    O prazo do ALNS passou no meio de uma iteração (a candidata é descartada).
+    """
+
+
+class _Problema:
+    """
+    Dados do problema em arrays: matriz de custo dos arcos (assimétrica: a
+    chegada a um ponto crítico vale metade, a mesma regra do fitness do GA),
+    cargas e capacidade. As rotas são listas de posições nos arrays, sem o depósito.
+    Com janelas de tempo, guarda também a matriz de tempos de viagem.
+    """
+
+    def __init__(self, inst, cap_veiculo):
+        self.inst = inst
+        self.deposito = inst.deposito
+        self.cap = cap_veiculo
+        self.cargas = inst.cargas.astype(np.int64)
+        self.prazo = None  # Instante (perf_counter) em que o orçamento acaba
+
+        trechos = inst.coords[:, None, :] - inst.coords[None, :, :]
+        self.distancias = np.sqrt((trechos**2).sum(axis=2))
+        pesos = np.where(inst.criticos, 0.5, 1.0)
+        self.custo = self.distancias * pesos[None, :]
+        self.tempo = self.distancias * inst.tempo_por_distancia if inst.tem_janelas else None
+        self._folgas = {}  # Horários por rota (tupla de posições), reaproveitados entre chamadas
+
+        # Normalizações da medida de relação (remoção relacionada)
+        self.dist_max = float(self.distancias.max()) or 1.0
+        self.carga_max = float(self.cargas.max()) or 1.0
+
+    def verificar_prazo(self):
+        if self.prazo is not None and time.perf_counter() >= self.prazo:
+            raise _TempoEsgotado
+
+    def arestas(self, rotas):
+        """
+        Todas as arestas da solução em arrays (origem, destino, rota), com as
+        arestas de cada rota contíguas e na ordem do percurso.
+        """
+        origens, destinos, indices = [], [], []
+        for r, rota in enumerate(rotas):
+            caminho = [self.deposito] + rota + [self.deposito]
+            origens.extend(caminho[:-1])
+            destinos.extend(caminho[1:])
+            indices.extend([r] * (len(rota) + 1))
+        return np.array(origens), np.array(destinos), np.array(indices)
+
+    def custo_total(self, rotas):
+        if not rotas:
+            return 0.0
+        a, b, _ = self.arestas(rotas)
+        return float(self.custo[a, b].sum())
+
+    def custos_insercao(self, rotas, cargas_rotas, livres):
+        """
+        Custo de inserir cada ponto livre em cada aresta (matriz arestas x livres),
+        infinito onde a capacidade da rota não comporta a carga ou onde a
+        inserção violaria uma janela de tempo (ver `_viola_janelas`).
+
+        Returns:
+            tuple: (delta, arestas) com `arestas` = (origens, destinos, rotas).
+        """
+        a, b, r = self.arestas(rotas)
+        delta = (
+            self.custo[np.ix_(a, livres)]
+            + self.custo[np.ix_(livres, b)].T
+            - self.custo[a, b][:, None]
+        )
+        excede = np.asarray(cargas_rotas)[r][:, None] + self.cargas[livres][None, :] > self.cap
+        delta[excede] = np.inf
+        if self.tempo is not None:
+            delta[self._viola_janelas(rotas, a, b, livres)] = np.inf
+        return delta, (a, b, r)
+
+    def _viola_janelas(self, rotas, a, b, livres):
+        """
+        Máscara (arestas x livres) das inserções que violam alguma janela.
+
+        Com a saída de cada origem, o início do serviço em cada destino e a
+        folga dele (`janelas.folgas`), cada par é testado em O(1), de forma
+        vetorizada: o ponto inserido precisa começar antes do fim da sua
+        janela, e o atraso que ele causa no destino não pode passar da folga.
+        """
+        # Só as rotas que mudaram desde a última chamada são recalculadas
+        anteriores, self._folgas = self._folgas, {}
+        saidas, inicios, folgas = [], [], []
+        for rota in rotas:
+            chave = tuple(rota)
+            dados = anteriores.get(chave)
+            if dados is None:
+                dados = janelas.folgas(self.inst, rota, self.tempo)
+            self._folgas[chave] = dados
+            s, i, f = dados
+            saidas.extend(s)
+            inicios.extend(i)
+            folgas.extend(f)
+        inst = self.inst
+        inicio_livre = np.maximum(
+            np.array(saidas)[:, None] + self.tempo[np.ix_(a, livres)],
+            inst.janelas_inicio[livres][None, :],
+        )
+        chegada_destino = (
+            inicio_livre
+            + inst.tempos_servico[livres][None, :]
+            + self.tempo[np.ix_(livres, b)].T
+        )
+        atraso_destino = (
+            np.maximum(chegada_destino, inst.janelas_inicio[b][:, None])
+            - np.array(inicios)[:, None]
+        )
+        return (inicio_livre > inst.janelas_fim[livres][None, :]) | (
+            atraso_destino > np.array(folgas)[:, None]
+        )
+
+    def custo_nova_rota(self, livres):
+        d = self.deposito
+        return self.custo[d, livres] + self.custo[livres, d]
+
+
+def _inserir(rotas, cargas_rotas, arestas, aresta, ponto, carga):
+    """
+    Insere `ponto` na aresta de índice `aresta` (ou em uma rota nova se None).
+    """
+    if aresta is None:
+        rotas.append([ponto])
+        cargas_rotas.append(carga)
+        return
+    _, _, r = arestas
+    r = int(r[aresta])
+    # Posição na rota: arestas da rota são contíguas e a primeira sai do depósito
+    primeira = int(np.searchsorted(arestas[2], r))
+    rotas[r].insert(aresta - primeira, ponto)
+    cargas_rotas[r] += carga
+
+
+def _escolha_enviesada(rng, n):
+    """
+    Índice em [0, n) que favorece os primeiros (y^p * n, como no ALNS original).
+    """
+    return int(rng.random() ** ALEATORIEDADE * n)
+
+
+# --- Operadores de Remoção (destroy) ---
+
+
+def remocao_aleatoria(prob, rotas, q, rng):
+    """
+    Remove `q` entregas sorteadas.
+    """
+    atribuidos = [p for rota in rotas for p in rota]
+    removidos = rng.sample(atribuidos, min(q, len(atribuidos)))
+    conjunto = set(removidos)
+    novas = [[p for p in rota if p not in conjunto] for rota in rotas]
+    return [r for r in novas if r], removidos
+
+
+def remocao_pior(prob, rotas, q, rng):
+    """
+    Remove, uma a uma, as entregas que mais encarecem a solução (custo das
+    arestas de chegada e saída menos o atalho entre os vizinhos), com sorteio
+    enviesado para não remover sempre as mesmas.
+    """
+    rotas = [list(r) for r in rotas]
+    removidos = []
+    for _ in range(q):
+        prob.verificar_prazo()
+        pontos, anteriores, seguintes, onde = [], [], [], []
+        for r, rota in enumerate(rotas):
+            caminho = [prob.deposito] + rota + [prob.deposito]
+            pontos.extend(rota)
+            anteriores.extend(caminho[:-2])
+            seguintes.extend(caminho[2:])
+            onde.extend((r, i) for i in range(len(rota)))
+        if not pontos:
+            break
+        v, a, b = np.array(pontos), np.array(anteriores), np.array(seguintes)
+        ganho = prob.custo[a, v] + prob.custo[v, b] - prob.custo[a, b]
+        ordem = np.argsort(-ganho, kind="stable")
+        r, i = onde[ordem[_escolha_enviesada(rng, len(ordem))]]
+        removidos.append(rotas[r].pop(i))
+        if not rotas[r]:
+            rotas.pop(r)
+    return rotas, removidos
+
+
+def remocao_relacionada(prob, rotas, q, rng):
+    """
+    Remove entregas parecidas entre si (próximas e com carga semelhante),
+    que tendem a trocar de lugar com proveito na reinserção (Shaw).
+    """
+    atribuidos = [p for rota in rotas for p in rota]
+    q = min(q, len(atribuidos))
+    removidos = [rng.choice(atribuidos)]
+    restantes = np.array([p for p in atribuidos if p != removidos[0]])
+    while len(removidos) < q:
+        referencia = rng.choice(removidos)
+        relacao = (
+            prob.distancias[referencia, restantes] / prob.dist_max
+            + np.abs(prob.cargas[referencia] - prob.cargas[restantes]) / prob.carga_max
+        )
+        ordem = np.argsort(relacao, kind="stable")
+        k = ordem[_escolha_enviesada(rng, len(ordem))]
+        removidos.append(int(restantes[k]))
+        restantes = np.delete(restantes, k)
+
+    conjunto = set(removidos)
+    novas = [[p for p in rota if p not in conjunto] for rota in rotas]
+    return [r for r in novas if r], removidos
+
+
+# --- Operadores de Reinserção (repair) ---
+
+
+def insercao_gulosa(prob, rotas, livres, rng):
+    """
+    Insere, a cada passo, a entrega livre com a inserção mais barata de todas.
+    """
+    return _reinserir(prob, rotas, livres, regret=1)
+
+
+def insercao_arrependimento(k):
+    """
+    Inserção por arrependimento (regret-k): insere primeiro a entrega que mais
+    perderia se não fosse para a sua melhor rota agora (soma das diferenças
+    entre a melhor inserção e as k-1 seguintes, cada uma em uma rota diferente).
+    """
+
+    def operador(prob, rotas, livres, rng):
+        return _reinserir(prob, rotas, livres, regret=k)
+
+    operador.__name__ = f"insercao_arrependimento_{k}"
+    return operador
+
+
+def _reinserir(prob, rotas, livres, regret):
+    rotas = [list(r) for r in rotas]
+    cargas_rotas = [int(prob.cargas[r].sum()) for r in rotas]
+    livres = list(livres)
+
+    while livres:
+        prob.verificar_prazo()
+        livres_arr = np.array(livres)
+        nova_rota = prob.custo_nova_rota(livres_arr)
+        if rotas:
+            delta, arestas = prob.custos_insercao(rotas, cargas_rotas, livres_arr)
+            melhor_aresta = delta.argmin(axis=0)
+            melhor_custo = delta[melhor_aresta, np.arange(len(livres))]
+        else:
+            delta, arestas = None, None
+            melhor_custo = np.full(len(livres), np.inf)
+
+        usar_nova = nova_rota < melhor_custo
+        custo_escolhido = np.where(usar_nova, nova_rota, melhor_custo)
+
+        if regret <= 1 or not rotas:
+            j = int(custo_escolhido.argmin())
+        else:
+            # Melhor custo por rota (arestas de cada rota são contíguas) + rota nova
+            inicios = np.flatnonzero(np.r_[True, arestas[2][1:] != arestas[2][:-1]])
+            por_rota = np.vstack((np.minimum.reduceat(delta, inicios, axis=0), nova_rota))
+            k = min(regret, len(por_rota))
+            menores = np.sort(np.partition(por_rota, k - 1, axis=0)[:k], axis=0)
+            # Quem só cabe em uma rota (demais infinitas) tem arrependimento infinito
+            # e vai primeiro; em empate, a inserção mais barata
+            arrependimento = (menores[1:] - menores[0]).sum(axis=0)
+            j = int(np.lexsort((custo_escolhido, -arrependimento))[0])
+
+        ponto = livres.pop(j)
+        aresta = None if usar_nova[j] else int(melhor_aresta[j])
+        _inserir(rotas, cargas_rotas, arestas, aresta, ponto, int(prob.cargas[ponto]))
+
+    return rotas
+
+
+OPERADORES_REMOCAO = {
+    "aleatoria": remocao_aleatoria,
+    "pior": remocao_pior,
+    "relacionada": remocao_relacionada,
+}
+
+OPERADORES_INSERCAO = {
+    "gulosa": insercao_gulosa,
+    "arrependimento_2": insercao_arrependimento(2),
+    "arrependimento_3": insercao_arrependimento(3),
+}
+
+
+def _roleta(rng, pesos):
+    alvo = rng.random() * sum(pesos)
+    acumulado = 0.0
+    for i, peso in enumerate(pesos):
+        acumulado += peso
+        if alvo < acumulado:
+            return i
+    return len(pesos) - 1
+
+
+def _solucao_inicial(prob, entregas, cap_veiculo):
+    """
+    Solução inicial barata: ordem do vizinho mais próximo a partir do depósito,
+    dividida em rotas como o cromossomo do GA (capacidade e, se houver, janelas).
+    O(n²) no total, em vez de O(n³) da inserção gulosa a partir do zero.
+    """
+    livres = np.ones(len(prob.distancias), dtype=bool)
+    livres[prob.deposito] = False
+    atual, ordem = prob.deposito, []
+    for _ in entregas:
+        atual = int(np.where(livres, prob.distancias[atual], np.inf).argmin())
+        livres[atual] = False
+        ordem.append(atual)
+
+    cortes, _, _ = ag._cortes(prob.inst, np.array(ordem), cap_veiculo)
+    limites = [0] + cortes + [len(ordem)]
+    return [ordem[a:b] for a, b in zip(limites, limites[1:])]
+
+
+def executar_alns(
+    pontos,
+    cap_veiculo,
+    tempo_limite=10.0,
+    iteracoes=None,
+    semente=None,
+    verbose=True,
+    remocao_min=0.05,
+    remocao_max=0.3,
+):
+    """
+    Adaptive Large Neighborhood Search para o VRP com capacidade.
+
+    A cada iteração, um operador de remoção retira parte das entregas da
+    solução atual e um de reinserção as devolve. A nova solução é aceita pelo
+    critério do recozimento simulado (Simulated Annealing) e os operadores são
+    sorteados por roleta com pesos que se adaptam ao sucesso recente.
+
+    O objetivo é o mesmo do GA (distância com o desconto dos pontos críticos)
+    e a capacidade é respeitada sempre (entregas maiores que a capacidade
+    seguem sozinhas em um veículo). A matriz de custos é pré-calculada
+    (memória O(n²)), então o ALNS é indicado para instâncias pequenas e médias.
+
+    Args:
+        pontos (list | InstanciaVRP): Locais (incluindo depósito).
+        cap_veiculo (float): Capacidade dos caminhões.
+        tempo_limite (float): Orçamento em segundos, incluindo a construção
+            inicial (None: limitado só por `iteracoes`). O prazo também é
+            conferido dentro das remoções e reinserções, então uma iteração
+            longa não o ultrapassa.
+        iteracoes (int): Máximo de iterações (None: até acabar o tempo). Sem
+            `tempo_limite`, o resfriamento segue as iterações e o resultado é
+            reproduzível com `semente`.
+        semente (int): Semente de um gerador próprio (None: módulo `random`).
+        verbose (bool): Se False, suprime o log por segmento.
+        remocao_min, remocao_max (float): Fração das entregas removida por
+            iteração (no máximo `REMOCAO_MAXIMA`).
+
+    Returns:
+        tuple: (rotas, historico). `historico` tem o melhor custo a cada
+        `SEGMENTO` iterações e termina no custo final.
+    """
+    if tempo_limite is None and iteracoes is None:
+        raise ValueError("Informe tempo_limite e/ou iteracoes para o ALNS.")
+
+    inicio = time.perf_counter()
+    rng = random.Random(semente) if semente is not None else random
+    inst = como_instancia(pontos)
+    id_deposito = int(inst.ids[inst.deposito])
+
+    def para_ids(rotas):
+        ids = inst.ids
+        return [[id_deposito] + ids[rota].tolist() + [id_deposito] for rota in rotas]
+
+    with metricas.fase("alns_construcao"):
+        prob = _Problema(inst, cap_veiculo)
+        entregas = [k for k in range(len(inst)) if k != inst.deposito]
+        atual = _solucao_inicial(prob, entregas, cap_veiculo)
+    custo_atual = prob.custo_total(atual)
+    melhor, custo_melhor = atual, custo_atual
+    historico = [custo_melhor]
+    if not entregas:
+        return para_ids(melhor), historico
+
+    remocoes = list(OPERADORES_REMOCAO.values())
+    insercoes = list(OPERADORES_INSERCAO.values())
+    pesos_r, pesos_i = [1.0] * len(remocoes), [1.0] * len(insercoes)
+    pontos_r, pontos_i = [0.0] * len(remocoes), [0.0] * len(insercoes)
+    usos_r, usos_i = [0] * len(remocoes), [0] * len(insercoes)
+
+    n = len(entregas)
+    q_max = max(1, min(int(remocao_max * n), REMOCAO_MAXIMA))
+    q_min = max(1, min(int(remocao_min * n), q_max))
+    temperatura_inicial = -PIORA_INICIAL * custo_atual / math.log(0.5) or 1e-9
+
+    if tempo_limite is not None:
+        prob.prazo = inicio + tempo_limite
+
+    iteracao = 0
+    while True:
+        decorrido = time.perf_counter() - inicio
+        progresso = 0.0
+        if tempo_limite is not None:
+            if decorrido >= tempo_limite:
+                break
+            progresso = decorrido / tempo_limite
+        if iteracoes is not None:
+            if iteracao >= iteracoes:
+                break
+            if tempo_limite is None:
+                progresso = iteracao / iteracoes
+        temperatura = temperatura_inicial * TEMPERATURA_FINAL**progresso
+
+        r = _roleta(rng, pesos_r)
+        i = _roleta(rng, pesos_i)
+        q = rng.randint(q_min, q_max)
+        try:
+            with metricas.fase("alns_iteracao"):
+                parcial, removidos = remocoes[r](prob, atual, q, rng)
+                candidata = insercoes[i](prob, parcial, removidos, rng)
+        except _TempoEsgotado:
+            break
+        custo = prob.custo_total(candidata)
+
+        premio = 0
+        if custo < custo_atual - 1e-12 or rng.random() < math.exp(
+            -(custo - custo_atual) / temperatura
+        ):
+            if custo < custo_melhor - 1e-12:
+                melhor, custo_melhor = candidata, custo
+                premio = PONTOS_MELHOR
+            elif custo < custo_atual - 1e-12:
+                premio = PONTOS_MELHORA
+            else:
+                premio = PONTOS_ACEITA
+            atual, custo_atual = candidata, custo
+
+        pontos_r[r] += premio
+        pontos_i[i] += premio
+        usos_r[r] += 1
+        usos_i[i] += 1
+        iteracao += 1
+
+        if iteracao % SEGMENTO == 0:
+            for pesos, pontuacao, usos in ((pesos_r, pontos_r, usos_r), (pesos_i, pontos_i, usos_i)):
+                for k in range(len(pesos)):
+                    if usos[k]:
+                        pesos[k] = (1 - REACAO) * pesos[k] + REACAO * pontuacao[k] / usos[k]
+                    pontuacao[k], usos[k] = 0.0, 0
+            historico.append(custo_melhor)
+            if verbose:
+                print(
+                    f"[ALNS {iteracao:06}] Melhor Rota: {custo_melhor * 111.139:.2f} km "
+                    f"(Custo Técnico: {custo_melhor:.4f}) | T {temperatura:.2e}"
+                )
+
+    if historico[-1] != custo_melhor:
+        historico.append(custo_melhor)
+    return para_ids(melhor), historico
@@ -1,18 +1,128 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import FileResponse, PlainTextResponse
+from starlette.routing import Match
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
-import algoritmo_genetico as ag
 import ia_relatorios as ia
+from instancia import InstanciaVRP
+import metricas
+import os
+import perfilamento
+import solvers
+import tarefas
+import time
+from contextlib import asynccontextmanager
+import functools
 import uvicorn
 
 # --- INICIALIZAÇÃO DA API ---
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    """
+    Inicia a fila de tarefas longas (retomando as que não terminaram) e, no
+    desligamento, salva o checkpoint da tarefa em execução.
+    """
+    GERENCIADOR_TAREFAS.iniciar()
+    yield
+    GERENCIADOR_TAREFAS.parar()
+
+
 app = FastAPI(
     title="Smart Medical Logistics API",
     description="API para otimização de rotas hospitalares e análise via Inteligência Artificial.",
     version="2.0",
+    lifespan=ciclo_de_vida,
 )
 
+# Liga os cronômetros de fase e contadores do solver (expostos em /metrics)
+metricas.habilitar()
+
+
+@functools.lru_cache(maxsize=1024)
+def resolver_rota(metodo, raiz, caminho):
+    """
+    Caminho da rota que atende a requisição (ex: '/tarefas/{id_tarefa}'), ou
+    'desconhecido'. Fica em cache para não percorrer `app.routes` a cada requisição.
+    """
+    escopo = {"type": "http", "method": metodo, "root_path": raiz, "path": caminho}
+    return next(
+        (r.path for r in app.routes if r.matches(escopo)[0] == Match.FULL),
+        "desconhecido",
+    )
+
+
+@app.middleware("http")
+async def medir_requisicoes(request: Request, call_next):
+    """
+    Registra a latência de cada requisição e quantas estão em andamento.
+    O endpoint é identificado pelo caminho da rota (ex: '/otimizar'), não pela URL,
+    para não criar uma série por URL desconhecida.
+    """
+    rota = resolver_rota(
+        request.method, request.scope.get("root_path", ""), request.scope["path"]
+    )
+    metricas.REQUISICOES_EM_ANDAMENTO.somar(rota)
+    inicio = time.perf_counter()
+    status = 500
+    try:
+        resposta = await call_next(request)
+        status = resposta.status_code
+        return resposta
+    finally:
+        metricas.REQUISICOES_EM_ANDAMENTO.somar(rota, valor=-1)
+        metricas.LATENCIA_HTTP.observar(
+            time.perf_counter() - inicio, request.method, rota, status
+        )
+
+
+# --- PERFILAMENTO SOB DEMANDA ---
+# Ativado apenas se PERFIL_TOKEN estiver definido; o cliente envia o mesmo
+# valor no cabeçalho X-Perfil-Token para perfilar uma requisição.
+CONTROLE_PERFIL = perfilamento.ControlePerfil(
+    token=os.getenv("PERFIL_TOKEN"),
+    intervalo_s=float(os.getenv("PERFIL_INTERVALO_S", "30")),
+)
+
+
+def reservar_perfil(request: Request):
+    """
+    Verifica se a requisição pediu perfilamento (cabeçalho X-Perfil-Token).
+
+    Returns:
+        bool: True se o perfil foi autorizado e reservado (liberar ao final).
+
+    Raises:
+        HTTPException: 403 com token inválido; 429 se outro perfil estiver em
+        andamento ou o intervalo mínimo entre perfis não tiver passado.
+    """
+    token = request.headers.get("X-Perfil-Token")
+    if token is None:
+        return False
+    if not CONTROLE_PERFIL.autorizado(token):
+        raise HTTPException(status_code=403, detail="Perfilamento não autorizado.")
+    if not CONTROLE_PERFIL.reservar():
+        raise HTTPException(
+            status_code=429,
+            detail="Perfilamento indisponível no momento; tente novamente mais tarde.",
+            headers={"Retry-After": str(int(CONTROLE_PERFIL.intervalo_s))},
+        )
+    return True
+
+
+def executar_com_perfil(perfil, funcao, *args, **kwargs):
+    """
+    Executa a função, sob o perfilador se `perfil` for True.
+
+    Returns:
+        tuple: (resultado, resumo do perfil ou None)
+    """
+    if not perfil:
+        return funcao(*args, **kwargs), None
+    resultado, resumo = perfilamento.perfilar(funcao, *args, **kwargs)
+    resumo["artefato"] = f"/perfis/{resumo['id']}"
+    return resultado, resumo
+
 
 # --- MODELOS DE DADOS (DTOs) ---
 class ZonaTransito(BaseModel):
@@ -21,7 +131,8 @@ class ZonaTransito(BaseModel):
     """
 
     nome: str
-    intensidade: float
+    # Fração da velocidade perdida na zona (1 pararia o trânsito por completo)
+    intensidade: float = Field(..., ge=0, lt=1)
     raio_km: float
 
 
@@ -38,6 +149,24 @@ class Ponto(BaseModel):
     tipo: str
     carga: int = 0
     prioridade: str = "regular"  # Pode ser 'critica', 'alta' ou 'regular'
+    # Janela de recebimento, em minutos desde o início do turno (no depósito: o turno)
+    janela_inicio: Optional[float] = Field(None, ge=0, description="Abertura da janela (min)")
+    janela_fim: Optional[float] = Field(None, ge=0, description="Fechamento da janela (min)")
+    tempo_servico: float = Field(0, ge=0, description="Tempo de descarga no local (min)")
+
+    @model_validator(mode="after")
+    def validar_janela(self):
+        # Erro de validação vira 422, como os demais campos inválidos
+        if (
+            self.janela_inicio is not None
+            and self.janela_fim is not None
+            and self.janela_inicio > self.janela_fim
+        ):
+            raise ValueError(
+                f"Ponto {self.id}: janela_inicio ({self.janela_inicio}) "
+                f"maior que janela_fim ({self.janela_fim})."
+            )
+        return self
 
 
 class ConfigOtimizacao(BaseModel):
@@ -50,6 +179,21 @@ class ConfigOtimizacao(BaseModel):
     capacidade_veiculo: int
     geracoes: int = 100
     zonas_transito: List[ZonaTransito] = []
+    adaptativo: bool = False  # GA: portfólio de mutações e parâmetros adaptativos
+    motor: str = Field(solvers.MOTOR_PADRAO, description="Motor de otimização: 'ga' ou 'alns'")
+    tempo_limite_s: Optional[float] = Field(
+        None, description="Orçamento de tempo do motor (ALNS: padrão 10 s)"
+    )
+
+
+class ConfigTarefa(ConfigOtimizacao):
+    """
+    Pedido de otimização longa, executada em segundo plano com checkpoints.
+    """
+
+    geracoes: int = 1000
+    tam_populacao: int = 50
+    semente: Optional[int] = None
 
 
 class RequestRelatorio(BaseModel):
@@ -62,6 +206,57 @@ class RequestRelatorio(BaseModel):
     zonas: List[ZonaTransito]
 
 
+def montar_instancia(pontos: List[Ponto]) -> InstanciaVRP:
+    """
+    Converte os pontos recebidos para a instância em colunas, uma única vez na
+    entrada da API: o solver e a IA trabalham sobre os arrays, sem dicionários.
+    """
+    # Mesma regra de depósito e de janelas da leitura de arquivos
+    return InstanciaVRP.de_pontos([p.model_dump() for p in pontos])
+
+
+# --- TAREFAS LONGAS (CHECKPOINT E RETOMADA) ---
+# Cada tarefa guarda instância, estado e checkpoints em TAREFAS_DIR; no
+# docker-compose a pasta fica no volume, então sobrevive a reinícios.
+GERENCIADOR_TAREFAS = tarefas.GerenciadorTarefas(
+    pasta=os.getenv("TAREFAS_DIR", "tarefas"),
+    intervalo_checkpoint=int(os.getenv("TAREFAS_INTERVALO_CHECKPOINT", "10")),
+)
+
+
+def validar_motor(motor: str, n_locais: int):
+    try:
+        solvers.validar(motor, n_locais)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def otimizar(instancia: InstanciaVRP, config: "ConfigOtimizacao"):
+    """
+    Executa o motor escolhido na requisição sobre a instância.
+    """
+    return solvers.resolver(
+        instancia,
+        config.capacidade_veiculo,
+        motor=config.motor,
+        geracoes=config.geracoes,
+        tempo_limite=config.tempo_limite_s,
+        adaptativo=config.adaptativo,
+    )
+
+
+def operar_tarefa(operacao, id_tarefa):
+    """
+    Executa uma operação do gerenciador traduzindo os erros para HTTP.
+    """
+    try:
+        return operacao(id_tarefa)
+    except tarefas.TarefaNaoEncontrada:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada.")
+    except tarefas.TransicaoInvalida as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
 # --- ENDPOINTS (ROTAS DA API) ---
 
 
@@ -73,45 +268,94 @@ def read_root():
     return {"status": "Online", "service": "Smart Medical Logistics VRP"}
 
 
+@app.get("/metrics", tags=["Status"], response_class=PlainTextResponse)
+def exportar_metricas():
+    """
+    Métricas no formato texto do Prometheus: latência por endpoint, requisições
+    em andamento, tarefas por estado, duração das fases do solver e contadores
+    de fitness/cache.
+    """
+    GERENCIADOR_TAREFAS.publicar_metricas()
+    return PlainTextResponse(
+        metricas.REGISTRO.exportar(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.get("/perfis/{id_perfil}", tags=["Status"])
+def baixar_perfil(id_perfil: str, request: Request):
+    """
+    Download do perfil completo (.prof, formato pstats) de uma requisição perfilada.
+    Exige o mesmo cabeçalho X-Perfil-Token.
+    """
+    if not CONTROLE_PERFIL.autorizado(request.headers.get("X-Perfil-Token")):
+        raise HTTPException(status_code=403, detail="Perfilamento não autorizado.")
+    caminho = perfilamento.caminho_artefato(id_perfil)
+    if caminho is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado.")
+    return FileResponse(
+        caminho, media_type="application/octet-stream", filename=f"{id_perfil}.prof"
+    )
+
+
+# As rotas que otimizam ou chamam a IA são síncronas (def): o FastAPI as
+# executa no threadpool, então o trabalho pesado não bloqueia o event loop
+# (nem /metrics, /tarefas ou as outras requisições em andamento).
 @app.post("/otimizar", tags=["Otimizacao"])
-async def otimizar_rota(config: ConfigOtimizacao):
+def otimizar_rota(config: ConfigOtimizacao, request: Request):
     """
-    Executa exclusivamente o Algoritmo Genético (VRP).
+    Executa exclusivamente a otimização (VRP), com o motor escolhido em 'motor'
+    (Algoritmo Genético por padrão, ou ALNS com orçamento 'tempo_limite_s').
 
     Entrada: Lista de pontos e capacidade do veículo.
     Saída: As rotas otimizadas (listas de IDs) e o histórico de convergência.
+    Com o cabeçalho X-Perfil-Token, inclui o resumo do perfil ('perfil').
     """
+    validar_motor(config.motor, len(config.pontos))
+    perfil = reservar_perfil(request)
     try:
-        # Serializa os objetos Pydantic para dicionários Python
-        pontos_processados = [p.model_dump() for p in config.pontos]
+        instancia = montar_instancia(config.pontos)
 
-        rotas, historico = ag.executar_ga(
-            pontos_processados, config.capacidade_veiculo, geracoes=config.geracoes
+        (rotas, historico), resumo_perfil = executar_com_perfil(
+            perfil, otimizar, instancia, config
         )
 
-        return {
+        resposta = {
             "rotas_otimizadas": rotas,
             "custo_final": historico[-1],
             "historico_convergencia": historico,
         }
+        if resumo_perfil:
+            resposta["perfil"] = resumo_perfil
+        return resposta
     except Exception as e:
         raise HTTPException(
-            status_code=500, detail=f"Erro interno no Algoritmo Genético: {str(e)}"
+            status_code=500, detail=f"Erro interno na otimização ({config.motor}): {str(e)}"
         )
+    finally:
+        if perfil:
+            CONTROLE_PERFIL.liberar()
 
 
 @app.post("/relatorio", tags=["Analise IA"])
-async def gerar_relatorio_ia(dados: RequestRelatorio):
+def gerar_relatorio_ia(dados: RequestRelatorio):
     """
     Executa exclusivamente a análise de Inteligência Artificial.
     Útil quando já se tem as rotas e deseja-se apenas gerar os insights textuais.
     """
+    instancia = montar_instancia(dados.pontos)
+    try:
+        instancia.posicoes([id_ponto for rota in dados.rotas for id_ponto in rota])
+    except KeyError as e:
+        raise HTTPException(
+            status_code=400, detail=f"Rotas com IDs que não estão em 'pontos': {e.args[0]}"
+        )
+
     try:
-        pontos_dict = [p.model_dump() for p in dados.pontos]
         zonas_dict = [z.model_dump() for z in dados.zonas]
 
         # Chama o módulo de IA para gerar insights sobre as rotas fornecidas
-        relatorio = ia.gerar_instrucoes_llm_v2(dados.rotas, pontos_dict, zonas_dict)
+        relatorio = ia.gerar_instrucoes_llm_v2(dados.rotas, instancia, zonas_dict)
         return relatorio
     except Exception as e:
         raise HTTPException(
@@ -120,36 +364,103 @@ async def gerar_relatorio_ia(dados: RequestRelatorio):
 
 
 @app.post("/solucao-completa", tags=["Fluxo Completo"])
-async def executar_processo_completo(config: ConfigOtimizacao):
+def executar_processo_completo(config: ConfigOtimizacao, request: Request):
     """
     Executa o fluxo completo: Otimização Matemática + Análise de IA.
 
     1. O Algoritmo Genético cria as melhores rotas.
     2. A IA analisa essas rotas considerando zonas de trânsito e prioridades.
     3. Retorna um objeto consolidado com rotas e relatórios.
+
+    Com o cabeçalho X-Perfil-Token, os passos 1 e 2 são perfilados juntos.
     """
+    validar_motor(config.motor, len(config.pontos))
+    perfil = reservar_perfil(request)
     try:
-        # Passo 1: Otimização (Algoritmo Genético)
-        pontos_processados = [p.model_dump() for p in config.pontos]
-        rotas, historico = ag.executar_ga(
-            pontos_processados, config.capacidade_veiculo, geracoes=config.geracoes
-        )
-
-        # Passo 2: Análise (Inteligência Artificial)
+        instancia = montar_instancia(config.pontos)
         zonas_dict = [z.model_dump() for z in config.zonas_transito]
-        analise_ia = ia.gerar_instrucoes_llm_v2(rotas, pontos_processados, zonas_dict)
+
+        def fluxo():
+            # Passo 1: Otimização (Algoritmo Genético ou o motor escolhido)
+            rotas, historico = otimizar(instancia, config)
+
+            # Passo 2: Análise (Inteligência Artificial)
+            analise_ia = ia.gerar_instrucoes_llm_v2(rotas, instancia, zonas_dict)
+            return rotas, historico, analise_ia
+
+        (rotas, historico, analise_ia), resumo_perfil = executar_com_perfil(perfil, fluxo)
 
         # Passo 3: Retorno Consolidado
-        return {
-            "meta_info": {"custo_rota": historico[-1], "geracoes": config.geracoes},
+        resposta = {
+            "meta_info": {
+                "custo_rota": historico[-1],
+                "motor": config.motor,
+                "geracoes": config.geracoes,
+            },
             "rotas": rotas,
             "analise_inteligente": analise_ia,
         }
+        if resumo_perfil:
+            resposta["perfil"] = resumo_perfil
+        return resposta
 
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Erro no processamento completo: {str(e)}"
         )
+    finally:
+        if perfil:
+            CONTROLE_PERFIL.liberar()
+
+
+@app.post("/tarefas", tags=["Tarefas"], status_code=202)
+def criar_tarefa(config: ConfigTarefa):
+    """
+    Enfileira uma otimização longa (GA com checkpoints periódicos).
+    Acompanhe por GET /tarefas/{id}; o resultado fica no registro ao concluir.
+    """
+    if config.motor != "ga":
+        raise HTTPException(
+            status_code=400, detail="Tarefas com checkpoint usam o motor 'ga'."
+        )
+    return GERENCIADOR_TAREFAS.criar(
+        montar_instancia(config.pontos),
+        config.capacidade_veiculo,
+        geracoes=config.geracoes,
+        tam_populacao=config.tam_populacao,
+        semente=config.semente,
+        adaptativo=config.adaptativo,
+    )
+
+
+@app.get("/tarefas", tags=["Tarefas"])
+def listar_tarefas():
+    return GERENCIADOR_TAREFAS.listar()
+
+
+@app.get("/tarefas/{id_tarefa}", tags=["Tarefas"])
+def consultar_tarefa(id_tarefa: str):
+    """
+    Estado, progresso (último checkpoint) e, se concluída, o resultado da tarefa.
+    """
+    return operar_tarefa(GERENCIADOR_TAREFAS.consultar, id_tarefa)
+
+
+@app.post("/tarefas/{id_tarefa}/preemptar", tags=["Tarefas"], status_code=202)
+def preemptar_tarefa(id_tarefa: str):
+    """
+    Pausa a tarefa: se estiver em execução, fica 'pausando' até salvar o
+    checkpoint e liberar a fila (retomar nesse intervalo cancela a pausa).
+    """
+    return operar_tarefa(GERENCIADOR_TAREFAS.preemptar, id_tarefa)
+
+
+@app.post("/tarefas/{id_tarefa}/retomar", tags=["Tarefas"], status_code=202)
+def retomar_tarefa(id_tarefa: str):
+    """
+    Devolve uma tarefa pausada à fila; ela continua exatamente do último checkpoint.
+    """
+    return operar_tarefa(GERENCIADOR_TAREFAS.retomar, id_tarefa)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,256 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import instancias_cvrplib as cvrplib
+import metricas
+import solvers
+
+
+def executar_instancia(
+    caminho,
+    geracoes,
+    tam_populacao,
+    semente,
+    adaptativo=False,
+    alvo_gap=None,
+    motor=solvers.MOTOR_PADRAO,
+    tempo_limite=None,
+):
+    """
+    Executa um motor em uma instância e mede tempo, avaliações e memória.
+    Roda em um processo próprio para que o pico de memória seja só desta instância.
+
+    As avaliações vêm do contador `metricas.AVALIACOES_FITNESS` (cálculos de
+    fitness que não vieram do cache). Com `alvo_gap`, mede também as avaliações
+    até o fim da geração em que o GA encontrou uma solução a no máximo
+    `alvo_gap`% do BKS (no custo interno do GA, antes do 2-opt final).
+    O ALNS não usa a fitness do GA: suas avaliações ficam em 0 e, para comparar
+    motores, use o mesmo `tempo_limite` e compare o custo.
+
+    Returns:
+        dict: Métricas da execução (ver `executar_benchmark`).
+    """
+    instancia = cvrplib.ler_vrp(caminho)
+    pontos = cvrplib.para_pontos(instancia)
+    bks = cvrplib.carregar_bks().get(instancia["nome"], {}).get("bks")
+    alvo = bks * (1 + alvo_gap / 100) if bks and alvo_gap is not None else None
+
+    # O processo é exclusivo desta instância: o contador começa do zero. O GA
+    # consulta `interromper` no início de cada geração, o que registra quantas
+    # avaliações houve até ali.
+    metricas.habilitar()
+    contagens = []
+
+    def registrar_geracao():
+        contagens.append(metricas.AVALIACOES_FITNESS.valor())
+        return False
+
+    inicio = time.perf_counter()
+    opcoes = {}
+    if motor == "ga":
+        opcoes = {
+            "tam_populacao": tam_populacao,
+            "adaptativo": adaptativo,
+            "interromper": registrar_geracao,
+        }
+    rotas, historico = solvers.resolver(
+        pontos,
+        instancia["capacidade"],
+        motor=motor,
+        geracoes=geracoes,
+        tempo_limite=tempo_limite,
+        verbose=False,
+        semente=semente,
+        **opcoes,
+    )
+    tempo = time.perf_counter() - inicio
+
+    avaliacoes = metricas.AVALIACOES_FITNESS.valor()
+    custo = cvrplib.custo_cvrplib(rotas, pontos)
+
+    ate_alvo = None
+    if alvo is not None and motor == "ga":
+        geracao = next((g for g, c in enumerate(historico) if c <= alvo), None)
+        if geracao is not None:
+            # Avaliações no início da geração seguinte (ou o total, se foi a última)
+            ate_alvo = contagens[geracao + 1] if geracao + 1 < len(contagens) else avaliacoes
+
+    return {
+        "instancia": instancia["nome"],
+        "motor": motor,
+        "clientes": len(pontos) - 1,
+        "capacidade": instancia["capacidade"],
+        "tempo_s": tempo,
+        "avaliacoes": avaliacoes,
+        "avaliacoes_por_s": avaliacoes / tempo if tempo > 0 and avaliacoes else None,
+        # ru_maxrss é em KB no Linux e em bytes no macOS
+        "pico_memoria_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        / (1024**2 if sys.platform == "darwin" else 1024),
+        "veiculos": len(rotas),
+        "custo_ga": historico[-1],
+        "custo": custo,
+        "bks": bks,
+        "gap_pct": 100 * (custo - bks) / bks if bks else None,
+        "alvo": alvo,
+        "avaliacoes_ate_alvo": ate_alvo,
+    }
+
+
+def _versao_codigo():
+    """
+    Commit atual do repositório (se disponível), para comparar execuções.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def metadados_ambiente(**parametros):
+    """
+    Identifica a execução (commit, data, versões e plataforma) para que
+    resultados de benchmarks diferentes possam ser comparados.
+    """
+    return {
+        "commit": _versao_codigo(),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "parametros": parametros,
+    }
+
+
+def executar_benchmark(
+    caminhos,
+    geracoes=200,
+    tam_populacao=50,
+    semente=42,
+    adaptativo=False,
+    alvo_gap=None,
+    motor=solvers.MOTOR_PADRAO,
+    tempo_limite=None,
+):
+    """
+    Executa o benchmark em uma lista de instâncias, uma de cada vez
+    (sem concorrência, para não distorcer os tempos).
+
+    Returns:
+        dict: {'meta': ambiente e parâmetros, 'resultados': métricas por instância}.
+        O custo é medido na métrica do CVRPLIB (arestas arredondadas), a mesma do BKS;
+        'custo_ga' é o custo interno do motor (Euclidiano sem arredondamento).
+    """
+    resultados = []
+    # Um processo novo por instância (maxtasksperchild=1) isola o pico de memória
+    contexto = multiprocessing.get_context("spawn")
+    with contexto.Pool(processes=1, maxtasksperchild=1) as pool:
+        for caminho in caminhos:
+            r = pool.apply(
+                executar_instancia,
+                (
+                    caminho,
+                    geracoes,
+                    tam_populacao,
+                    semente,
+                    adaptativo,
+                    alvo_gap,
+                    motor,
+                    tempo_limite,
+                ),
+            )
+            resultados.append(r)
+            gap = f"{r['gap_pct']:.2f}%" if r["gap_pct"] is not None else "---"
+            ate_alvo = r["avaliacoes_ate_alvo"] if r["avaliacoes_ate_alvo"] is not None else "---"
+            taxa = f"{r['avaliacoes_por_s']:10.0f}" if r["avaliacoes_por_s"] else f"{'---':>10}"
+            print(
+                f"[BENCH] {r['instancia']:<14} {r['tempo_s']:8.2f} s "
+                f"{taxa} aval/s {r['pico_memoria_mb']:7.1f} MB "
+                f"custo {r['custo']:>8} gap {gap} aval. até o alvo {ate_alvo}",
+                file=sys.stderr,
+            )
+
+    return {
+        "meta": metadados_ambiente(
+            geracoes=geracoes,
+            tam_populacao=tam_populacao,
+            semente=semente,
+            adaptativo=adaptativo,
+            alvo_gap=alvo_gap,
+            motor=motor,
+            tempo_limite=tempo_limite,
+        ),
+        "resultados": resultados,
+    }
+
+
+def main(argv=None):
+    """
+    Linha de comando do benchmark, ex:
+
+        python benchmark.py --geracoes 200 -o bench_$(git rev-parse --short HEAD).json
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark dos motores (GA/ALNS) em instâncias CVRPLIB (tempo, avaliações/s, memória e gap)."
+    )
+    parser.add_argument(
+        "instancias",
+        nargs="*",
+        help="Arquivos .vrp (padrão: todas as instâncias em 'instancias/').",
+    )
+    parser.add_argument("--geracoes", type=int, default=200)
+    parser.add_argument("--populacao", type=int, default=50)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--adaptativo", action="store_true", help="GA com controle adaptativo.")
+    parser.add_argument("--motor", choices=solvers.listar_motores(), default=solvers.MOTOR_PADRAO)
+    parser.add_argument(
+        "--tempo-limite",
+        type=float,
+        default=None,
+        help="Orçamento de tempo por instância, em segundos (ALNS: padrão 10 s).",
+    )
+    parser.add_argument(
+        "--alvo-gap",
+        type=float,
+        default=None,
+        help="Mede as avaliações até chegar a este gap (%%) do BKS.",
+    )
+    parser.add_argument("-o", "--saida", default=None, help="Arquivo JSON (padrão: stdout).")
+    args = parser.parse_args(argv)
+
+    relatorio = executar_benchmark(
+        args.instancias or cvrplib.listar_instancias(),
+        geracoes=args.geracoes,
+        tam_populacao=args.populacao,
+        semente=args.semente,
+        adaptativo=args.adaptativo,
+        alvo_gap=args.alvo_gap,
+        motor=args.motor,
+        tempo_limite=args.tempo_limite,
+    )
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
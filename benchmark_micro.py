@@ -0,0 +1,235 @@
+import argparse
+import json
+import random
+import statistics
+import sys
+import timeit
+
+import algoritmo_genetico as ag
+from benchmark import metadados_ambiente
+from instancia import InstanciaVRP, como_instancia
+
+# Tamanhos de instância (quantidade de paradas, sem contar o depósito)
+TAMANHOS_PADRAO = [50, 200, 1000, 5000]
+
+# Regressão tolerada, em % sobre o tempo da linha de base
+LIMITE_PADRAO = 10.0
+
+
+def gerar_instancia_sintetica(n, semente=0):
+    """
+    Gera uma instância aleatória com `n` paradas para os micro-benchmarks.
+    A capacidade comporta cerca de 10 entregas por veículo, como nos cenários reais.
+
+    Returns:
+        tuple: (pontos, capacidade)
+    """
+    rng = random.Random(semente)
+    pontos = [{"id": 0, "coord": (0.0, 0.0), "tipo": "deposito", "carga": 0}]
+    for i in range(1, n + 1):
+        pontos.append(
+            {
+                "id": i,
+                "coord": (rng.uniform(-0.1, 0.1), rng.uniform(-0.1, 0.1)),
+                "tipo": "entrega",
+                "carga": rng.randint(10, 100),
+                "prioridade": rng.choice(["regular", "regular", "regular", "crítica"]),
+            }
+        )
+    return pontos, 550
+
+
+def preparar_casos(pontos, capacidade, semente=0):
+    """
+    Monta uma chamada representativa de cada função crítica do GA.
+
+    Returns:
+        dict: {nome_da_funcao: callable sem argumentos}
+    """
+    rng = random.Random(semente)
+    # O GA converte os pontos para colunas uma única vez; as chamadas medem o laço interno
+    instancia = como_instancia(pontos)
+    ids = [i for k, i in enumerate(instancia.ids.tolist()) if k != instancia.deposito]
+
+    def individuo():
+        ind = ids[:]
+        rng.shuffle(ind)
+        return ind
+
+    pai1, pai2 = individuo(), individuo()
+    populacao = [individuo() for _ in range(50)]
+    rotas = ag.separar_rotas_por_capacidade(individuo(), instancia, capacidade)
+
+    # A mesma instância com janelas de 60 min em um turno de 8 h (VRPTW),
+    # sorteadas por último para não mudar os casos acima
+    abertura = [0.0] + [rng.uniform(30, 390) for _ in ids]
+    com_janelas = InstanciaVRP(
+        instancia.coords,
+        instancia.cargas,
+        instancia.prioridades,
+        ids=instancia.ids,
+        janelas_inicio=abertura,
+        janelas_fim=[480.0] + [a + 60 for a in abertura[1:]],
+        tempos_servico=[0.0] + [5.0] * len(ids),
+    )
+    rotas_janelas = ag.separar_rotas_por_capacidade(pai2, com_janelas, capacidade)
+
+    return {
+        "funcao_fitness_vrp": lambda: ag.funcao_fitness_vrp(pai1, instancia, capacidade),
+        "separar_rotas_por_capacidade": lambda: ag.separar_rotas_por_capacidade(
+            pai1, instancia, capacidade
+        ),
+        "crossover": lambda: ag.crossover(pai1, pai2),
+        # Taxa 1.0 para que toda chamada faça a troca
+        "mutacao": lambda: ag.mutacao(pai2, taxa_mutacao=1.0),
+        "selecao_torneio": lambda: ag.selecao_torneio(populacao, instancia, capacidade),
+        # Mesmo uso do pós-processamento de executar_ga: 2-opt em cada rota da solução
+        "aplicar_2opt": lambda: [ag.aplicar_2opt(r, instancia) for r in rotas],
+        "funcao_fitness_vrp_janelas": lambda: ag.funcao_fitness_vrp(pai1, com_janelas, capacidade),
+        "aplicar_2opt_janelas": lambda: [ag.aplicar_2opt(r, com_janelas) for r in rotas_janelas],
+    }
+
+
+def medir(funcao, repeticoes=5, tempo_min=0.2):
+    """
+    Mede o tempo por chamada de `funcao`.
+
+    Cada repetição executa a função em laço até somar pelo menos `tempo_min`
+    segundos (como o `timeit`, com o coletor de lixo desligado).
+
+    Returns:
+        dict: 'min_s' e 'mediana_s' por chamada, 'repeticoes' e 'loops'.
+    """
+    temporizador = timeit.Timer(funcao)
+    loops, _ = temporizador.autorange()
+    loops = max(1, int(loops * tempo_min / 0.2))
+    tempos = [t / loops for t in temporizador.repeat(repeat=repeticoes, number=loops)]
+    return {
+        "min_s": min(tempos),
+        "mediana_s": statistics.median(tempos),
+        "repeticoes": repeticoes,
+        "loops": loops,
+    }
+
+
+def executar_micro(tamanhos=TAMANHOS_PADRAO, funcoes=None, repeticoes=5, tempo_min=0.2, semente=0):
+    """
+    Executa os micro-benchmarks para cada tamanho de instância.
+
+    Returns:
+        dict: {'meta': ambiente e parâmetros, 'resultados': [{'funcao', 'n', 'min_s', ...}]}
+    """
+    resultados = []
+    for n in tamanhos:
+        pontos, capacidade = gerar_instancia_sintetica(n, semente)
+        casos = preparar_casos(pontos, capacidade, semente)
+        for nome, chamada in casos.items():
+            if funcoes and nome not in funcoes:
+                continue
+            random.seed(semente)  # selecao_torneio/crossover/mutacao usam o módulo random
+            r = {"funcao": nome, "n": n, **medir(chamada, repeticoes, tempo_min)}
+            resultados.append(r)
+            print(
+                f"[MICRO] {nome:<30} n={n:<6} {r['min_s'] * 1e3:12.4f} ms/chamada",
+                file=sys.stderr,
+            )
+
+    return {
+        "meta": metadados_ambiente(
+            tamanhos=list(tamanhos), repeticoes=repeticoes, tempo_min=tempo_min, semente=semente
+        ),
+        "resultados": resultados,
+    }
+
+
+def comparar(atual, base, limite=LIMITE_PADRAO):
+    """
+    Compara dois relatórios pelo menor tempo por chamada (o mais estável).
+
+    Args:
+        atual (dict): Relatório da execução atual.
+        base (dict): Relatório da linha de base.
+        limite (float): Aumento máximo tolerado, em %.
+
+    Returns:
+        list: Comparações com 'funcao', 'n', 'base_s', 'atual_s', 'variacao_pct'
+        e 'regressao' (True se passou do limite). Casos ausentes na base são ignorados.
+    """
+    tempos_base = {(r["funcao"], r["n"]): r["min_s"] for r in base["resultados"]}
+    comparacoes = []
+    for r in atual["resultados"]:
+        chave = (r["funcao"], r["n"])
+        if chave not in tempos_base:
+            continue
+        variacao = 100 * (r["min_s"] - tempos_base[chave]) / tempos_base[chave]
+        comparacoes.append(
+            {
+                "funcao": r["funcao"],
+                "n": r["n"],
+                "base_s": tempos_base[chave],
+                "atual_s": r["min_s"],
+                "variacao_pct": variacao,
+                "regressao": variacao > limite,
+            }
+        )
+    return comparacoes
+
+
+def main(argv=None):
+    """
+    Linha de comando, ex:
+
+        python benchmark_micro.py -o baseline.json
+        python benchmark_micro.py --comparar baseline.json --limite 10
+    """
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmarks das funções críticas do GA, com linha de base em JSON."
+    )
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO)
+    parser.add_argument("--funcoes", nargs="+", default=None, help="Subconjunto de funções.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--tempo-min", type=float, default=0.2, help="Segundos por repetição.")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("-o", "--saida", default=None, help="Grava o relatório (linha de base).")
+    parser.add_argument("--comparar", default=None, help="Linha de base JSON para comparar.")
+    parser.add_argument(
+        "--limite", type=float, default=LIMITE_PADRAO, help="Regressão máxima tolerada (%%)."
+    )
+    args = parser.parse_args(argv)
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            base = json.load(f)
+
+    relatorio = executar_micro(
+        args.tamanhos, args.funcoes, args.repeticoes, args.tempo_min, args.semente
+    )
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(json.dumps(relatorio, indent=2, ensure_ascii=False) + "\n")
+
+    if base is None:
+        if not args.saida:
+            print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+        return 0
+
+    comparacoes = comparar(relatorio, base, args.limite)
+    for c in comparacoes:
+        marca = "REGRESSÃO" if c["regressao"] else "ok"
+        print(
+            f"{c['funcao']:<30} n={c['n']:<6} {c['base_s'] * 1e3:12.4f} -> "
+            f"{c['atual_s'] * 1e3:12.4f} ms ({c['variacao_pct']:+7.1f}%) {marca}"
+        )
+
+    regressoes = [c for c in comparacoes if c["regressao"]]
+    if regressoes:
+        print(f"\n[ERRO] {len(regressoes)} caso(s) acima do limite de {args.limite}%.")
+        return 1
+    print(f"\n[OK] Nenhuma regressão acima de {args.limite}%.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
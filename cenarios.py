@@ -0,0 +1,202 @@
+import argparse
+import sys
+
+import numpy as np
+
+from instancia import CRITICA, InstanciaVRP, codigo_prioridade
+from janelas import TEMPO_POR_GRAU
+
+CENTRO_PADRAO = (-23.5505, -46.6333)  # São Paulo
+NOME_DEPOSITO = "CENTRAL DE LOGÍSTICA (Hosp. das Clínicas)"
+NOMES_PADRAO = ["Hosp. Sírio-Libanês", "Hosp. Albert Einstein", "Santa Casa de SP", "UBS Vila Mariana"]
+
+DISTRIBUICOES = ("uniforme", "agrupada", "mista")
+DEMANDAS = ("uniforme", "realista")
+
+
+def _sortear_coords(rng, n, centro, raio, distribuicao, grupos, dispersao):
+    """
+    Sorteia `n` coordenadas no quadrado centro +/- raio.
+
+    - uniforme: espalhadas por toda a área;
+    - agrupada: em torno de `grupos` centros (bairros/polos), com pesos desiguais;
+    - mista: metade agrupada, metade uniforme.
+    """
+    centro = np.asarray(centro, dtype=float)
+    if distribuicao == "uniforme":
+        return centro + rng.uniform(-raio, raio, size=(n, 2))
+
+    if distribuicao == "mista":
+        n_grupos = n // 2
+        coords = np.vstack(
+            (
+                _sortear_coords(rng, n_grupos, centro, raio, "agrupada", grupos, dispersao),
+                _sortear_coords(rng, n - n_grupos, centro, raio, "uniforme", grupos, dispersao),
+            )
+        )
+        return coords[rng.permutation(n)]
+
+    if distribuicao != "agrupada":
+        raise ValueError(f"Distribuição '{distribuicao}' inválida; use uma de {DISTRIBUICOES}.")
+
+    centros = centro + rng.uniform(-0.8 * raio, 0.8 * raio, size=(grupos, 2))
+    pesos = rng.dirichlet(np.ones(grupos))
+    grupo = rng.choice(grupos, size=n, p=pesos)
+    coords = centros[grupo] + rng.normal(0.0, dispersao, size=(n, 2))
+    return np.clip(coords, centro - raio, centro + raio)
+
+
+def _sortear_cargas(rng, n, demanda, carga_min, carga_max):
+    """
+    Sorteia as cargas (kg).
+
+    - uniforme: inteiros equiprováveis entre `carga_min` e `carga_max`;
+    - realista: log-normal (muitas entregas pequenas, poucas grandes) limitada ao intervalo.
+    """
+    if demanda == "uniforme":
+        return rng.integers(carga_min, carga_max, size=n, endpoint=True)
+    if demanda != "realista":
+        raise ValueError(f"Demanda '{demanda}' inválida; use uma de {DEMANDAS}.")
+
+    # Deslocada para começar em carga_min; mediana a 1/4 do intervalo
+    mediana = max((carga_max - carga_min) / 4, 1)
+    cargas = carga_min + rng.lognormal(np.log(mediana), 0.7, size=n)
+    return np.clip(np.rint(cargas), carga_min, carga_max).astype(np.int64)
+
+
+def gerar_instancia(
+    qtd_pontos,
+    semente=None,
+    centro=CENTRO_PADRAO,
+    raio=0.08,
+    distribuicao="uniforme",
+    grupos=8,
+    dispersao=0.01,
+    demanda="uniforme",
+    carga_min=5,
+    carga_max=25,
+    mix_prioridades=None,
+    nomes_locais=None,
+    capacidade=None,
+    largura_janela=None,
+    horizonte=480.0,
+    tempo_servico=0.0,
+):
+    """
+    Gera um cenário aleatório de forma vetorizada e reproduzível.
+
+    Args:
+        qtd_pontos (int): Total de locais, incluindo o depósito (ID 0, no centro).
+        semente (int): Semente do gerador (None: não reproduzível).
+        centro (tuple): Coordenada (lat, lon) do depósito.
+        raio (float): Meia largura da área, em graus.
+        distribuicao (str): 'uniforme', 'agrupada' ou 'mista'.
+        grupos (int): Quantidade de polos na distribuição agrupada.
+        dispersao (float): Desvio padrão (graus) em torno de cada polo.
+        demanda (str): 'uniforme' ou 'realista' (log-normal).
+        carga_min, carga_max (int): Limites da carga de cada entrega (kg).
+        mix_prioridades (dict): Proporção de cada prioridade
+            (padrão: {'regular': 0.8, 'crítica': 0.2}).
+        nomes_locais (list): Nomes base das unidades.
+        capacidade (int): Capacidade dos veículos (opcional, salva junto).
+        largura_janela (float): Se informada, cada entrega ganha uma janela de
+            tempo com esta largura (minutos), sorteada dentro do turno de forma
+            que seja alcançável saindo do depósito.
+        horizonte (float): Duração do turno (janela do depósito), em minutos.
+        tempo_servico (float): Tempo de serviço de cada entrega, em minutos.
+
+    Returns:
+        InstanciaVRP: A instância gerada.
+    """
+    rng = np.random.default_rng(semente)
+    n = max(qtd_pontos - 1, 0)  # Entregas
+
+    coords = np.empty((n + 1, 2))
+    coords[0] = centro
+    coords[1:] = _sortear_coords(rng, n, centro, raio, distribuicao, grupos, dispersao)
+
+    cargas = np.zeros(n + 1, dtype=np.int32)
+    cargas[1:] = _sortear_cargas(rng, n, demanda, carga_min, carga_max)
+
+    mix = mix_prioridades or {"regular": 0.8, "crítica": 0.2}
+    codigos = np.array([codigo_prioridade(p) for p in mix], dtype=np.int8)
+    probabilidades = np.array(list(mix.values()), dtype=float)
+    prioridades = np.zeros(n + 1, dtype=np.int8)
+    prioridades[1:] = rng.choice(codigos, size=n, p=probabilidades / probabilidades.sum())
+
+    nomes_locais = list(nomes_locais or NOMES_PADRAO)
+    codigos_nome = np.zeros(n + 1, dtype=np.int32)  # 0 = nome do depósito
+    codigos_nome[1:] = rng.integers(1, len(nomes_locais) + 1, size=n)
+
+    # Sorteadas por último: as demais colunas não mudam para a mesma semente
+    tempos = {}
+    if largura_janela is not None:
+        ida = np.hypot(*(coords[1:] - coords[0]).T) * TEMPO_POR_GRAU
+        ultima_abertura = np.maximum(horizonte - ida - tempo_servico - largura_janela, ida)
+        inicio = np.zeros(n + 1)
+        inicio[1:] = rng.uniform(ida, ultima_abertura)
+        fim = inicio + largura_janela
+        fim[0] = horizonte
+        servico = np.full(n + 1, float(tempo_servico))
+        servico[0] = 0.0
+        tempos = {"janelas_inicio": inicio, "janelas_fim": fim, "tempos_servico": servico}
+
+    return InstanciaVRP(
+        coords,
+        cargas,
+        prioridades,
+        capacidade=capacidade,
+        rotulos=[NOME_DEPOSITO] + nomes_locais,
+        codigos_nome=codigos_nome,
+        modelo_nome="{rotulo} - Unidade {id}",
+        **tempos,
+    )
+
+
+def main(argv=None):
+    """
+    Linha de comando para gerar e salvar cenários, ex:
+
+        python cenarios.py 100000 --semente 7 --distribuicao agrupada -o estresse_100k/
+    """
+    parser = argparse.ArgumentParser(description="Gera cenários aleatórios reproduzíveis.")
+    parser.add_argument("qtd_pontos", type=int, help="Total de locais (incluindo o depósito).")
+    parser.add_argument("-o", "--saida", required=True, help="Arquivo .npz ou diretório (mmap).")
+    parser.add_argument("--semente", type=int, default=None)
+    parser.add_argument("--distribuicao", choices=DISTRIBUICOES, default="uniforme")
+    parser.add_argument("--grupos", type=int, default=8)
+    parser.add_argument("--demanda", choices=DEMANDAS, default="uniforme")
+    parser.add_argument(
+        "--criticos", type=float, default=0.2, help="Fração de entregas críticas (0 a 1)."
+    )
+    parser.add_argument("--capacidade", type=int, default=None)
+    parser.add_argument(
+        "--largura-janela", type=float, default=None, help="Janelas de tempo com esta largura (min)."
+    )
+    parser.add_argument("--tempo-servico", type=float, default=0.0, help="Minutos por entrega.")
+    parser.add_argument("--comprimir", action="store_true", help="Compacta o .npz.")
+    args = parser.parse_args(argv)
+
+    instancia = gerar_instancia(
+        args.qtd_pontos,
+        semente=args.semente,
+        distribuicao=args.distribuicao,
+        grupos=args.grupos,
+        demanda=args.demanda,
+        mix_prioridades={"regular": 1 - args.criticos, "crítica": args.criticos},
+        capacidade=args.capacidade,
+        largura_janela=args.largura_janela,
+        tempo_servico=args.tempo_servico,
+    )
+    instancia.salvar(args.saida, comprimir=args.comprimir)
+
+    criticos = int((instancia.prioridades == CRITICA).sum())
+    print(
+        f"[INFO] {len(instancia)} locais ({criticos} críticos, carga total "
+        f"{int(instancia.cargas.sum())} kg) salvos em '{args.saida}'."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
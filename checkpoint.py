@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Versão do formato; checkpoints de versões diferentes são recusados
+VERSAO = 1
+
+
+class CheckpointIncompativel(ValueError):
+    """
+    O checkpoint não corresponde à execução que tenta retomá-lo
+    (outra instância, outros parâmetros ou formato antigo).
+    """
+
+
+def assinatura_instancia(instancia):
+    """
+    Resumo (SHA-1) das colunas usadas pelo solver: IDs, coordenadas, cargas,
+    prioridades e, se houver, as janelas de tempo. Impede retomar um
+    checkpoint sobre outra instância.
+    """
+    h = hashlib.sha1()
+    colunas = [instancia.ids, instancia.coords, instancia.cargas, instancia.prioridades]
+    if instancia.tem_janelas:
+        colunas += [instancia.janelas_inicio, instancia.janelas_fim, instancia.tempos_servico]
+        colunas.append(np.float64(instancia.tempo_por_distancia))
+    for coluna in colunas:
+        h.update(np.ascontiguousarray(coluna).tobytes())
+    return h.hexdigest()
+
+
+def salvar_checkpoint(caminho, estado):
+    """
+    Grava o estado do GA em um '.npz' (binário, sem compressão).
+
+    A escrita é atômica: o arquivo é gravado ao lado e renomeado por cima do
+    anterior, então uma interrupção no meio da gravação preserva o último
+    checkpoint válido.
+
+    Args:
+        caminho (str): Arquivo de destino ('.npz').
+        estado (dict): 'geracao' (próxima geração a executar), 'populacao'
+            (lista de permutações), 'melhor_global' (ou None), 'melhor_fitness',
+            'historico', 'rng' (retorno de `random.getstate()`), 'parametros' e
+            'controle' (estado do modo adaptativo, serializável em JSON, ou None).
+    """
+    versao_rng, estado_rng, gauss_rng = estado["rng"]
+    metadados = {
+        "versao": VERSAO,
+        "geracao": estado["geracao"],
+        "melhor_fitness": estado["melhor_fitness"],
+        "versao_rng": versao_rng,
+        "gauss_rng": gauss_rng,
+        "parametros": estado["parametros"],
+        "controle": estado.get("controle"),
+    }
+    melhor = estado["melhor_global"]
+
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as f:
+        np.savez(
+            f,
+            metadados=np.array(json.dumps(metadados)),
+            populacao=np.array(estado["populacao"], dtype=np.int64),
+            melhor_global=np.array(melhor if melhor is not None else [], dtype=np.int64),
+            historico=np.array(estado["historico"], dtype=np.float64),
+            rng=np.array(estado_rng, dtype=np.uint32),
+        )
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+
+def ler_metadados(caminho):
+    """
+    Lê apenas os metadados do checkpoint (geração, melhor custo, parâmetros).
+    """
+    with np.load(caminho) as arquivo:
+        return json.loads(str(arquivo["metadados"]))
+
+
+def carregar_checkpoint(caminho, parametros=None):
+    """
+    Lê um checkpoint gravado por `salvar_checkpoint`.
+
+    Args:
+        caminho (str): Arquivo '.npz'.
+        parametros (dict): Se informado, precisa coincidir com os parâmetros
+            gravados (senão `CheckpointIncompativel`).
+
+    Returns:
+        dict: O mesmo formato de `estado` em `salvar_checkpoint`, com listas de
+        inteiros Python (como as do GA) e o estado do RNG pronto para `setstate`.
+    """
+    with np.load(caminho) as arquivo:
+        metadados = json.loads(str(arquivo["metadados"]))
+        if metadados.get("versao") != VERSAO:
+            raise CheckpointIncompativel(
+                f"Versão de checkpoint {metadados.get('versao')} não suportada (esperada {VERSAO})."
+            )
+        if parametros is not None and metadados["parametros"] != parametros:
+            raise CheckpointIncompativel(
+                f"Checkpoint de outra execução: {metadados['parametros']} != {parametros}."
+            )
+
+        melhor = arquivo["melhor_global"].tolist()
+        return {
+            "geracao": metadados["geracao"],
+            "populacao": arquivo["populacao"].tolist(),
+            "melhor_global": melhor if melhor else None,
+            "melhor_fitness": metadados["melhor_fitness"],
+            "historico": arquivo["historico"].tolist(),
+            "rng": (
+                metadados["versao_rng"],
+                tuple(arquivo["rng"].tolist()),
+                metadados["gauss_rng"],
+            ),
+            "parametros": metadados["parametros"],
+            "controle": metadados.get("controle"),
+        }
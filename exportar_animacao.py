@@ -0,0 +1,145 @@
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Renderização offscreen: o driver 'dummy' do SDL dispensa display e GPU.
+# Precisa estar definido antes da inicialização do Pygame.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import visualizacao_pygame as vis_pg
+
+
+def renderizar_animacao(
+    rotas,
+    pontos_dados,
+    zonas_transito,
+    destino,
+    fps=30,
+    escala_tempo=480,
+    duracao_max_s=120,
+    ffmpeg="ffmpeg",
+):
+    """
+    Renderiza a simulação da frota sem janela, com o mesmo estilo visual do
+    simulador interativo, e grava o resultado em disco.
+
+    Se `destino` terminar em uma extensão de vídeo (.mp4, .webm, .mkv, ...),
+    os frames são enviados ao `ffmpeg` pela entrada padrão; caso contrário,
+    `destino` é tratado como diretório e recebe um PNG por frame.
+
+    Args:
+        rotas (list): Rotas por veículo (listas de IDs).
+        pontos_dados (list | InstanciaVRP): Dados dos locais.
+        zonas_transito (list): Zonas de trânsito.
+        destino (str): Arquivo de vídeo ou diretório de frames.
+        fps (int): Frames por segundo do replay.
+        escala_tempo (float): Segundos simulados por segundo de replay.
+        duracao_max_s (float): Duração máxima do replay (segundos de vídeo).
+        ffmpeg (str): Executável do codificador de vídeo.
+
+    Returns:
+        dict: Destino, quantidade de frames e tempo simulado coberto.
+    """
+    pygame.init()
+    tela = pygame.Surface((vis_pg.LARGURA, vis_pg.ALTURA))
+    fontes = vis_pg.carregar_fontes()
+    cache_texto = {}
+
+    mapa, bounds, simulador, veiculos = vis_pg.preparar_cena(
+        rotas, pontos_dados, zonas_transito, dt=escala_tempo / fps
+    )
+
+    # Camada estática em cache (mapa) + painel, refeito só quando muda
+    fundo = pygame.Surface((vis_pg.LARGURA, vis_pg.ALTURA))
+    vis_pg.desenhar_camada_estatica(fundo, rotas, mapa, zonas_transito, fonte=fontes[0])
+    estado_painel = None
+
+    eh_video = os.path.splitext(destino)[1].lower() in (".mp4", ".webm", ".mkv", ".avi", ".mov")
+    if eh_video:
+        os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+        codificador = subprocess.Popen(
+            [
+                ffmpeg, "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgb24",
+                "-s", f"{vis_pg.LARGURA}x{vis_pg.ALTURA}", "-r", str(fps),
+                "-i", "-",
+                "-pix_fmt", "yuv420p", destino,
+            ],
+            stdin=subprocess.PIPE,
+        )
+    else:
+        os.makedirs(destino, exist_ok=True)
+
+    # Mantém o último quadro por 1 segundo após toda a frota terminar
+    frames_finais = fps
+    n_frames = 0
+    try:
+        while n_frames < duracao_max_s * fps and frames_finais > 0:
+            tempo_str = vis_pg.relogio_simulado(simulador.tempo)
+            status = [
+                vis_pg.status_veiculo(c, t)
+                for c, t in zip(simulador.concluido, simulador.no_transito)
+            ]
+            novo_estado = (tempo_str, tuple(txt for txt, _ in status))
+            if novo_estado != estado_painel:
+                vis_pg.desenhar_painel(fundo, veiculos, status, tempo_str, fontes, cache_texto)
+                estado_painel = novo_estado
+
+            tela.blit(fundo, (0, 0))
+            vis_pg.desenhar_veiculos(tela, veiculos, simulador, bounds)
+
+            if eh_video:
+                codificador.stdin.write(pygame.image.tobytes(tela, "RGB"))
+            else:
+                pygame.image.save(tela, os.path.join(destino, f"frame_{n_frames:05d}.png"))
+            n_frames += 1
+
+            if simulador.concluido.all():
+                frames_finais -= 1
+            else:
+                simulador.passo()
+    finally:
+        # Só libera recursos: levantar aqui esconderia um erro já em propagação
+        if eh_video:
+            try:
+                codificador.stdin.close()
+            except BrokenPipeError:
+                pass  # O codificador já saiu; o código de saída é conferido abaixo
+            retorno = codificador.wait()
+        pygame.quit()
+
+    if eh_video and retorno != 0:
+        raise RuntimeError(f"O codificador '{ffmpeg}' falhou ao gerar '{destino}'.")
+    return {"destino": destino, "frames": n_frames, "tempo_simulado_s": simulador.tempo}
+
+
+def exportar_planos(planos, processos=None, **opcoes):
+    """
+    Renderiza vários planos em paralelo, um processo por plano.
+
+    Args:
+        planos (list): Dicionários com 'rotas', 'pontos', 'zonas_transito' e 'destino'.
+        processos (int): Número de processos (padrão: todos os núcleos).
+        **opcoes: Repassadas a `renderizar_animacao` (fps, escala_tempo, ...).
+
+    Returns:
+        list: Resumos de cada renderização, na ordem dos planos.
+    """
+    resultados = [None] * len(planos)
+    with ProcessPoolExecutor(max_workers=processos or os.cpu_count() or 1) as executor:
+        futuros = {
+            executor.submit(
+                renderizar_animacao,
+                plano["rotas"],
+                plano["pontos"],
+                plano.get("zonas_transito", []),
+                plano["destino"],
+                **opcoes,
+            ): i
+            for i, plano in enumerate(planos)
+        }
+        for futuro in as_completed(futuros):
+            resultados[futuros[futuro]] = futuro.result()
+    return resultados
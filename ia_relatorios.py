@@ -2,12 +2,100 @@ import google.generativeai as genai
 import json
 from dotenv import load_dotenv
 import os
+import random
+import re
+import threading
+import time
+import metricas
+from instancia import como_instancia
 
 # Carrega as variáveis de ambiente (API KEY)
 load_dotenv()
 API_KEY = os.getenv("API_KEY")
 
 
+def criar_modelo_gemini():
+    """
+    Cria o cliente do Google Gemini configurado para responder em JSON nativo.
+    """
+    # Configuração do cliente Google Generative AI
+    genai.configure(api_key=API_KEY)
+
+    # Inicializa o modelo específico solicitado (gemini-3-flash-preview)
+    return genai.GenerativeModel(
+        "gemini-3-flash-preview",
+        generation_config={"response_mime_type": "application/json"},
+    )
+
+
+# Fábrica do modelo usado nas análises. Pode ser trocada por um substituto com a
+# mesma interface (`generate_content(prompt).text`), ex: nos testes de carga.
+fabrica_modelo = criar_modelo_gemini
+
+
+def definir_fabrica_modelo(fabrica=None):
+    """
+    Troca a fábrica do modelo de IA (None restaura o Gemini).
+    """
+    global fabrica_modelo
+    fabrica_modelo = fabrica or criar_modelo_gemini
+
+
+class ModeloFalso:
+    """
+    Substituto local do modelo Gemini (testes unitários e de carga).
+
+    Tem a mesma interface do cliente Gemini (`generate_content(prompt).text`),
+    espera uma latência configurável (bloqueando, como o cliente real) e falha
+    com a probabilidade indicada. A resposta segue o formato pedido no prompt.
+    """
+
+    def __init__(self, latencia_s=1.0, variacao_s=0.2, taxa_falha=0.0, semente=None):
+        """
+        Args:
+            latencia_s (float): Latência média de cada chamada (segundos).
+            variacao_s (float): Variação uniforme (+/-) em torno da média.
+            taxa_falha (float): Probabilidade (0 a 1) de a chamada falhar.
+            semente (int): Semente do sorteio de latência e falhas.
+        """
+        self.latencia_s = latencia_s
+        self.variacao_s = variacao_s
+        self.taxa_falha = taxa_falha
+        self._rng = random.Random(semente)
+        self._trava = threading.Lock()
+        self.chamadas = 0
+        self.falhas = 0
+
+    def __call__(self):
+        # Usado como fábrica: `ia.definir_fabrica_modelo(modelo)`
+        return self
+
+    def generate_content(self, prompt):
+        with self._trava:
+            self.chamadas += 1
+            espera = max(0.0, self.latencia_s + self._rng.uniform(-1, 1) * self.variacao_s)
+            falhou = self._rng.random() < self.taxa_falha
+            if falhou:
+                self.falhas += 1
+
+        time.sleep(espera)
+        if falhou:
+            raise RuntimeError("Falha simulada do modelo de IA (503)")
+
+        veiculos = [int(v) for v in re.findall(r'"veiculo_id": (\d+)', prompt)]
+        analise = [
+            {
+                "veiculo_id": v,
+                "nivel_risco": "BAIXO",
+                "acao_imediata": "Seguir rota",
+                "justificativa": "Resposta simulada (teste de carga).",
+                "sugestao_otimizacao": "Rota Otimizada - Manter Plano",
+            }
+            for v in veiculos
+        ]
+        return type("RespostaFalsa", (), {"text": json.dumps(analise)})()
+
+
 def gerar_instrucoes_llm_v2(rotas_finais, pontos_dados, zonas_transito):
     """
     Utiliza a IA do Google Gemini para analisar as rotas geradas e fornecer
@@ -15,7 +103,8 @@ def gerar_instrucoes_llm_v2(rotas_finais, pontos_dados, zonas_transito):
 
     Args:
         rotas_finais (list): Lista de listas com IDs dos pontos (ex: [[0, 1, 0]]).
-        pontos_dados (list): Dicionários com detalhes de cada ponto (nome, carga, prioridade).
+        pontos_dados (list | InstanciaVRP): Detalhes de cada ponto (nome, carga, prioridade),
+            como lista de dicionários ou instância em colunas.
         zonas_transito (list): Dados sobre áreas de risco ou trânsito intenso.
 
     Returns:
@@ -24,38 +113,22 @@ def gerar_instrucoes_llm_v2(rotas_finais, pontos_dados, zonas_transito):
     print("\n[INFO] Iniciando analise de Inteligencia Artificial...")
 
     try:
-        # Configuração do cliente Google Generative AI
-        genai.configure(api_key=API_KEY)
-
-        # Inicializa o modelo específico solicitado (gemini-3-flash-preview)
-        # Configurado para retornar JSON nativo
-        model = genai.GenerativeModel(
-            "gemini-3-flash-preview",
-            generation_config={"response_mime_type": "application/json"},
-        )
+        model = fabrica_modelo()
 
         # --- PREPARAÇÃO DO CONTEXTO (INPUT) ---
         # Filtra e organiza os dados para enviar apenas o necessário para a IA
         dados_input = {"rotas": [], "transito": zonas_transito}
+        instancia = como_instancia(pontos_dados)
+        id_deposito = int(instancia.ids[instancia.deposito])
 
         for i, rota in enumerate(rotas_finais):
-            detalhes_rota = []
-            carga_rota = 0
-            tem_critico = False
-
-            # Reconstrói os dados da rota a partir dos IDs
-            for id_ponto in rota:
-                if id_ponto == 0:
-                    continue  # Ignora o depósito para a lista de nomes
-
-                # Busca os dados do ponto pelo ID
-                ponto = next(p for p in pontos_dados if p["id"] == id_ponto)
-
-                detalhes_rota.append(ponto["nome"])
-                carga_rota += ponto["carga"]
+            # Reconstrói os dados da rota a partir dos IDs (posições nas colunas),
+            # ignorando o depósito na lista de nomes
+            paradas = instancia.posicoes([id_ponto for id_ponto in rota if id_ponto != id_deposito])
 
-                if ponto.get("prioridade") == "crítica":
-                    tem_critico = True
+            detalhes_rota = [instancia.nome(k) for k in paradas.tolist()]
+            carga_rota = int(instancia.cargas[paradas].sum())
+            tem_critico = bool(instancia.criticos[paradas].any())
 
             # Adiciona o resumo deste veículo ao input da IA
             dados_input["rotas"].append(
@@ -97,7 +170,8 @@ def gerar_instrucoes_llm_v2(rotas_finais, pontos_dados, zonas_transito):
         """
 
         # Envia para a IA processar
-        response = model.generate_content(prompt)
+        with metricas.fase("llm"):
+            response = model.generate_content(prompt)
 
         # Converte a resposta textual da IA em objeto Python (Lista/Dict)
         analise_estruturada = json.loads(response.text)
@@ -0,0 +1,107 @@
+import numpy as np
+
+
+class GradeEspacial:
+    """
+    Índice espacial por grade uniforme (spatial hash) para pontos 2D.
+
+    Os pontos são ordenados pela célula em que caem e cada célula guarda o
+    intervalo correspondente nesse vetor ordenado (formato CSR). Uma consulta
+    por proximidade examina apenas as células que tocam o raio de busca, em
+    vez de medir a distância até todos os pontos.
+    """
+
+    def __init__(self, coords, tamanho_celula):
+        """
+        Args:
+            coords (array): Coordenadas (N, 2) dos pontos (ex: pixels do mapa).
+            tamanho_celula (float): Lado de cada célula, na unidade das coordenadas.
+        """
+        self.coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        self.tamanho_celula = float(tamanho_celula)
+
+        celulas = np.floor(self.coords / self.tamanho_celula).astype(np.int64)
+        self.origem = celulas.min(axis=0) if len(celulas) else np.zeros(2, dtype=np.int64)
+        celulas -= self.origem
+        self.dimensoes = celulas.max(axis=0) + 1 if len(celulas) else np.ones(2, dtype=np.int64)
+
+        # Chave linear da célula -> ordenação estável dos pontos por célula
+        chaves = celulas[:, 1] * self.dimensoes[0] + celulas[:, 0]
+        self.ordem = np.argsort(chaves, kind="stable")
+        chaves_ordenadas = chaves[self.ordem]
+        total = int(self.dimensoes[0] * self.dimensoes[1])
+        self.inicio = np.searchsorted(chaves_ordenadas, np.arange(total + 1))
+
+    def _candidatos(self, x, y, raio):
+        """
+        Índices dos pontos nas células que tocam o quadrado de lado 2*raio em (x, y).
+        """
+        c0 = np.floor((np.array([x, y]) - raio) / self.tamanho_celula).astype(np.int64) - self.origem
+        c1 = np.floor((np.array([x, y]) + raio) / self.tamanho_celula).astype(np.int64) - self.origem
+        c0 = np.maximum(c0, 0)
+        c1 = np.minimum(c1, self.dimensoes - 1)
+        if (c1 < c0).any():
+            return np.empty(0, dtype=np.int64)
+
+        partes = []
+        for cy in range(c0[1], c1[1] + 1):
+            # Células consecutivas de uma mesma linha formam um único intervalo
+            base = cy * self.dimensoes[0]
+            partes.append(self.ordem[self.inicio[base + c0[0]] : self.inicio[base + c1[0] + 1]])
+        return np.concatenate(partes)
+
+    def mais_proximo(self, x, y, raio):
+        """
+        Retorna o índice do ponto mais próximo de (x, y) dentro de `raio`, ou None.
+        """
+        candidatos = self._candidatos(x, y, raio)
+        if len(candidatos) == 0:
+            return None
+
+        delta = self.coords[candidatos] - (x, y)
+        dist2 = (delta**2).sum(axis=1)
+        melhor = np.argmin(dist2)
+        if dist2[melhor] >= raio**2:
+            return None
+        return int(candidatos[melhor])
+
+    def no_retangulo(self, x0, y0, x1, y1):
+        """
+        Índices dos pontos dentro do retângulo [x0, x1] x [y0, y1].
+        """
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        candidatos = self._candidatos(cx, cy, max(x1 - x0, y1 - y0) / 2)
+        pts = self.coords[candidatos]
+        dentro = (pts[:, 0] >= x0) & (pts[:, 0] <= x1) & (pts[:, 1] >= y0) & (pts[:, 1] <= y1)
+        return candidatos[dentro]
+
+
+def agrupar_pontos(coords, tamanho_celula, pesos=None):
+    """
+    Agrupa pontos por célula de uma grade uniforme (nível de detalhe reduzido).
+
+    Args:
+        coords (array): Coordenadas (N, 2).
+        tamanho_celula (float): Lado da célula de agrupamento.
+        pesos (array): Valor opcional somado por grupo (ex: 1 para pontos críticos).
+
+    Returns:
+        tuple: (centroides (G, 2), contagens (G,), soma_pesos (G,))
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    if len(coords) == 0:
+        return np.zeros((0, 2)), np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    celulas = np.floor(coords / tamanho_celula).astype(np.int64)
+    _, grupo = np.unique(celulas, axis=0, return_inverse=True)
+    grupo = grupo.ravel()
+
+    contagens = np.bincount(grupo)
+    centroides = np.column_stack(
+        (
+            np.bincount(grupo, weights=coords[:, 0]) / contagens,
+            np.bincount(grupo, weights=coords[:, 1]) / contagens,
+        )
+    )
+    soma_pesos = np.bincount(grupo, weights=pesos) if pesos is not None else np.zeros(len(contagens))
+    return centroides, contagens, soma_pesos
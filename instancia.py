@@ -0,0 +1,339 @@
+import functools
+import json
+import math
+import os
+
+import numpy as np
+
+from janelas import TEMPO_POR_GRAU
+
+# Códigos de prioridade (coluna int8). "critica" sem acento é aceito na entrada.
+PRIORIDADES = ("regular", "alta", "crítica")
+REGULAR, ALTA, CRITICA = range(len(PRIORIDADES))
+_CODIGO_PRIORIDADE = {nome: codigo for codigo, nome in enumerate(PRIORIDADES)}
+_CODIGO_PRIORIDADE["critica"] = CRITICA
+
+# Arquivos de cada coluna no formato em diretório (um .npy por coluna, mapeável em memória)
+_COLUNAS = ("ids", "coords", "cargas", "prioridades", "codigos_nome")
+# Colunas de tempo: gravadas só em instâncias com janelas (arquivos antigos não as têm)
+_COLUNAS_TEMPO = ("janelas_inicio", "janelas_fim", "tempos_servico")
+
+
+def como_instancia(pontos):
+    """
+    Garante a representação em colunas: listas de dicionários são convertidas
+    (uma única vez, na entrada) e instâncias são retornadas como estão.
+    """
+    if isinstance(pontos, InstanciaVRP):
+        return pontos
+    return InstanciaVRP.de_pontos(pontos)
+
+
+def _coluna_tempo(valores, n, padrao):
+    if valores is None:
+        return np.full(n, padrao, dtype=np.float64)
+    return np.asarray(valores, dtype=np.float64)
+
+
+def codigo_prioridade(nome):
+    """
+    Converte o nome da prioridade em código (desconhecidas contam como regular).
+    """
+    return _CODIGO_PRIORIDADE.get(nome, REGULAR)
+
+
+class InstanciaVRP:
+    """
+    Instância do VRP em colunas (struct-of-arrays), em vez de uma lista de dicionários.
+
+    Cada local é uma posição dos arrays: `ids` (int64), `coords` (N, 2) float64,
+    `cargas` int32 e `prioridades` int8 (códigos de `PRIORIDADES`). Os nomes, que
+    só interessam aos relatórios, ficam à parte: um vocabulário `rotulos` e o
+    código de cada local em `codigos_nome`, formatados sob demanda com
+    `modelo_nome` (ex: "{rotulo} - Unidade {id}"; o depósito usa só o rótulo).
+
+    Janelas de tempo são opcionais: `janelas_inicio`/`janelas_fim` (minutos
+    desde o início do turno; fim infinito = sem janela) e `tempos_servico`
+    (minutos parado em cada entrega). No depósito, a janela é o turno: a frota
+    sai na abertura e precisa voltar até o fechamento.
+
+    Os arrays podem ser `np.memmap` (ver `carregar`), então instâncias muito
+    grandes são lidas do disco apenas nas partes acessadas.
+    """
+
+    def __init__(
+        self,
+        coords,
+        cargas,
+        prioridades=None,
+        ids=None,
+        deposito=0,
+        capacidade=None,
+        rotulos=None,
+        codigos_nome=None,
+        modelo_nome="{rotulo}",
+        janelas_inicio=None,
+        janelas_fim=None,
+        tempos_servico=None,
+        tempo_por_distancia=TEMPO_POR_GRAU,
+    ):
+        """
+        Args:
+            coords (array): Coordenadas (N, 2) em graus (lat, lon).
+            cargas (array): Carga de cada local (o depósito tem 0).
+            prioridades (array): Códigos de prioridade (padrão: todos regulares).
+            ids (array): ID de cada local (padrão: 0..N-1).
+            deposito (int): Posição do depósito nos arrays.
+            capacidade (int): Capacidade dos veículos, se fizer parte da instância.
+            rotulos (list): Vocabulário de nomes.
+            codigos_nome (array): Posição em `rotulos` de cada local (-1: sem nome).
+            modelo_nome (str): Formato do nome das entregas.
+            janelas_inicio (array): Abertura da janela de cada local (padrão: 0).
+            janelas_fim (array): Fechamento da janela (padrão: infinito).
+            tempos_servico (array): Tempo de serviço em cada local (padrão: 0).
+            tempo_por_distancia (float): Minutos de viagem por unidade de
+                coordenada (padrão: graus a 40 km/h).
+        """
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        n = len(self.coords)
+        self.cargas = np.asarray(cargas, dtype=np.int32)
+        self.prioridades = (
+            np.zeros(n, dtype=np.int8)
+            if prioridades is None
+            else np.asarray(prioridades, dtype=np.int8)
+        )
+        self.ids = np.arange(n, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        self.deposito = int(deposito)
+        self.capacidade = capacidade
+        self.rotulos = list(rotulos) if rotulos is not None else []
+        self.codigos_nome = (
+            np.full(n, -1, dtype=np.int32)
+            if codigos_nome is None
+            else np.asarray(codigos_nome, dtype=np.int32)
+        )
+        self.modelo_nome = modelo_nome
+        self.janelas_inicio = _coluna_tempo(janelas_inicio, n, 0.0)
+        self.janelas_fim = _coluna_tempo(janelas_fim, n, np.inf)
+        self.tempos_servico = _coluna_tempo(tempos_servico, n, 0.0)
+        self.tempo_por_distancia = float(tempo_por_distancia)
+        self._posicao = None
+
+        if not (
+            len(self.cargas)
+            == len(self.prioridades)
+            == len(self.ids)
+            == len(self.janelas_inicio)
+            == len(self.janelas_fim)
+            == len(self.tempos_servico)
+            == n
+        ):
+            raise ValueError("Todas as colunas da instância precisam ter o mesmo tamanho.")
+
+    def __len__(self):
+        return len(self.coords)
+
+    # --- Acesso ---
+
+    def posicao(self, id_ponto):
+        """
+        Posição (índice nos arrays) do local com o ID informado.
+        """
+        if self._posicao is None:
+            self._posicao = {int(i): k for k, i in enumerate(self.ids.tolist())}
+        return self._posicao[id_ponto]
+
+    def posicoes(self, ids):
+        """
+        Posições de vários IDs de uma vez (vetorizado).
+
+        Raises:
+            KeyError: Algum ID não existe na instância.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if ids.size == 0:
+            return ids
+        if self.ids_sequenciais:
+            if ids.min() < 0 or ids.max() >= len(self):
+                raise KeyError(self._ids_desconhecidos(ids))
+            return ids
+        # searchsorted devolve o ponto de inserção de um ID ausente: confere o resultado
+        ordem = np.searchsorted(self.ids, ids, sorter=self._ordem_ids)
+        posicoes = self._ordem_ids[np.minimum(ordem, len(self) - 1)]
+        if not np.array_equal(self.ids[posicoes], ids):
+            raise KeyError(self._ids_desconhecidos(ids))
+        return posicoes
+
+    def _ids_desconhecidos(self, ids):
+        return sorted(set(ids.ravel().tolist()) - set(self.ids.tolist()))
+
+    @functools.cached_property
+    def _ordem_ids(self):
+        return np.argsort(self.ids, kind="stable")
+
+    @functools.cached_property
+    def ids_sequenciais(self):
+        """
+        True se os IDs são 0..N-1 na ordem dos arrays (ID == posição).
+        """
+        return bool(len(self) == 0 or (self.ids[0] == 0 and np.all(np.diff(self.ids) == 1)))
+
+    @functools.cached_property
+    def criticos(self):
+        """
+        Máscara dos locais com prioridade crítica.
+        """
+        return self.prioridades == CRITICA
+
+    @functools.cached_property
+    def tem_janelas(self):
+        """
+        True se algum local tem fim de janela (só então há restrição de tempo;
+        sem janelas, o solver usa a divisão apenas por capacidade).
+        """
+        return bool(np.isfinite(self.janelas_fim).any())
+
+    def nome(self, k):
+        """
+        Nome do local na posição `k`.
+        """
+        codigo = int(self.codigos_nome[k])
+        if codigo < 0:
+            return "Depósito" if k == self.deposito else f"Local {int(self.ids[k])}"
+        if k == self.deposito:
+            return self.rotulos[codigo]
+        return self.modelo_nome.format(rotulo=self.rotulos[codigo], id=int(self.ids[k]))
+
+    @property
+    def nomes(self):
+        return [self.nome(k) for k in range(len(self))]
+
+    # --- Conversões ---
+
+    @classmethod
+    def de_pontos(cls, pontos, capacidade=None):
+        """
+        Constrói a instância a partir da lista de dicionários usada no projeto
+        (ex: saída de `main.gerar_cenario` ou `model_dump()` da API).
+        """
+        rotulos, codigos = {}, []
+        for p in pontos:
+            codigos.append(rotulos.setdefault(p.get("nome", ""), len(rotulos)))
+
+        deposito = next(
+            (k for k, p in enumerate(pontos) if p.get("tipo") == "deposito"),
+            next((k for k, p in enumerate(pontos) if p["id"] == 0), 0),
+        )
+
+        def tempo(chave, padrao):
+            return [padrao if p.get(chave) is None else p[chave] for p in pontos]
+
+        return cls(
+            coords=[p["coord"] for p in pontos],
+            cargas=[p.get("carga", 0) for p in pontos],
+            prioridades=[codigo_prioridade(p.get("prioridade", "regular")) for p in pontos],
+            ids=[p["id"] for p in pontos],
+            deposito=deposito,
+            capacidade=capacidade,
+            rotulos=list(rotulos),
+            codigos_nome=codigos,
+            janelas_inicio=tempo("janela_inicio", 0.0),
+            janelas_fim=tempo("janela_fim", np.inf),
+            tempos_servico=tempo("tempo_servico", 0.0),
+        )
+
+    def para_pontos(self):
+        """
+        Converte para a lista de dicionários (compatível com o restante do projeto).
+        As chaves de tempo ('janela_inicio', 'janela_fim' e 'tempo_servico')
+        só aparecem em instâncias com janelas (sem fechamento: None).
+        """
+        coords = self.coords.tolist()
+        cargas = self.cargas.tolist()
+        prioridades = self.prioridades.tolist()
+        ids = self.ids.tolist()
+        pontos = [
+            {
+                "id": ids[k],
+                "nome": self.nome(k),
+                "coord": tuple(coords[k]),
+                "tipo": "deposito" if k == self.deposito else "entrega",
+                "carga": cargas[k],
+                "prioridade": PRIORIDADES[prioridades[k]],
+            }
+            for k in range(len(self))
+        ]
+        if self.tem_janelas:
+            for p, inicio, fim, servico in zip(
+                pontos,
+                self.janelas_inicio.tolist(),
+                self.janelas_fim.tolist(),
+                self.tempos_servico.tolist(),
+            ):
+                p["janela_inicio"] = inicio
+                p["janela_fim"] = fim if math.isfinite(fim) else None
+                p["tempo_servico"] = servico
+        return pontos
+
+    # --- Persistência ---
+
+    def _metadados(self):
+        return {
+            "deposito": self.deposito,
+            "capacidade": self.capacidade,
+            "rotulos": self.rotulos,
+            "modelo_nome": self.modelo_nome,
+            "tempo_por_distancia": self.tempo_por_distancia,
+        }
+
+    def salvar(self, caminho, comprimir=False):
+        """
+        Salva a instância em colunas.
+
+        Args:
+            caminho (str): Arquivo '.npz' (compacto, um arquivo só) ou diretório
+                com um '.npy' por coluna (permite mapear em memória na leitura).
+            comprimir (bool): Compacta o '.npz' (menor, porém sem leitura parcial rápida).
+        """
+        colunas = {c: getattr(self, c) for c in _COLUNAS}
+        if self.tem_janelas:
+            colunas.update({c: getattr(self, c) for c in _COLUNAS_TEMPO})
+        metadados = json.dumps(self._metadados(), ensure_ascii=False)
+
+        if caminho.endswith(".npz"):
+            salvar_npz = np.savez_compressed if comprimir else np.savez
+            salvar_npz(caminho, metadados=np.array(metadados), **colunas)
+            return
+
+        os.makedirs(caminho, exist_ok=True)
+        for nome, dados in colunas.items():
+            np.save(os.path.join(caminho, f"{nome}.npy"), np.ascontiguousarray(dados))
+        for nome in _COLUNAS_TEMPO:
+            # Sobrescrevendo um diretório: não deixa janelas de outra instância
+            if nome not in colunas and os.path.exists(os.path.join(caminho, f"{nome}.npy")):
+                os.remove(os.path.join(caminho, f"{nome}.npy"))
+        with open(os.path.join(caminho, "metadados.json"), "w", encoding="utf-8") as f:
+            f.write(metadados)
+
+    @classmethod
+    def carregar(cls, caminho, mmap=True):
+        """
+        Lê uma instância salva por `salvar`.
+
+        No formato em diretório, com `mmap=True`, as colunas são mapeadas em
+        memória (somente leitura) e só as páginas acessadas são lidas do disco.
+        """
+        if caminho.endswith(".npz"):
+            with np.load(caminho) as arquivo:
+                metadados = json.loads(str(arquivo["metadados"]))
+                colunas = {c: arquivo[c] for c in _COLUNAS + _COLUNAS_TEMPO if c in arquivo}
+        else:
+            modo = "r" if mmap else None
+            colunas = {
+                c: np.load(os.path.join(caminho, f"{c}.npy"), mmap_mode=modo)
+                for c in _COLUNAS + _COLUNAS_TEMPO
+                if c in _COLUNAS or os.path.exists(os.path.join(caminho, f"{c}.npy"))
+            }
+            with open(os.path.join(caminho, "metadados.json"), "r", encoding="utf-8") as f:
+                metadados = json.load(f)
+
+        return cls(**colunas, **metadados)
@@ -0,0 +1,140 @@
+import csv
+import math
+import os
+
+# Diretório com as instâncias padrão incluídas no projeto
+DIR_INSTANCIAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instancias")
+
+
+def ler_vrp(caminho):
+    """
+    Lê uma instância no formato CVRPLIB/TSPLIB (.vrp).
+
+    Suporta o cabeçalho "CHAVE : valor" e as seções NODE_COORD_SECTION,
+    DEMAND_SECTION e DEPOT_SECTION (coordenadas 2D, um depósito).
+
+    Args:
+        caminho (str): Caminho do arquivo .vrp.
+
+    Returns:
+        dict: Instância com 'nome', 'capacidade', 'tipo_aresta', 'coords'
+        {nó: (x, y)}, 'demandas' {nó: carga} e 'deposito' (nó do depósito).
+    """
+    cabecalho = {}
+    coords, demandas, depositos = {}, {}, []
+    secao = None
+
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha or linha == "EOF":
+                continue
+
+            # Início de seção (ex: NODE_COORD_SECTION)
+            if linha.endswith("SECTION"):
+                secao = linha
+                continue
+
+            # Linha de cabeçalho (ex: "CAPACITY : 100")
+            if ":" in linha and linha[0] not in "-0123456789":
+                chave, valor = linha.split(":", 1)
+                cabecalho[chave.strip().upper()] = valor.strip()
+                secao = None
+                continue
+
+            valores = linha.split()
+            if secao == "NODE_COORD_SECTION":
+                coords[int(valores[0])] = (float(valores[1]), float(valores[2]))
+            elif secao == "DEMAND_SECTION":
+                demandas[int(valores[0])] = int(valores[1])
+            elif secao == "DEPOT_SECTION":
+                if int(valores[0]) >= 0:
+                    depositos.append(int(valores[0]))
+
+    if "CAPACITY" not in cabecalho or not coords:
+        raise ValueError(f"Arquivo '{caminho}' não é uma instância CVRP válida.")
+
+    return {
+        "nome": cabecalho.get("NAME", os.path.splitext(os.path.basename(caminho))[0]),
+        "comentario": cabecalho.get("COMMENT", ""),
+        "capacidade": int(float(cabecalho["CAPACITY"])),
+        "tipo_aresta": cabecalho.get("EDGE_WEIGHT_TYPE", "EUC_2D"),
+        "coords": coords,
+        "demandas": demandas,
+        "deposito": depositos[0] if depositos else min(coords),
+    }
+
+
+def para_pontos(instancia):
+    """
+    Converte uma instância CVRPLIB para a lista de pontos usada pelo projeto.
+    O depósito recebe o ID 0 e os clientes os IDs 1..n na ordem do arquivo.
+
+    Returns:
+        list: Dicionários no mesmo formato de `main.gerar_cenario`.
+    """
+    deposito = instancia["deposito"]
+    nos = [deposito] + [n for n in sorted(instancia["coords"]) if n != deposito]
+
+    pontos = []
+    for novo_id, no in enumerate(nos):
+        eh_deposito = no == deposito
+        pontos.append(
+            {
+                "id": novo_id,
+                "nome": f"{instancia['nome']} - {'Depósito' if eh_deposito else f'Nó {no}'}",
+                "coord": instancia["coords"][no],
+                "tipo": "deposito" if eh_deposito else "entrega",
+                "carga": 0 if eh_deposito else instancia["demandas"].get(no, 0),
+                "prioridade": "regular",
+            }
+        )
+    return pontos
+
+
+def custo_cvrplib(rotas, pontos):
+    """
+    Custo das rotas na métrica oficial do CVRPLIB (EUC_2D): distância
+    Euclidiana arredondada para o inteiro mais próximo em cada aresta.
+    É a métrica dos valores de referência (BKS).
+    """
+    coords = {p["id"]: p["coord"] for p in pontos}
+    total = 0
+    for rota in rotas:
+        for a, b in zip(rota, rota[1:]):
+            total += int(math.dist(coords[a], coords[b]) + 0.5)
+    return total
+
+
+def carregar_bks(caminho=None):
+    """
+    Lê a tabela de melhores soluções conhecidas (Best Known Solutions).
+
+    Returns:
+        dict: {nome_instancia: {'bks': float, 'otimo': bool, ...}}
+    """
+    caminho = caminho or os.path.join(DIR_INSTANCIAS, "bks.csv")
+    with open(caminho, "r", encoding="utf-8") as f:
+        return {
+            linha["nome"]: {
+                "bks": float(linha["bks"]),
+                "otimo": linha["otimo"] == "sim",
+                "capacidade": int(linha["capacidade"]),
+                "veiculos_min": int(linha["veiculos_min"]),
+            }
+            for linha in csv.DictReader(f)
+        }
+
+
+def listar_instancias(diretorio=DIR_INSTANCIAS):
+    """
+    Lista os arquivos .vrp de um diretório, do menor para o maior (pelo nome).
+    """
+    arquivos = [a for a in os.listdir(diretorio) if a.endswith(".vrp")]
+
+    def dimensao(nome):
+        # "A-n32-k5" -> 32
+        partes = [p for p in nome.split("-") if p.startswith("n") and p[1:].isdigit()]
+        return int(partes[0][1:]) if partes else 0
+
+    return [os.path.join(diretorio, a) for a in sorted(arquivos, key=lambda a: (dimensao(a), a))]
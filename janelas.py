@@ -0,0 +1,276 @@
+import math
+
+import numpy as np
+
+# Minutos por grau de coordenada a 40 km/h (1 grau ~ 111,139 km), a mesma
+# velocidade padrão do SimuladorFrota. Instâncias em outras unidades informam
+# `tempo_por_distancia` (ex: 1.0 nas instâncias de Solomon).
+TEMPO_POR_GRAU = 111.139 / 40.0 * 60.0
+
+# Peso do atraso (time warp) no custo: cada minuto de atraso custa
+# PENALIDADE_ATRASO vezes a distância percorrida em um minuto
+PENALIDADE_ATRASO = 10.0
+
+_EPS = 1e-9
+
+
+def _viagens(inst, origens, destinos):
+    """
+    Tempo de viagem (minutos) entre pares de posições, vetorizado.
+    """
+    trechos = inst.coords[destinos] - inst.coords[origens]
+    return np.sqrt(trechos[:, 0] ** 2 + trechos[:, 1] ** 2) * inst.tempo_por_distancia
+
+
+def _servicos(inst, caminho):
+    # O tempo de serviço do depósito não conta (a rota sai na abertura do turno)
+    servico = inst.tempos_servico[caminho].tolist()
+    servico[0] = servico[-1] = 0.0
+    return servico
+
+
+def penalidade(inst, atraso):
+    """
+    Converte o atraso (minutos) para a unidade de custo das rotas (distância).
+    """
+    return PENALIDADE_ATRASO * atraso / inst.tempo_por_distancia
+
+
+def cortes_janelas(inst, posicoes, cap_max):
+    """
+    Divisão gulosa da sequência de entregas respeitando capacidade e janelas.
+
+    Uma rota nova começa quando a próxima entrega não cabe no veículo, chegaria
+    depois do fim da sua janela ou impediria a volta ao depósito dentro do
+    turno. Tudo o que não depende do início da rota é calculado de uma vez e
+    vetorizado: o passo entre entregas consecutivas (serviço + viagem), o
+    horário mais cedo de cada entrega saindo direto do depósito e o início mais
+    tarde em que cada entrega ainda permite voltar a tempo. Assim, cada decisão
+    da divisão é O(1).
+
+    Uma entrega que não é atendida a tempo nem sozinha fica em uma rota própria
+    e o excesso conta como atraso (time warp: o horário volta ao fim da janela).
+
+    Returns:
+        tuple: (cortes, primeira_vazia, atraso) como em `_cortes_capacidade`,
+        mais o atraso total em minutos.
+    """
+    n = len(posicoes)
+    if n == 0:
+        return [], False, 0.0
+    d = inst.deposito
+    fim_turno = inst.janelas_fim[d]
+    abre = inst.janelas_inicio[posicoes]
+    servico = inst.tempos_servico[posicoes]
+
+    # Distâncias são simétricas: a volta ao depósito custa o mesmo que a ida
+    coords = inst.coords[posicoes]
+    ida = np.sqrt(((coords - inst.coords[d]) ** 2).sum(axis=1)) * inst.tempo_por_distancia
+    trechos = np.diff(coords, axis=0)
+    passo = np.empty(n)
+    passo[0] = 0.0
+    passo[1:] = servico[:-1] + np.sqrt(trechos[:, 0] ** 2 + trechos[:, 1] ** 2) * inst.tempo_por_distancia
+
+    # Início mais tarde viável: dentro da janela e com tempo de voltar no turno
+    limite = np.minimum(inst.janelas_fim[posicoes], fim_turno - servico - ida).tolist()
+    # Início mais cedo abrindo uma rota nova (saindo na abertura do turno)
+    primeiro = np.maximum(inst.janelas_inicio[d] + ida, abre).tolist()
+    passo = passo.tolist()
+    abre = abre.tolist()
+    cargas = inst.cargas[posicoes].tolist()
+
+    cortes = []
+    atraso = 0.0
+    carga = cargas[0]
+    inicio = primeiro[0]
+    if inicio > limite[0]:
+        atraso += inicio - limite[0]
+        inicio = limite[0]
+    for k in range(1, n):
+        tempo = inicio + passo[k]
+        if tempo < abre[k]:
+            tempo = abre[k]
+        carga += cargas[k]
+        if carga <= cap_max and tempo <= limite[k]:
+            inicio = tempo
+            continue
+        cortes.append(k)
+        carga = cargas[k]
+        inicio = primeiro[k]
+        if inicio > limite[k]:
+            # Inalcançável mesmo sozinha: o horário volta ao limite (time warp)
+            atraso += inicio - limite[k]
+            inicio = limite[k]
+
+    return cortes, cargas[0] > cap_max, atraso
+
+
+def atraso_rota(inst, posicoes):
+    """
+    Simula uma rota (posições nos arrays, começando e terminando no depósito)
+    e retorna o atraso total em minutos (0 = todas as janelas respeitadas).
+    """
+    posicoes = np.asarray(posicoes)
+    viagens = _viagens(inst, posicoes[:-1], posicoes[1:]).tolist()
+    abre = inst.janelas_inicio[posicoes].tolist()
+    fecha = inst.janelas_fim[posicoes].tolist()
+    servico = _servicos(inst, posicoes)
+
+    atraso = 0.0
+    tempo = abre[0]
+    for k in range(1, len(posicoes)):
+        tempo = max(tempo + servico[k - 1] + viagens[k - 1], abre[k])
+        if tempo > fecha[k]:
+            atraso += tempo - fecha[k]
+            tempo = fecha[k]
+    return atraso
+
+
+# --- Segmentos de rota (Vidal et al., 2013) ---
+# Um segmento (trecho contíguo de uma rota) é resumido por (duração, atraso,
+# início mais cedo, início mais tarde): duração inclui serviço, viagem e espera;
+# os horários são do início do serviço no primeiro local. A concatenação de dois
+# segmentos é O(1), então, com os resumos dos prefixos e sufixos da rota, o
+# atraso de uma rota modificada sai sem simulá-la de novo.
+
+
+def segmento(inicio, fim, servico):
+    """
+    Segmento de um único local.
+    """
+    return (servico, 0.0, inicio, fim)
+
+
+def concatenar(s1, s2, viagem):
+    """
+    Resumo do segmento s1 seguido de s2, com `viagem` minutos entre eles.
+    """
+    duracao1, atraso1, cedo1, tarde1 = s1
+    duracao2, atraso2, cedo2, tarde2 = s2
+    delta = duracao1 - atraso1 + viagem
+    espera = max(cedo2 - delta - tarde1, 0.0)
+    atraso = max(cedo1 + delta - tarde2, 0.0)
+    return (
+        duracao1 + duracao2 + viagem + espera,
+        atraso1 + atraso2 + atraso,
+        max(cedo2 - delta, cedo1) - espera,
+        min(tarde2 - delta, tarde1) + atraso,
+    )
+
+
+def _prefixos_sufixos(nos, ordem, viagem):
+    prefixos = [nos[ordem[0]]]
+    for k in range(1, len(ordem)):
+        prefixos.append(concatenar(prefixos[-1], nos[ordem[k]], viagem[ordem[k - 1]][ordem[k]]))
+    sufixos = [nos[ordem[-1]]]
+    for k in range(len(ordem) - 2, -1, -1):
+        sufixos.append(concatenar(nos[ordem[k]], sufixos[-1], viagem[ordem[k]][ordem[k + 1]]))
+    return prefixos, sufixos[::-1]
+
+
+def aplicar_2opt_janelas(rota, inst):
+    """
+    2-opt de uma rota com janelas de tempo (mesma vizinhança de `aplicar_2opt`).
+
+    Cada inversão do trecho i..j é avaliada em O(1): o trecho invertido cresce
+    um local por vez (j crescente) e é concatenado aos resumos já calculados do
+    prefixo (até i-1) e do sufixo (a partir de j+1). Um movimento é aceito se
+    reduz o atraso, ou se encurta a rota sem aumentar o atraso.
+
+    Args:
+        rota (list): IDs da rota (começa e termina no depósito).
+        inst (InstanciaVRP): Instância com as janelas.
+
+    Returns:
+        list: A rota otimizada.
+    """
+    if len(rota) < 4:  # Até uma entrega: não há o que inverter
+        return list(rota)
+    posicoes = inst.posicoes(rota)
+    coords = inst.coords[posicoes]
+    delta = coords[:, None, :] - coords[None, :, :]
+    custo = np.sqrt(delta[..., 0] ** 2 + delta[..., 1] ** 2)
+    viagem = (custo * inst.tempo_por_distancia).tolist()
+    custo = custo.tolist()
+    nos = [
+        segmento(a, f, s)
+        for a, f, s in zip(
+            inst.janelas_inicio[posicoes].tolist(),
+            inst.janelas_fim[posicoes].tolist(),
+            _servicos(inst, posicoes),
+        )
+    ]
+
+    # Índices na rota original (como em `aplicar_2opt`)
+    ordem = list(range(len(rota)))
+    otimizou = True
+    while otimizou:
+        otimizou = False
+        prefixos, sufixos = _prefixos_sufixos(nos, ordem, viagem)
+        i = 1
+        while i < len(ordem) - 2:
+            a, b = ordem[i - 1], ordem[i]
+            atraso_atual = prefixos[-1][1]
+            invertido = nos[b]
+            for j in range(i + 1, len(ordem) - 1):
+                c, d = ordem[j], ordem[j + 1]
+                invertido = concatenar(nos[c], invertido, viagem[c][ordem[j - 1]])
+                nova = concatenar(
+                    concatenar(prefixos[i - 1], invertido, viagem[a][c]),
+                    sufixos[j + 1],
+                    viagem[b][d],
+                )
+                ganho = custo[a][b] + custo[c][d] - custo[a][c] - custo[b][d]
+                if nova[1] < atraso_atual - _EPS or (
+                    nova[1] <= atraso_atual + _EPS and ganho > _EPS
+                ):
+                    # Aplica e refaz os resumos; segue testando a partir do mesmo i
+                    ordem[i : j + 1] = reversed(ordem[i : j + 1])
+                    prefixos, sufixos = _prefixos_sufixos(nos, ordem, viagem)
+                    otimizou = True
+                    break
+            else:
+                i += 1
+
+    return [rota[k] for k in ordem]
+
+
+def folgas(inst, rota, tempo_viagem):
+    """
+    Horários de uma rota para testar inserções em O(1) (Savelsbergh, 1992).
+
+    Args:
+        inst (InstanciaVRP): Instância.
+        rota (list): Posições das entregas (sem o depósito).
+        tempo_viagem (array): Matriz de tempos de viagem entre posições.
+
+    Returns:
+        tuple: Listas com um valor por aresta da rota (depósito -> 1ª entrega,
+        ..., última -> depósito): a saída do local de origem, o início do
+        serviço no destino e a folga do destino (atraso máximo que o início
+        do serviço nele pode sofrer sem violar nenhuma janela dali em diante).
+    """
+    d = inst.deposito
+    caminho = [d] + list(rota) + [d]
+    abre = inst.janelas_inicio[caminho].tolist()
+    fecha = inst.janelas_fim[caminho].tolist()
+    servico = _servicos(inst, caminho)
+
+    viagens = tempo_viagem[caminho[:-1], caminho[1:]].tolist()
+
+    inicios = [abre[0]]
+    esperas = [0.0]
+    for k in range(1, len(caminho)):
+        chegada = inicios[-1] + servico[k - 1] + viagens[k - 1]
+        inicios.append(max(chegada, abre[k]))
+        esperas.append(inicios[-1] - chegada)
+
+    # Folga para a frente: min(fim da janela - início), descontando as esperas
+    # que absorvem parte do atraso antes de cada local seguinte
+    folga = [math.inf] * len(caminho)
+    folga[-1] = fecha[-1] - inicios[-1]
+    for k in range(len(caminho) - 2, 0, -1):
+        folga[k] = min(fecha[k] - inicios[k], esperas[k + 1] + folga[k + 1])
+
+    saidas = [inicios[k] + servico[k] for k in range(len(caminho) - 1)]
+    return saidas, inicios[1:], folga[1:]
@@ -1,73 +1,281 @@
-import algoritmo_genetico as ag
-import visualizacao_pygame as vis_pg
 import ia_relatorios as ia
+import instancias_cvrplib as cvrplib
+import cenarios
+from instancia import InstanciaVRP
+import solvers
+import argparse
+import contextlib
+import os
 import random
 import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import matplotlib.pyplot as plt
 
 
 # --- CARGA DE CONFIGURAÇÕES ---
-def carregar_configuracoes():
+def carregar_configuracoes(caminho="config.json"):
     """
-    Lê os parâmetros do projeto a partir do arquivo 'config.json'.
+    Lê os parâmetros do projeto a partir de um arquivo JSON (padrão: 'config.json').
     Caso o arquivo não exista, retorna None e exibe erro.
     """
     try:
-        with open("config.json", "r", encoding="utf-8") as f:
+        with open(caminho, "r", encoding="utf-8") as f:
             return json.load(f)
     except FileNotFoundError:
-        print("[ERRO] O arquivo 'config.json' não foi encontrado.")
+        print(f"[ERRO] O arquivo '{caminho}' não foi encontrado.")
         return None
 
 
 # --- GERADOR DE CENÁRIO ---
-def gerar_cenario(config):
+def gerar_cenario(config, semente=None):
     """
-    Cria a lista de pontos (HUB + Entregas) com base nas configurações.
+    Cria a instância (HUB + Entregas) com base nas configurações.
     Gera coordenadas aleatórias em torno de um ponto central (SP).
 
+    A geração é vetorizada (`cenarios.gerar_instancia`); chaves opcionais do
+    config escolhem a distribuição espacial ('distribuicao'), a de cargas
+    ('demanda'), a proporção de prioridades ('mix_prioridades') e janelas de
+    tempo ('largura_janela', 'horizonte' e 'tempo_servico', em minutos).
+
     Args:
         config (dict): Dicionário com configurações carregadas.
+        semente (int): Semente do cenário (padrão: chave 'semente' do config, se houver).
 
     Returns:
-        list: Lista de dicionários representando os locais.
+        InstanciaVRP: Locais em colunas (`para_pontos` dá a lista de dicionários).
     """
-    pontos = []
-    centro_lat, centro_lon = config["centro_sp"]
-
-    # 1. Criação do Depósito Central (HUB)
-    # O ID 0 é reservado obrigatoriamente para o ponto de partida/chegada.
-    pontos.append(
-        {
-            "id": 0,
-            "nome": "CENTRAL DE LOGÍSTICA (Hosp. das Clínicas)",
-            "coord": (centro_lat, centro_lon),
-            "tipo": "deposito",
-            "carga": 0,
-        }
+    return cenarios.gerar_instancia(
+        config["qtd_pontos"],
+        semente=config.get("semente") if semente is None else semente,
+        centro=tuple(config["centro_sp"]),
+        distribuicao=config.get("distribuicao", "uniforme"),
+        demanda=config.get("demanda", "uniforme"),
+        mix_prioridades=config.get("mix_prioridades"),
+        nomes_locais=config["nomes_locais"],
+        largura_janela=config.get("largura_janela"),
+        horizonte=config.get("horizonte", 480.0),
+        tempo_servico=config.get("tempo_servico", 0.0),
     )
 
-    # 2. Geração de Entregas (Hospitais/Pacientes)
-    for i in range(1, config["qtd_pontos"]):
-        # Gera uma dispersão aleatória em torno do centro (simulação de endereços)
-        lat = centro_lat + random.uniform(-0.08, 0.08)
-        lon = centro_lon + random.uniform(-0.08, 0.08)
-
-        # Define aleatoriamente se a entrega é urgente (20% de chance)
-        eh_critico = random.random() < 0.2
-        nome_base = random.choice(config["nomes_locais"])
-
-        pontos.append(
-            {
-                "id": i,
-                "nome": f"{nome_base} - Unidade {i}",
-                "coord": (lat, lon),
-                "prioridade": "crítica" if eh_critico else "regular",
-                "carga": random.randint(5, 25),  # Peso aleatório entre 5kg e 25kg
-                "tipo": "entrega",
+
+def carregar_instancia(caminho, semente=None):
+    """
+    Carrega um arquivo de configuração ou de instância para o modo em lote.
+
+    Um arquivo de configuração segue o formato do 'config.json' e tem seus
+    pontos sorteados por `gerar_cenario`. Um arquivo de instância contém,
+    além dos parâmetros, a chave "pontos" com os locais já definidos
+    (mesmo formato dos dicionários de `InstanciaVRP.para_pontos`).
+    Arquivos .vrp (CVRPLIB) e instâncias em colunas ('.npz' ou diretório,
+    ver `instancia.InstanciaVRP.salvar`) também são aceitos.
+
+    Args:
+        caminho (str): Caminho do arquivo JSON, .vrp, .npz ou diretório.
+        semente (int): Semente do cenário sorteado (arquivos de configuração).
+
+    Returns:
+        tuple: (config, InstanciaVRP)
+    """
+    if caminho.endswith(".npz") or os.path.isdir(caminho):
+        inst = InstanciaVRP.carregar(caminho)
+        if inst.capacidade is None:
+            raise ValueError(f"A instância '{caminho}' não informa a capacidade dos veículos.")
+        config = {
+            "capacidade_veiculo": inst.capacidade,
+            "qtd_pontos": len(inst),
+            "zonas_transito": [],
+        }
+        return config, inst
+
+    if caminho.endswith(".vrp"):
+        vrp = cvrplib.ler_vrp(caminho)
+        inst = InstanciaVRP.de_pontos(cvrplib.para_pontos(vrp), capacidade=vrp["capacidade"])
+        config = {
+            "capacidade_veiculo": vrp["capacidade"],
+            "qtd_pontos": len(inst),
+            "zonas_transito": [],
+        }
+        return config, inst
+
+    with open(caminho, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    if "pontos" in config:
+        inst = InstanciaVRP.de_pontos(config["pontos"])
+        config.setdefault("qtd_pontos", len(inst))
+    else:
+        inst = gerar_cenario(config, semente)
+
+    config.setdefault("zonas_transito", [])
+    return config, inst
+
+
+# --- MODO EM LOTE (HEADLESS) ---
+def processar_instancia(
+    caminho,
+    usar_llm=True,
+    semente=None,
+    geracoes=None,
+    replay=None,
+    formato_replay="mp4",
+    motor=None,
+    tempo_limite=None,
+):
+    """
+    Executa o fluxo sem interface gráfica para um único arquivo:
+    Carga -> Otimização (GA ou ALNS) -> (IA opcional). Não gera gráficos nem abre a simulação.
+
+    Args:
+        caminho (str): Arquivo de configuração ou de instância.
+        usar_llm (bool): Se False, não consulta a API Gemini.
+        semente (int): Semente do gerador aleatório (reprodutibilidade).
+        geracoes (int): Sobrescreve o número de gerações do arquivo.
+        replay (str): Diretório onde gravar a animação do plano (offscreen).
+        formato_replay (str): 'mp4' (via ffmpeg) ou 'png' (um arquivo por frame).
+        motor (str): Sobrescreve o motor do arquivo ('ga' ou 'alns').
+        tempo_limite (float): Sobrescreve o orçamento de tempo do motor (s).
+
+    Returns:
+        dict: Registro serializável em JSON com rotas, custo, histórico e tempos.
+    """
+    registro = {"arquivo": caminho, "semente": semente}
+    inicio = time.perf_counter()
+
+    # Logs dos módulos (GA/IA) vão para stderr para não poluir a saída JSON Lines
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            if semente is not None:
+                random.seed(semente)
+
+            t0 = time.perf_counter()
+            config, instancia = carregar_instancia(caminho, semente)
+            t_carga = time.perf_counter() - t0
+
+            motor = motor or config.get("motor", solvers.MOTOR_PADRAO)
+            t0 = time.perf_counter()
+            rotas, historico = solvers.resolver(
+                instancia,
+                config["capacidade_veiculo"],
+                motor=motor,
+                geracoes=geracoes or config.get("geracoes", 200),
+                tempo_limite=tempo_limite or config.get("tempo_limite_s"),
+                verbose=False,
+                adaptativo=config.get("adaptativo", False),
+            )
+            t_otimizacao = time.perf_counter() - t0
+
+            registro.update(
+                {
+                    "status": "ok",
+                    "motor": motor,
+                    "qtd_pontos": len(instancia),
+                    "veiculos": len(rotas),
+                    "rotas": rotas,
+                    "custo_final": historico[-1],
+                    "distancia_km": historico[-1] * 111.139,
+                    "historico_convergencia": historico,
+                }
+            )
+            # 'ga_s' é o nome antigo de 'otimizacao_s' (vale também para o ALNS),
+            # mantido para quem já lê os JSONL
+            tempos = {"carga_s": t_carga, "otimizacao_s": t_otimizacao, "ga_s": t_otimizacao}
+
+            if usar_llm:
+                t0 = time.perf_counter()
+                registro["analise_inteligente"] = ia.gerar_instrucoes_llm_v2(
+                    rotas, instancia, config["zonas_transito"]
+                )
+                tempos["llm_s"] = time.perf_counter() - t0
+
+            if replay:
+                # Importado aqui: só o modo com replay precisa do Pygame
+                import exportar_animacao
+
+                nome = os.path.splitext(os.path.basename(caminho))[0]
+                destino = os.path.join(replay, nome)
+                if formato_replay != "png":
+                    destino += f".{formato_replay}"
+
+                t0 = time.perf_counter()
+                registro["replay"] = exportar_animacao.renderizar_animacao(
+                    rotas, instancia, config["zonas_transito"], destino
+                )["destino"]
+                tempos["replay_s"] = time.perf_counter() - t0
+
+        except Exception as e:
+            registro.update({"status": "erro", "erro": str(e)})
+            tempos = {}
+
+    tempos["total_s"] = time.perf_counter() - inicio
+    registro["tempos"] = tempos
+    return registro
+
+
+def executar_lote(
+    caminhos,
+    processos=None,
+    usar_llm=True,
+    saida=None,
+    semente=None,
+    geracoes=None,
+    replay=None,
+    formato_replay="mp4",
+    motor=None,
+    tempo_limite=None,
+):
+    """
+    Processa vários arquivos em paralelo (um processo por núcleo) e grava
+    um registro JSON por linha (JSON Lines) à medida que cada um termina.
+
+    Args:
+        caminhos (list): Arquivos de configuração ou de instância.
+        processos (int): Número de processos (padrão: todos os núcleos).
+        usar_llm (bool): Se False, pula a análise da IA.
+        saida (str): Arquivo de saída; se None, escreve em stdout.
+        semente (int): Semente base; o arquivo de índice i usa `semente + i`.
+        geracoes (int): Sobrescreve o número de gerações de todos os arquivos.
+        replay (str): Diretório para as animações de cada plano (opcional).
+        formato_replay (str): 'mp4' ou 'png'.
+        motor (str): Sobrescreve o motor de todos os arquivos ('ga' ou 'alns').
+        tempo_limite (float): Sobrescreve o orçamento de tempo do motor (s).
+
+    Returns:
+        int: Quantidade de arquivos que terminaram com erro.
+    """
+    processos = processos or os.cpu_count() or 1
+    destino = open(saida, "w", encoding="utf-8") if saida else sys.stdout
+    falhas = 0
+
+    try:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            futuros = {
+                executor.submit(
+                    processar_instancia,
+                    caminho,
+                    usar_llm,
+                    None if semente is None else semente + i,
+                    geracoes,
+                    replay,
+                    formato_replay,
+                    motor,
+                    tempo_limite,
+                ): i
+                for i, caminho in enumerate(caminhos)
             }
-        )
-    return pontos
+            for futuro in as_completed(futuros):
+                registro = futuro.result()
+                registro["indice"] = futuros[futuro]
+                if registro["status"] != "ok":
+                    falhas += 1
+                destino.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                destino.flush()
+    finally:
+        if saida:
+            destino.close()
+
+    return falhas
 
 
 # --- ORQUESTRADOR DO PROJETO ---
@@ -85,16 +293,21 @@ def executar_projeto():
     if not config:
         return
 
-    pontos_entrega = gerar_cenario(config)
+    instancia = gerar_cenario(config)
 
-    # 2. Execução do Algoritmo Genético (Motor Matemático)
+    # 2. Execução do motor de otimização (GA por padrão)
     print(
         f"\n[INFO] Otimizando {config['qtd_pontos']} locais para veículos de {config['capacidade_veiculo']}kg..."
     )
 
-    # Chama o módulo algoritmo_genetico.py
-    rotas_finais, historico = ag.executar_ga(
-        pontos_entrega, config["capacidade_veiculo"], geracoes=config["geracoes"]
+    # Chama o motor configurado (padrão: algoritmo_genetico.py)
+    rotas_finais, historico = solvers.resolver(
+        instancia,
+        config["capacidade_veiculo"],
+        motor=config.get("motor", solvers.MOTOR_PADRAO),
+        geracoes=config["geracoes"],
+        tempo_limite=config.get("tempo_limite_s"),
+        adaptativo=config.get("adaptativo", False),
     )
 
     # 3. Geração do Gráfico de Performance
@@ -114,7 +327,7 @@ def executar_projeto():
     try:
         # Chama o módulo ia_relatorios.py
         relatorio_ia = ia.gerar_instrucoes_llm_v2(
-            rotas_finais, pontos_entrega, config["zonas_transito"]
+            rotas_finais, instancia, config["zonas_transito"]
         )
 
         print("\n" + "-" * 40)
@@ -134,10 +347,62 @@ def executar_projeto():
     print(f" -> Frota Ativa: {len(rotas_finais)} veículos.")
 
     # Chama o módulo visualizacao_pygame.py
+    # Importado aqui para que o modo em lote não dependa de Pygame/display
+    import visualizacao_pygame as vis_pg
+
     vis_pg.visualizar_rotas_pygame(
-        rotas_finais, pontos_entrega, config["zonas_transito"]
+        rotas_finais, instancia, config["zonas_transito"]
     )
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    """
+    Ponto de entrada da linha de comando.
+
+    Sem argumentos, executa o fluxo interativo completo (`executar_projeto`).
+    O subcomando `lote` executa vários arquivos sem interface gráfica, ex:
+
+        python main.py lote hubs/*.json -j 8 --sem-llm -o resultados.jsonl
+    """
+    parser = argparse.ArgumentParser(
+        description="Otimização logística hospitalar (VRP)."
+    )
+    subparsers = parser.add_subparsers(dest="comando")
+
+    lote = subparsers.add_parser(
+        "lote", help="Executa vários arquivos em paralelo, sem visualização."
+    )
+    lote.add_argument("arquivos", nargs="+", help="Arquivos de configuração/instância (JSON).")
+    lote.add_argument("-j", "--processos", type=int, default=None, help="Processos paralelos (padrão: nº de núcleos).")
+    lote.add_argument("-o", "--saida", default=None, help="Arquivo JSON Lines de saída (padrão: stdout).")
+    lote.add_argument("--sem-llm", action="store_true", help="Não consulta a API Gemini.")
+    lote.add_argument("--semente", type=int, default=None, help="Semente base para reprodutibilidade.")
+    lote.add_argument("--geracoes", type=int, default=None, help="Sobrescreve o número de gerações.")
+    lote.add_argument("--replay", default=None, help="Diretório para gravar a animação de cada plano.")
+    lote.add_argument("--formato-replay", choices=["mp4", "webm", "png"], default="mp4", help="Formato do replay (mp4/webm via ffmpeg, ou frames PNG).")
+    lote.add_argument("--motor", choices=solvers.listar_motores(), default=None, help="Sobrescreve o motor de otimização.")
+    lote.add_argument("--tempo-limite", type=float, default=None, help="Orçamento de tempo do motor, em segundos.")
+
+    args = parser.parse_args(argv)
+
+    if args.comando == "lote":
+        falhas = executar_lote(
+            args.arquivos,
+            processos=args.processos,
+            usar_llm=not args.sem_llm,
+            saida=args.saida,
+            semente=args.semente,
+            geracoes=args.geracoes,
+            replay=args.replay,
+            formato_replay=args.formato_replay,
+            motor=args.motor,
+            tempo_limite=args.tempo_limite,
+        )
+        return 1 if falhas else 0
+
     executar_projeto()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
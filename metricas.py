@@ -0,0 +1,261 @@
+import contextlib
+import math
+import threading
+import time
+
+# Limites padrão (segundos) dos histogramas de latência, do GA rápido ao LLM lento
+BUCKETS_PADRAO = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class _Metrica:
+    """
+    Base das métricas: um valor por combinação de rótulos (labels).
+    """
+
+    tipo = None
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        self._trava = threading.Lock()
+
+    def _chave(self, valores_rotulos):
+        if len(valores_rotulos) != len(self.rotulos):
+            raise ValueError(f"A métrica '{self.nome}' espera os rótulos {self.rotulos}.")
+        return tuple(str(v) for v in valores_rotulos)
+
+    def _formatar_rotulos(self, chave, extra=()):
+        pares = list(zip(self.rotulos, chave)) + list(extra)
+        if not pares:
+            return ""
+        return "{" + ",".join(f'{r}="{_escapar(v)}"' for r, v in pares) + "}"
+
+
+class Contador(_Metrica):
+    """
+    Valor que só cresce (ex: total de avaliações de fitness).
+    """
+
+    tipo = "counter"
+
+    def incrementar(self, *valores_rotulos, valor=1):
+        chave = self._chave(valores_rotulos)
+        with self._trava:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def valor(self, *valores_rotulos):
+        return self._valores.get(self._chave(valores_rotulos), 0)
+
+    def exportar(self):
+        with self._trava:
+            itens = sorted(self._valores.items())
+        return [f"{self.nome}{self._formatar_rotulos(k)} {_numero(v)}" for k, v in itens]
+
+
+class Medidor(_Metrica):
+    """
+    Valor que sobe e desce (ex: requisições em andamento).
+    """
+
+    tipo = "gauge"
+
+    def somar(self, *valores_rotulos, valor=1):
+        chave = self._chave(valores_rotulos)
+        with self._trava:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def definir(self, *valores_rotulos, valor):
+        chave = self._chave(valores_rotulos)
+        with self._trava:
+            self._valores[chave] = valor
+
+    def valor(self, *valores_rotulos):
+        return self._valores.get(self._chave(valores_rotulos), 0)
+
+    def exportar(self):
+        with self._trava:
+            itens = sorted(self._valores.items())
+        return [f"{self.nome}{self._formatar_rotulos(k)} {_numero(v)}" for k, v in itens]
+
+
+class Histograma(_Metrica):
+    """
+    Distribuição de observações em faixas cumulativas (ex: latência por endpoint).
+    """
+
+    tipo = "histogram"
+
+    def __init__(self, nome, ajuda, rotulos=(), buckets=BUCKETS_PADRAO):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets))
+
+    def observar(self, valor, *valores_rotulos):
+        chave = self._chave(valores_rotulos)
+        with self._trava:
+            estado = self._valores.get(chave)
+            if estado is None:
+                # [contagens por faixa..., +Inf], soma
+                estado = self._valores[chave] = [[0] * (len(self.buckets) + 1), 0.0]
+            contagens = estado[0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    contagens[i] += 1
+                    break
+            else:
+                contagens[-1] += 1
+            estado[1] += valor
+
+    def contagem(self, *valores_rotulos):
+        estado = self._valores.get(self._chave(valores_rotulos))
+        return sum(estado[0]) if estado else 0
+
+    def exportar(self):
+        with self._trava:
+            itens = sorted((k, (list(c), s)) for k, (c, s) in self._valores.items())
+
+        linhas = []
+        for chave, (contagens, soma) in itens:
+            acumulado = 0
+            for limite, n in zip(self.buckets + (math.inf,), contagens):
+                acumulado += n
+                rotulos = self._formatar_rotulos(chave, [("le", _numero(limite))])
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            linhas.append(f"{self.nome}_sum{self._formatar_rotulos(chave)} {_numero(soma)}")
+            linhas.append(f"{self.nome}_count{self._formatar_rotulos(chave)} {acumulado}")
+        return linhas
+
+
+def _escapar(texto):
+    """
+    Escapa o valor de um rótulo (barra invertida, aspas e quebra de linha).
+    """
+    return texto.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _numero(valor):
+    """
+    Formata um número no padrão do formato texto do Prometheus.
+    """
+    if valor == math.inf:
+        return "+Inf"
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor)) if abs(valor) < 1e15 else repr(valor)
+    return repr(valor) if isinstance(valor, float) else str(valor)
+
+
+class Registro:
+    """
+    Conjunto de métricas exportadas juntas no endpoint /metrics.
+    """
+
+    def __init__(self):
+        self._metricas = {}
+
+    def _registrar(self, metrica):
+        if metrica.nome in self._metricas:
+            raise ValueError(f"Métrica '{metrica.nome}' já registrada.")
+        self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def contador(self, nome, ajuda, rotulos=()):
+        return self._registrar(Contador(nome, ajuda, rotulos))
+
+    def medidor(self, nome, ajuda, rotulos=()):
+        return self._registrar(Medidor(nome, ajuda, rotulos))
+
+    def histograma(self, nome, ajuda, rotulos=(), buckets=BUCKETS_PADRAO):
+        return self._registrar(Histograma(nome, ajuda, rotulos, buckets))
+
+    def exportar(self):
+        """
+        Gera o texto no formato de exposição do Prometheus (versão 0.0.4).
+        """
+        linhas = []
+        for metrica in self._metricas.values():
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+# --- MÉTRICAS DO PROJETO ---
+REGISTRO = Registro()
+
+FASES = REGISTRO.histograma(
+    "vrp_fase_segundos",
+    "Duração de cada fase do otimizador (avaliacao, selecao, crossover_mutacao, divisao, 2opt, llm).",
+    rotulos=("fase",),
+)
+AVALIACOES_FITNESS = REGISTRO.contador(
+    "vrp_fitness_avaliacoes_total", "Avaliações da função de fitness efetivamente calculadas."
+)
+ACERTOS_CACHE_FITNESS = REGISTRO.contador(
+    "vrp_fitness_cache_acertos_total", "Avaliações de fitness atendidas pelo cache."
+)
+LATENCIA_HTTP = REGISTRO.histograma(
+    "vrp_http_requisicao_segundos",
+    "Latência das requisições HTTP por endpoint.",
+    rotulos=("metodo", "endpoint", "status"),
+)
+REQUISICOES_EM_ANDAMENTO = REGISTRO.medidor(
+    "vrp_http_requisicoes_em_andamento",
+    "Requisições HTTP em processamento por endpoint.",
+    rotulos=("endpoint",),
+)
+TAREFAS = REGISTRO.medidor(
+    "vrp_tarefas",
+    "Tarefas em segundo plano por estado (pendente = profundidade da fila).",
+    rotulos=("status",),
+)
+
+# A instrumentação do solver fica desligada por padrão (ex: CLI e benchmarks);
+# a API a liga ao iniciar.
+_habilitado = False
+
+
+def habilitar(ativo=True):
+    """
+    Liga (ou desliga) os cronômetros de fase e os contadores do solver.
+    """
+    global _habilitado
+    _habilitado = ativo
+
+
+def habilitado():
+    return _habilitado
+
+
+class _Cronometro:
+    __slots__ = ("fase", "inicio")
+
+    def __init__(self, fase):
+        self.fase = fase
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        FASES.observar(time.perf_counter() - self.inicio, self.fase)
+        return False
+
+
+_NULO = contextlib.nullcontext()
+
+
+def fase(nome):
+    """
+    Cronômetro de uma fase do otimizador, para uso com `with`.
+    Desligado, retorna um contexto vazio compartilhado (custo desprezível).
+    """
+    return _Cronometro(nome) if _habilitado else _NULO
+
+
+def contar(contador, valor=1):
+    """
+    Incrementa um contador do solver, apenas se a instrumentação estiver ligada.
+    """
+    if _habilitado:
+        contador.incrementar(valor=valor)
@@ -0,0 +1,162 @@
+import cProfile
+import hmac
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+
+# Pasta dos artefatos (.prof) gerados pelo perfilamento sob demanda
+PASTA_PERFIS = os.getenv("PERFIS_DIR", "perfis")
+
+# Quantidade de artefatos mantidos em disco (os mais antigos são apagados)
+MAX_ARTEFATOS = 20
+
+
+def perfilar(funcao, *args, top=25, pasta=PASTA_PERFIS, **kwargs):
+    """
+    Executa `funcao(*args, **kwargs)` sob o cProfile e o tracemalloc.
+
+    O perfil completo é salvo em `pasta/<id>.prof` (abre com `pstats` ou
+    snakeviz) e um resumo é retornado junto com o resultado. Os tempos ficam
+    inflados pela instrumentação; servem para comparar funções entre si.
+
+    Args:
+        funcao (callable): Função a perfilar.
+        top (int): Quantidade de funções e de pontos de alocação no resumo.
+        pasta (str): Pasta dos artefatos (None para não salvar).
+
+    Returns:
+        tuple: (resultado, resumo) com 'id', 'tempo_s', 'memoria_pico_mb',
+        'funcoes' (maior tempo acumulado) e 'alocacoes' (maior memória alocada).
+    """
+    ja_rastreando = tracemalloc.is_tracing()
+    if not ja_rastreando:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+    perfil = cProfile.Profile()
+    inicio = time.perf_counter()
+    try:
+        resultado = perfil.runcall(funcao, *args, **kwargs)
+    finally:
+        tempo = time.perf_counter() - inicio
+        snapshot = tracemalloc.take_snapshot()
+        pico = tracemalloc.get_traced_memory()[1]
+        if not ja_rastreando:
+            tracemalloc.stop()
+
+    # Ignora as alocações do próprio tracemalloc e do sistema de import
+    snapshot = snapshot.filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+    )
+    alocacoes = [
+        {
+            "local": f"{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+            "tamanho_kb": s.size / 1024,
+            "blocos": s.count,
+        }
+        for s in snapshot.statistics("lineno")[:top]
+    ]
+
+    estatisticas = pstats.Stats(perfil)
+    funcoes = sorted(estatisticas.stats.items(), key=lambda item: item[1][3], reverse=True)
+    funcoes = [
+        {
+            "funcao": f"{os.path.basename(arquivo)}:{linha}({nome})",
+            "chamadas": chamadas,
+            "tempo_proprio_s": proprio,
+            "tempo_acumulado_s": acumulado,
+        }
+        for (arquivo, linha, nome), (_, chamadas, proprio, acumulado, _) in funcoes[:top]
+    ]
+
+    id_perfil = uuid.uuid4().hex
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+        estatisticas.dump_stats(os.path.join(pasta, f"{id_perfil}.prof"))
+        _limpar_artefatos(pasta)
+
+    resumo = {
+        "id": id_perfil,
+        "tempo_s": tempo,
+        "memoria_pico_mb": pico / 1024**2,
+        "funcoes": funcoes,
+        "alocacoes": alocacoes,
+    }
+    return resultado, resumo
+
+
+def _limpar_artefatos(pasta, manter=MAX_ARTEFATOS):
+    """
+    Apaga os artefatos mais antigos, mantendo apenas os `manter` mais recentes.
+    """
+    arquivos = [os.path.join(pasta, a) for a in os.listdir(pasta) if a.endswith(".prof")]
+    arquivos.sort(key=os.path.getmtime, reverse=True)
+    for caminho in arquivos[manter:]:
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+
+def caminho_artefato(id_perfil, pasta=PASTA_PERFIS):
+    """
+    Caminho do artefato de um perfil, ou None se o ID for inválido ou não existir.
+    """
+    # O ID é um uuid4 em hexadecimal; qualquer outra coisa é recusada (evita path traversal)
+    if len(id_perfil) != 32 or any(c not in "0123456789abcdef" for c in id_perfil):
+        return None
+    caminho = os.path.join(pasta, f"{id_perfil}.prof")
+    return caminho if os.path.isfile(caminho) else None
+
+
+class ControlePerfil:
+    """
+    Restringe o perfilamento sob demanda: exige um token secreto, permite
+    apenas um perfil por vez (o cProfile e o tracemalloc são globais) e
+    impõe um intervalo mínimo entre perfis, para não degradar o serviço.
+    """
+
+    def __init__(self, token=None, intervalo_s=30.0):
+        """
+        Args:
+            token (str): Token exigido; sem token o perfilamento fica desativado.
+            intervalo_s (float): Intervalo mínimo entre o início de dois perfis.
+        """
+        self.token = token
+        self.intervalo_s = intervalo_s
+        self._trava = threading.Lock()
+        self._ultimo = -float("inf")
+
+    def autorizado(self, token):
+        """
+        Verifica o token informado (comparação em tempo constante).
+        """
+        if not self.token or not token:
+            return False
+        return hmac.compare_digest(token.encode(), self.token.encode())
+
+    def reservar(self):
+        """
+        Tenta reservar a vez para um novo perfil, sem esperar.
+
+        Returns:
+            bool: True se reservado (chame `liberar` ao final); False se já
+            houver um perfil em andamento ou o intervalo mínimo não passou.
+        """
+        if not self._trava.acquire(blocking=False):
+            return False
+        agora = time.monotonic()
+        if agora - self._ultimo < self.intervalo_s:
+            self._trava.release()
+            return False
+        self._ultimo = agora
+        return True
+
+    def liberar(self):
+        self._trava.release()
@@ -0,0 +1,201 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import algoritmo_genetico as ag
+from simulacao_frota import FATOR_VELOCIDADE_MINIMO
+
+
+def custo_com_transito(ponto1, ponto2, zonas_transito, amostras=8):
+    """
+    Estima o custo (tempo relativo) de um trecho considerando as zonas de trânsito.
+
+    O trecho é amostrado em pontos igualmente espaçados; em cada amostra a
+    velocidade cai para (1 - intensidade) da zona mais lenta que a contém,
+    com o mesmo piso do `SimuladorFrota`. Sem zonas, equivale à distância Euclidiana.
+
+    Args:
+        ponto1, ponto2 (tuple): Coordenadas (lat, lon) das extremidades.
+        zonas_transito (list): Zonas com 'coord', 'raio_km' e 'intensidade'.
+        amostras (int): Quantidade de amostras ao longo do trecho.
+
+    Returns:
+        float: Distância ponderada pelo inverso do fator de velocidade.
+    """
+    distancia = ag.calcular_distancia(ponto1, ponto2)
+    if not zonas_transito or distancia == 0:
+        return distancia
+
+    t = (np.arange(amostras) + 0.5) / amostras
+    p1, p2 = np.asarray(ponto1, dtype=float), np.asarray(ponto2, dtype=float)
+    pontos = p1 + (p2 - p1) * t[:, None]
+
+    fator = np.ones(amostras)
+    for z in zonas_transito:
+        dentro = ((pontos - z["coord"]) ** 2).sum(axis=1) < z["raio_km"] ** 2
+        fator = np.where(dentro, np.minimum(fator, 1.0 - z["intensidade"]), fator)
+
+    return distancia * float(np.mean(1.0 / np.maximum(fator, FATOR_VELOCIDADE_MINIMO)))
+
+
+def reotimizar_restante(id_inicio, ids_restantes, pontos, zonas_transito, id_fim=0):
+    """
+    Reotimiza a ordem das paradas ainda não visitadas de uma rota em andamento.
+
+    O trecho começa no destino atual do veículo (`id_inicio`, já comprometido)
+    e termina no depósito (`id_fim`); ambos ficam fixos. A ordem intermediária
+    é refinada com `aplicar_2opt` usando o custo com trânsito. Executada em um
+    processo separado para não disputar o GIL com o loop de renderização.
+
+    Returns:
+        list: `ids_restantes` na nova ordem.
+    """
+    dict_pontos = {p["id"]: p for p in pontos}
+    rota = ag.aplicar_2opt(
+        [id_inicio] + list(ids_restantes) + [id_fim],
+        dict_pontos,
+        distancia=lambda a, b: custo_com_transito(a, b, zonas_transito),
+    )
+    return rota[1:-1]
+
+
+class ReroteadorFrota:
+    """
+    Reroteamento ao vivo dos veículos de um `SimuladorFrota`.
+
+    As reotimizações rodam em um pool de processos; o loop principal apenas
+    solicita (`solicitar`) e, a cada frame, aplica os resultados já prontos
+    (`coletar`), sem nunca esperar pelo otimizador. A troca de rota é feita
+    de uma vez no simulador, entre dois passos de simulação.
+    """
+
+    def __init__(self, simulador, pontos_dados, zonas_transito=(), processos=1):
+        self.simulador = simulador
+        self.pontos = {p["id"]: {"id": p["id"], "coord": p["coord"]} for p in pontos_dados}
+        # Apenas os campos usados no custo (as zonas do visualizador carregam pixels)
+        self.zonas = [
+            {"coord": tuple(z["coord"]), "raio_km": z["raio_km"], "intensidade": z["intensidade"]}
+            for z in zonas_transito
+        ]
+        # 'spawn' evita herdar o estado do SDL/Pygame do processo principal
+        self.executor = ProcessPoolExecutor(
+            max_workers=processos, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.executor.submit(int).result()  # Inicia o worker antes do loop de frames
+        self.pendentes = {}  # veículo -> futuro em execução
+        self.repetir = set()  # veículos com nova solicitação durante a execução
+
+    def solicitar(self, v):
+        """
+        Agenda a reotimização do restante da rota do veículo `v`.
+        Se já houver uma em andamento, ela é repetida ao terminar.
+
+        Returns:
+            bool: True se uma nova tarefa foi enviada ao pool.
+        """
+        sim = self.simulador
+        if sim.concluido[v]:
+            return False
+        if v in self.pendentes:
+            self.repetir.add(v)
+            return False
+
+        rota = sim.rotas[v]
+        perna = int(sim.perna[v])
+        id_inicio, restantes, id_fim = rota[perna + 1], rota[perna + 2 : -1], rota[-1]
+        if len(restantes) < 2:
+            return False  # Nada a reordenar
+
+        pontos = [self.pontos[pid] for pid in {id_inicio, id_fim, *restantes}]
+        self.pendentes[v] = self.executor.submit(
+            reotimizar_restante, id_inicio, restantes, pontos, self.zonas, id_fim
+        )
+        return True
+
+    def coletar(self):
+        """
+        Aplica as reotimizações concluídas, sem bloquear. Uma reotimização que
+        falhou mantém a rota atual do veículo e é devolvida ao chamador.
+
+        Returns:
+            tuple: (alterados, falhas): índices dos veículos cuja rota foi
+            alterada e pares (índice do veículo, exceção) das que falharam.
+        """
+        alterados, falhas = [], []
+        for v, futuro in list(self.pendentes.items()):
+            if not futuro.done():
+                continue
+            del self.pendentes[v]
+
+            try:
+                if self._aplicar(v, futuro.result()):
+                    alterados.append(v)
+            except Exception as e:
+                falhas.append((v, e))
+
+            if v in self.repetir:
+                self.repetir.discard(v)
+                self.solicitar(v)
+        return alterados, falhas
+
+    def _aplicar(self, v, nova_ordem):
+        """
+        Troca o restante da rota pela nova ordem. Paradas visitadas desde a
+        solicitação são descartadas e paradas incluídas depois são mantidas no fim.
+        """
+        sim = self.simulador
+        if sim.concluido[v]:
+            return False
+
+        rota = sim.rotas[v]
+        perna = int(sim.perna[v])
+        fixo, restantes = rota[: perna + 2], rota[perna + 2 : -1]
+        if not restantes:
+            return False
+
+        pendentes = set(restantes)
+        ordem = [pid for pid in nova_ordem if pid in pendentes]
+        ja_ordenados = set(ordem)
+        ordem += [pid for pid in restantes if pid not in ja_ordenados]
+
+        nova_rota = fixo + ordem + [rota[-1]]
+        if nova_rota == rota:
+            return False
+        sim.substituir_rota(v, nova_rota)
+        return True
+
+    def inserir_parada(self, ponto):
+        """
+        Inclui uma nova parada urgente no veículo ativo mais próximo e agenda a
+        reotimização da rota dele.
+
+        Args:
+            ponto (dict): Novo local (precisa de 'id' e 'coord').
+
+        Returns:
+            int: Índice do veículo escolhido, ou None se toda a frota já terminou.
+        """
+        sim = self.simulador
+        ativos = np.nonzero(~sim.concluido)[0]
+        if len(ativos) == 0:
+            return None
+
+        distancias = ((sim.posicoes[ativos] - ponto["coord"]) ** 2).sum(axis=1)
+        v = int(ativos[np.argmin(distancias)])
+
+        self.pontos[ponto["id"]] = {"id": ponto["id"], "coord": ponto["coord"]}
+        sim.coords[ponto["id"]] = ponto["coord"]
+
+        # Inserção provisória antes do retorno ao depósito (a reotimização ajusta a ordem)
+        rota = sim.rotas[v]
+        pos = max(len(rota) - 1, int(sim.perna[v]) + 2)
+        nova_rota = rota[:pos] + [ponto["id"]] + (rota[pos:] or [rota[-1]])
+        sim.substituir_rota(v, nova_rota)
+
+        self.solicitar(v)
+        return v
+
+    def encerrar(self):
+        """
+        Finaliza o pool de processos sem aguardar tarefas pendentes.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,277 @@
+import numpy as np
+
+from instancia import InstanciaVRP
+
+# Conversão aproximada de graus (lat/lon) para KM, a mesma usada no restante do projeto.
+KM_POR_GRAU = 111.139
+
+# Menor fração da velocidade dentro de uma zona de trânsito: com intensidade
+# >= 1 a velocidade seria zero (ou negativa) e o veículo nunca chegaria
+FATOR_VELOCIDADE_MINIMO = 0.05
+
+
+class SimuladorFrota:
+    """
+    Motor de simulação da frota, independente da renderização.
+
+    Todo o estado fica em arrays NumPy (um elemento por veículo) e todos os
+    veículos avançam juntos a cada passo de tempo fixo `dt`. Assim a simulação
+    pode rodar sem interface, muito mais rápido que o tempo real, e a
+    visualização apenas desenha instantâneos (`posicoes`, `concluido`, ...).
+
+    Unidades: coordenadas em graus (lat/lon), distâncias em KM, tempos em
+    segundos simulados e velocidades em km/h. O raio das zonas de trânsito
+    ('raio_km') é interpretado na mesma unidade das coordenadas.
+    """
+
+    def __init__(self, rotas, pontos_dados, zonas_transito=(), velocidade_kmh=40.0, dt=10.0):
+        """
+        Args:
+            rotas (list): Rotas por veículo (listas de IDs, ex: [0, 3, 1, 0]).
+            pontos_dados (list | InstanciaVRP): Dados dos locais (precisam de 'id' e
+                'coord') ou a instância em colunas.
+            zonas_transito (list): Zonas com 'coord', 'raio_km' e 'intensidade'
+                (a velocidade na zona cai para 1 - intensidade, no mínimo
+                `FATOR_VELOCIDADE_MINIMO`).
+            velocidade_kmh (float): Velocidade base da frota em via livre.
+            dt (float): Passo de tempo fixo da simulação (segundos).
+        """
+        self.dt = float(dt)
+        self.velocidade_kmh = velocidade_kmh
+        if isinstance(pontos_dados, InstanciaVRP):
+            self.coords = dict(zip(pontos_dados.ids.tolist(), pontos_dados.coords.tolist()))
+        else:
+            self.coords = {p["id"]: p["coord"] for p in pontos_dados}
+
+        zonas = list(zonas_transito)
+        self.zona_centros = np.array([z["coord"] for z in zonas], dtype=float).reshape(-1, 2)
+        self.zona_raios = np.array([z["raio_km"] for z in zonas], dtype=float)
+        self.zona_fatores = np.maximum(
+            1.0 - np.array([z["intensidade"] for z in zonas], dtype=float),
+            FATOR_VELOCIDADE_MINIMO,
+        )
+
+        self.carregar_rotas(rotas)
+
+    # --- Montagem do estado ---
+
+    def carregar_rotas(self, rotas):
+        """
+        (Re)constrói os arrays de rotas e reinicia a simulação.
+        As rotas de tamanhos diferentes são armazenadas com preenchimento (padding).
+        """
+        self.rotas = [list(r) for r in rotas]
+        n = len(self.rotas)
+        tam = max((len(r) for r in self.rotas), default=1)
+
+        self.ids_rota = np.full((n, tam), -1, dtype=np.int64)
+        self.pontos_rota = np.zeros((n, tam, 2))
+        for v, rota in enumerate(self.rotas):
+            self.ids_rota[v, : len(rota)] = rota
+            self.pontos_rota[v, : len(rota)] = [self.coords[pid] for pid in rota]
+            # Repete o último ponto no preenchimento (pernas de comprimento zero)
+            if rota:
+                self.pontos_rota[v, len(rota) :] = self.pontos_rota[v, len(rota) - 1]
+
+        self.n_pernas = np.array([max(len(r) - 1, 0) for r in self.rotas], dtype=np.int64)
+        delta = np.diff(self.pontos_rota, axis=1)
+        self.dist_perna = np.hypot(delta[..., 0], delta[..., 1]) * KM_POR_GRAU
+
+        # Leve variação de velocidade entre veículos (realismo)
+        self.velocidade_base = self.velocidade_kmh * (1 + 0.02 * (np.arange(n) % 10))
+
+        self.reiniciar()
+
+    def _ampliar(self, tam):
+        """
+        Aumenta o preenchimento dos arrays por parada para comportar rotas mais longas,
+        preservando o estado e a telemetria já registrados.
+        """
+        extra = tam - self.ids_rota.shape[1]
+        if extra <= 0:
+            return
+        self.ids_rota = np.pad(self.ids_rota, ((0, 0), (0, extra)), constant_values=-1)
+        self.pontos_rota = np.pad(self.pontos_rota, ((0, 0), (0, extra), (0, 0)), mode="edge")
+        self.dist_perna = np.pad(self.dist_perna, ((0, 0), (0, extra)))
+        self.tempo_perna = np.pad(self.tempo_perna, ((0, 0), (0, extra)))
+        self.chegada = np.pad(self.chegada, ((0, 0), (0, extra)), constant_values=np.nan)
+
+    def substituir_rota(self, v, nova_rota):
+        """
+        Troca a rota do veículo `v` durante a simulação.
+
+        O trecho já percorrido e a perna em andamento (até o destino atual) não
+        podem mudar; a telemetria dessas pernas é preservada e a das seguintes
+        é descartada.
+
+        Args:
+            v (int): Índice do veículo.
+            nova_rota (list): Rota completa (IDs) com o mesmo início da atual.
+        """
+        perna = int(self.perna[v])
+        fixo = self.rotas[v][: perna + 2]
+        if list(nova_rota[: len(fixo)]) != fixo:
+            raise ValueError("A nova rota precisa preservar o trecho já percorrido.")
+
+        nova_rota = list(nova_rota)
+        self._ampliar(len(nova_rota))
+        tam = self.ids_rota.shape[1]
+
+        self.rotas[v] = nova_rota
+        self.ids_rota[v] = -1
+        self.ids_rota[v, : len(nova_rota)] = nova_rota
+        self.pontos_rota[v, : len(nova_rota)] = [self.coords[pid] for pid in nova_rota]
+        self.pontos_rota[v, len(nova_rota) :] = self.pontos_rota[v, len(nova_rota) - 1]
+
+        delta = np.diff(self.pontos_rota[v], axis=0)
+        self.dist_perna[v] = np.hypot(delta[:, 0], delta[:, 1]) * KM_POR_GRAU
+        self.n_pernas[v] = len(nova_rota) - 1
+
+        self.tempo_perna[v, perna + 1 :] = 0.0
+        self.chegada[v, min(perna + 2, tam) :] = np.nan
+        self.concluido[v] = perna >= self.n_pernas[v]
+
+    def reiniciar(self):
+        """
+        Volta todos os veículos ao depósito e limpa a telemetria.
+        """
+        n, tam = self.ids_rota.shape
+        self.tempo = 0.0
+        self.perna = np.zeros(n, dtype=np.int64)  # Índice da perna atual
+        self.progresso = np.zeros(n)  # Fração percorrida da perna (0.0 a 1.0)
+        self.concluido = self.n_pernas == 0
+        self.fator_velocidade = np.ones(n)
+        self.no_transito = np.zeros(n, dtype=bool)
+
+        # Telemetria por perna: tempo gasto e instante de chegada em cada parada
+        self.tempo_perna = np.zeros((n, max(tam - 1, 0)))
+        self.chegada = np.full((n, tam), np.nan)
+        self.chegada[:, 0] = 0.0
+
+        self._atualizar_posicoes()
+        self._atualizar_transito()
+
+    # --- Dinâmica ---
+
+    def _atualizar_posicoes(self):
+        """
+        Interpolação linear: Posição = Inicio + (Fim - Inicio) * Progresso.
+        """
+        linhas = np.arange(len(self.perna))
+        ultima = self.pontos_rota.shape[1] - 1
+        p1 = self.pontos_rota[linhas, np.minimum(self.perna, ultima)]
+        p2 = self.pontos_rota[linhas, np.minimum(self.perna + 1, ultima)]
+        self.posicoes = p1 + (p2 - p1) * self.progresso[:, None]
+
+    def _atualizar_transito(self):
+        """
+        Calcula o fator de velocidade de cada veículo conforme as zonas em que está.
+        Se estiver em várias zonas, vale a de maior redução.
+        """
+        if len(self.zona_raios) == 0:
+            self.fator_velocidade[:] = 1.0
+            self.no_transito[:] = False
+            return
+
+        delta = self.posicoes[:, None, :] - self.zona_centros[None, :, :]
+        dentro = (delta**2).sum(axis=2) < self.zona_raios**2
+        self.fator_velocidade = np.where(dentro, self.zona_fatores, 1.0).min(axis=1)
+        self.no_transito = dentro.any(axis=1) & ~self.concluido
+
+    def passo(self):
+        """
+        Avança todos os veículos em `dt` segundos.
+
+        O tempo que sobra ao completar uma perna é aproveitado na perna seguinte,
+        então passos grandes não atrasam as chegadas. O fator de trânsito é
+        avaliado na posição do início do passo.
+        """
+        restante = np.where(self.concluido, 0.0, self.dt)
+
+        while True:
+            idx = np.nonzero(restante > 0)[0]
+            if len(idx) == 0:
+                break
+
+            perna = self.perna[idx]
+            dist = self.dist_perna[idx, perna]
+            vel = self.velocidade_base[idx] * self.fator_velocidade[idx] / 3600  # km/s
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t_falta = np.where(dist > 0, (1 - self.progresso[idx]) * dist / vel, 0.0)
+            chega = t_falta <= restante[idx]
+
+            # Veículos que não completam a perna consomem todo o tempo restante
+            nc, pnc = idx[~chega], perna[~chega]
+            self.progresso[nc] += restante[nc] * vel[~chega] / dist[~chega]
+            self.tempo_perna[nc, pnc] += restante[nc]
+            restante[nc] = 0.0
+
+            # Veículos que chegam registram a chegada e seguem para a próxima perna
+            c, pc, tc = idx[chega], perna[chega], t_falta[chega]
+            self.tempo_perna[c, pc] += tc
+            self.chegada[c, pc + 1] = self.tempo + (self.dt - restante[c]) + tc
+            restante[c] -= tc
+            self.perna[c] += 1
+            self.progresso[c] = 0.0
+
+            fim = c[self.perna[c] >= self.n_pernas[c]]
+            self.concluido[fim] = True
+            restante[fim] = 0.0
+
+        self.tempo += self.dt
+        self._atualizar_posicoes()
+        self._atualizar_transito()
+
+    def executar(self, tempo_max=float("inf")):
+        """
+        Roda a simulação sem interface até todos os veículos terminarem
+        (ou até `tempo_max` segundos simulados).
+
+        Returns:
+            list: Chegadas registradas (ver `resultados`).
+        """
+        while not self.concluido.all() and self.tempo < tempo_max:
+            self.passo()
+        return self.resultados()
+
+    # --- Telemetria ---
+
+    def velocidades_medias(self):
+        """
+        Velocidade média (km/h) de cada perna já concluída; NaN nas demais.
+        """
+        chegou = ~np.isnan(self.chegada[:, 1:])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vel = self.dist_perna / self.tempo_perna * 3600
+        return np.where(chegou & (self.tempo_perna > 0), vel, np.where(chegou, 0.0, np.nan))
+
+    def velocidade_media_ponto(self, id_ponto):
+        """
+        Velocidade média (km/h) do último trecho que chegou ao ponto, ou 0 se ninguém chegou.
+        """
+        vel = self.velocidades_medias()
+        mascara = (self.ids_rota[:, 1:] == id_ponto) & ~np.isnan(vel)
+        if not mascara.any():
+            return 0.0
+        ultimas = np.where(mascara, self.chegada[:, 1:], -np.inf)
+        return float(vel.flat[np.argmax(ultimas)])
+
+    def resultados(self):
+        """
+        Lista as chegadas registradas até o momento.
+
+        Returns:
+            list: Dicionários com 'veiculo_id', 'id_ponto', 'chegada_s' e
+            'velocidade_media_kmh' (média no trecho que termina na parada).
+        """
+        vel = self.velocidades_medias()
+        veiculos, pernas = np.nonzero(~np.isnan(self.chegada[:, 1:]))
+        return [
+            {
+                "veiculo_id": int(v) + 1,
+                "id_ponto": int(self.ids_rota[v, k + 1]),
+                "chegada_s": float(self.chegada[v, k + 1]),
+                "velocidade_media_kmh": float(vel[v, k]),
+            }
+            for v, k in zip(veiculos, pernas)
+        ]
@@ -0,0 +1,106 @@
+import algoritmo_genetico as ag
+import alns
+
+# Motores registrados: nome -> função (pontos, cap_veiculo, **opções) -> (rotas, historico)
+MOTORES = {}
+MOTOR_PADRAO = "ga"
+
+
+# Máximo de locais por motor (o ALNS guarda matrizes densas n x n)
+LIMITE_LOCAIS = {"alns": alns.MAXIMO_LOCAIS}
+
+
+class MotorDesconhecido(ValueError):
+    pass
+
+
+class InstanciaGrandeDemais(ValueError):
+    pass
+
+
+def registrar(nome):
+    """
+    Decorador que registra um motor de otimização.
+
+    O motor recebe os locais (lista de dicionários ou `InstanciaVRP`), a
+    capacidade e as opções comuns `geracoes`, `tempo_limite`, `semente` e
+    `verbose` (e pode aceitar outras), e retorna `(rotas, historico)`: rotas
+    como listas de IDs começando e terminando no depósito e o histórico do
+    melhor custo, cujo último valor é o custo final.
+    """
+
+    def decorador(funcao):
+        MOTORES[nome] = funcao
+        return funcao
+
+    return decorador
+
+
+def listar_motores():
+    return sorted(MOTORES)
+
+
+def validar(motor, n_locais):
+    """
+    Confere se o motor existe e aceita uma instância com `n_locais` locais.
+
+    Raises:
+        MotorDesconhecido: Motor não registrado.
+        InstanciaGrandeDemais: Instância acima do limite do motor.
+    """
+    if motor not in MOTORES:
+        raise MotorDesconhecido(
+            f"Motor '{motor}' desconhecido; use um de {listar_motores()}."
+        )
+    limite = LIMITE_LOCAIS.get(motor)
+    if limite is not None and n_locais > limite:
+        raise InstanciaGrandeDemais(
+            f"O motor '{motor}' aceita até {limite} locais ({n_locais} recebidos); "
+            f"use o motor '{MOTOR_PADRAO}' para instâncias maiores."
+        )
+
+
+def resolver(pontos, cap_veiculo, motor=MOTOR_PADRAO, **opcoes):
+    """
+    Executa o motor escolhido.
+
+    Args:
+        pontos (list | InstanciaVRP): Locais (incluindo depósito).
+        cap_veiculo (float): Capacidade dos caminhões.
+        motor (str): Nome do motor (ver `listar_motores`).
+        **opcoes: Repassadas ao motor (geracoes, tempo_limite, semente, verbose, ...).
+
+    Returns:
+        tuple: (rotas, historico)
+    """
+    validar(motor, len(pontos))
+    return MOTORES[motor](pontos, cap_veiculo, **opcoes)
+
+
+@registrar("ga")
+def _motor_ga(
+    pontos, cap_veiculo, geracoes=200, tempo_limite=None, semente=None, verbose=True, **opcoes
+):
+    return ag.executar_ga(
+        pontos,
+        cap_veiculo,
+        geracoes=geracoes,
+        tempo_limite=tempo_limite,
+        semente=semente,
+        verbose=verbose,
+        **opcoes,
+    )
+
+
+@registrar("alns")
+def _motor_alns(
+    pontos, cap_veiculo, geracoes=None, tempo_limite=None, semente=None, verbose=True, **opcoes
+):
+    # `geracoes` não se aplica ao ALNS: o orçamento é o tempo (padrão 10 s) ou
+    # `iteracoes`; opções exclusivas do GA (ex: adaptativo) são ignoradas
+    opcoes.pop("adaptativo", None)
+    if tempo_limite is None and opcoes.get("iteracoes") is None:
+        tempo_limite = 10.0
+    return alns.executar_alns(
+        pontos, cap_veiculo, tempo_limite=tempo_limite, semente=semente, verbose=verbose, **opcoes
+    )
@@ -0,0 +1,299 @@
+import collections
+import json
+import math
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+
+import algoritmo_genetico as ag
+from checkpoint import ler_metadados
+from instancia import InstanciaVRP
+import metricas
+
+# Estados de uma tarefa
+PENDENTE = "pendente"  # Na fila (nova, retomada ou interrompida por reinício)
+EXECUTANDO = "executando"
+PAUSANDO = "pausando"  # Preempção pedida em execução; para na próxima geração
+PAUSADA = "pausada"  # Preemptada pelo usuário; aguarda `retomar`
+CONCLUIDA = "concluida"
+ERRO = "erro"
+ESTADOS = (PENDENTE, EXECUTANDO, PAUSANDO, PAUSADA, CONCLUIDA, ERRO)
+
+
+class TarefaNaoEncontrada(KeyError):
+    pass
+
+
+class TransicaoInvalida(ValueError):
+    """
+    A operação não se aplica ao estado atual da tarefa (ex: retomar uma concluída).
+    """
+
+
+class GerenciadorTarefas:
+    """
+    Fila de execuções longas do GA, persistida em disco.
+
+    Cada tarefa tem um diretório em `pasta` com a instância ('instancia.npz'),
+    o registro ('tarefa.json': parâmetros, estado e resultado) e o checkpoint
+    do GA ('checkpoint.npz'). Um único trabalhador executa as tarefas em ordem
+    de chegada. Preemptar salva o checkpoint e libera o trabalhador; retomar
+    devolve a tarefa à fila, que continua exatamente do ponto salvo (ou, se ela
+    ainda estiver parando, cancela a pausa). Ao iniciar,
+    tarefas que estavam pendentes ou em execução (ex: contêiner reiniciado)
+    voltam para a fila e continuam do último checkpoint.
+    """
+
+    def __init__(self, pasta="tarefas", intervalo_checkpoint=10):
+        self.pasta = pasta
+        self.intervalo_checkpoint = intervalo_checkpoint
+        self._registros = {}
+        self._trava = threading.Lock()
+        self._fila = queue.Queue()
+        self._atual = None  # [id da tarefa, evento de interrupção, estado ao interromper]
+        self._trabalhador = None
+        self._ativo = False
+
+    # --- Persistência ---
+
+    def _diretorio(self, id_tarefa):
+        return os.path.join(self.pasta, id_tarefa)
+
+    def _gravar(self, registro):
+        caminho = os.path.join(self._diretorio(registro["id"]), "tarefa.json")
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(registro, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+
+    def _definir(self, registro, **campos):
+        # Chamado com a trava já adquirida
+        registro.update(campos, atualizada_em=time.time())
+        self._gravar(registro)
+        return dict(registro)
+
+    def _atualizar(self, id_tarefa, **campos):
+        with self._trava:
+            return self._definir(self._registros[id_tarefa], **campos)
+
+    # --- Ciclo de vida do trabalhador ---
+
+    def iniciar(self):
+        """
+        Carrega as tarefas salvas em `pasta`, recoloca na fila as que não
+        terminaram e inicia o trabalhador.
+        """
+        os.makedirs(self.pasta, exist_ok=True)
+        pendentes = []
+        for nome in os.listdir(self.pasta):
+            caminho = os.path.join(self.pasta, nome, "tarefa.json")
+            if not os.path.exists(caminho):
+                continue
+            with open(caminho, "r", encoding="utf-8") as f:
+                registro = json.load(f)
+            if registro["status"] == EXECUTANDO:
+                registro["status"] = PENDENTE
+            elif registro["status"] == PAUSANDO:
+                registro["status"] = PAUSADA
+            self._registros[registro["id"]] = registro
+            if registro["status"] == PENDENTE:
+                pendentes.append(registro)
+
+        for registro in sorted(pendentes, key=lambda r: r["criada_em"]):
+            self._gravar(registro)
+            self._fila.put(registro["id"])
+
+        self._ativo = True
+        self._trabalhador = threading.Thread(target=self._executar_fila, daemon=True)
+        self._trabalhador.start()
+
+    def parar(self, timeout=30):
+        """
+        Interrompe a tarefa em execução (salvando o checkpoint) e encerra o
+        trabalhador. A tarefa interrompida fica pendente e continua no próximo
+        `iniciar`.
+        """
+        self._ativo = False
+        with self._trava:
+            if self._atual is not None:
+                # Uma pausa já pedida prevalece: a tarefa fica pausada
+                if self._registros[self._atual[0]]["status"] != PAUSANDO:
+                    self._atual[2] = PENDENTE
+                self._atual[1].set()
+        self._fila.put(None)
+        if self._trabalhador is not None:
+            self._trabalhador.join(timeout)
+
+    def _executar_fila(self):
+        while self._ativo:
+            id_tarefa = self._fila.get()
+            if id_tarefa is None or not self._ativo:
+                break
+            with self._trava:
+                registro = self._registros[id_tarefa]
+                # Pode ter sido pausada (ou já executada) enquanto esperava na fila
+                if registro["status"] != PENDENTE:
+                    continue
+                registro = self._definir(registro, status=EXECUTANDO)
+                self._atual = [id_tarefa, threading.Event(), PAUSADA]
+            try:
+                self._executar(registro, self._atual[1])
+            finally:
+                with self._trava:
+                    self._atual = None
+
+    def _executar(self, registro, evento):
+        id_tarefa = registro["id"]
+        diretorio = self._diretorio(id_tarefa)
+        try:
+            instancia = InstanciaVRP.carregar(os.path.join(diretorio, "instancia.npz"))
+            rotas, historico = ag.executar_ga(
+                instancia,
+                registro["capacidade_veiculo"],
+                geracoes=registro["geracoes"],
+                tam_populacao=registro["tam_populacao"],
+                verbose=False,
+                semente=registro["semente"],
+                checkpoint=os.path.join(diretorio, "checkpoint.npz"),
+                intervalo_checkpoint=self.intervalo_checkpoint,
+                interromper=evento.is_set,
+                adaptativo=registro.get("adaptativo", False),
+            )
+        except ag.ExecucaoInterrompida:
+            with self._trava:
+                status = self._atual[2]
+                self._definir(self._registros[id_tarefa], status=status)
+            if status == PENDENTE and self._ativo:
+                # `retomar` cancelou a pausa quando o GA já tinha parado
+                self._fila.put(id_tarefa)
+        except Exception as e:
+            self._atualizar(id_tarefa, status=ERRO, erro=str(e))
+        else:
+            self._atualizar(
+                id_tarefa,
+                status=CONCLUIDA,
+                resultado={
+                    "rotas_otimizadas": rotas,
+                    "custo_final": historico[-1],
+                    "historico_convergencia": historico,
+                },
+            )
+
+    # --- Operações ---
+
+    def criar(
+        self,
+        instancia,
+        capacidade_veiculo,
+        geracoes=1000,
+        tam_populacao=50,
+        semente=None,
+        adaptativo=False,
+    ):
+        """
+        Registra uma nova tarefa e a coloca na fila.
+
+        Sem `semente`, uma é sorteada e gravada, para que a tarefa seja
+        reproduzível mesmo se reiniciar antes do primeiro checkpoint.
+
+        Returns:
+            dict: O registro da tarefa.
+        """
+        id_tarefa = uuid.uuid4().hex
+        os.makedirs(self._diretorio(id_tarefa))
+        instancia.salvar(os.path.join(self._diretorio(id_tarefa), "instancia.npz"))
+
+        agora = time.time()
+        registro = {
+            "id": id_tarefa,
+            "status": PENDENTE,
+            "capacidade_veiculo": capacidade_veiculo,
+            "geracoes": geracoes,
+            "tam_populacao": tam_populacao,
+            "semente": semente if semente is not None else random.randrange(2**32),
+            "adaptativo": adaptativo,
+            "criada_em": agora,
+            "atualizada_em": agora,
+        }
+        with self._trava:
+            self._registros[id_tarefa] = registro
+            self._gravar(registro)
+        self._fila.put(id_tarefa)
+        return dict(registro)
+
+    def consultar(self, id_tarefa):
+        """
+        Registro da tarefa, com o progresso do último checkpoint
+        ('geracao_checkpoint' e 'melhor_custo_checkpoint').
+        """
+        with self._trava:
+            if id_tarefa not in self._registros:
+                raise TarefaNaoEncontrada(id_tarefa)
+            registro = dict(self._registros[id_tarefa])
+
+        caminho = os.path.join(self._diretorio(id_tarefa), "checkpoint.npz")
+        if os.path.exists(caminho):
+            metadados = ler_metadados(caminho)
+            registro["geracao_checkpoint"] = metadados["geracao"]
+            # Antes da primeira geração ainda não há melhor solução (custo infinito)
+            custo = metadados["melhor_fitness"]
+            registro["melhor_custo_checkpoint"] = custo if math.isfinite(custo) else None
+        return registro
+
+    def listar(self):
+        with self._trava:
+            return [
+                {"id": r["id"], "status": r["status"], "criada_em": r["criada_em"]}
+                for r in sorted(self._registros.values(), key=lambda r: r["criada_em"])
+            ]
+
+    def publicar_metricas(self):
+        """
+        Atualiza o medidor `vrp_tarefas` com o número de tarefas em cada estado.
+        """
+        with self._trava:
+            contagem = collections.Counter(r["status"] for r in self._registros.values())
+        for status in ESTADOS:
+            metricas.TAREFAS.definir(status, valor=contagem[status])
+
+    def preemptar(self, id_tarefa):
+        """
+        Pausa a tarefa. Em execução, ela fica 'pausando' até salvar o
+        checkpoint na próxima geração e liberar o trabalhador para a próxima
+        da fila; então passa a 'pausada'.
+        """
+        with self._trava:
+            registro = self._registros.get(id_tarefa)
+            if registro is None:
+                raise TarefaNaoEncontrada(id_tarefa)
+            if registro["status"] not in (PENDENTE, EXECUTANDO):
+                raise TransicaoInvalida(f"Tarefa {registro['status']} não pode ser preemptada.")
+            if self._atual is not None and self._atual[0] == id_tarefa:
+                self._atual[2] = PAUSADA
+                self._atual[1].set()
+                return self._definir(registro, status=PAUSANDO)
+            return self._definir(registro, status=PAUSADA)
+
+    def retomar(self, id_tarefa):
+        """
+        Devolve uma tarefa pausada à fila; ela continua do último checkpoint.
+        Se ela ainda estiver pausando, a pausa é cancelada.
+        """
+        with self._trava:
+            registro = self._registros.get(id_tarefa)
+            if registro is None:
+                raise TarefaNaoEncontrada(id_tarefa)
+            if registro["status"] == PAUSANDO:
+                # Se o GA ainda não viu o pedido, segue executando; se já parou,
+                # `_executar` devolve a tarefa à fila em vez de pausá-la
+                self._atual[1].clear()
+                self._atual[2] = PENDENTE
+                return self._definir(registro, status=EXECUTANDO)
+            if registro["status"] != PAUSADA:
+                raise TransicaoInvalida(f"Tarefa {registro['status']} não pode ser retomada.")
+            registro = self._definir(registro, status=PENDENTE)
+        self._fila.put(id_tarefa)
+        return registro
@@ -0,0 +1,49 @@
+import os
+import random
+import tempfile
+import unittest
+import algoritmo_genetico as ag
+import cenarios
+
+
+class TestAdaptativo(unittest.TestCase):
+    def test_operadores_preservam_permutacao(self):
+        rng = random.Random(0)
+        for nome, operador in ag.OPERADORES_MUTACAO.items():
+            for _ in range(50):
+                individuo = list(range(1, 12))
+                operador(individuo, rng)
+                self.assertEqual(sorted(individuo), list(range(1, 12)), nome)
+
+    def test_bandit_prefere_operador_com_sucesso(self):
+        bandit = ag.BanditOperadores(["a", "b", "c"])
+        escolhas = []
+        for _ in range(300):
+            i = bandit.escolher()
+            escolhas.append(i)
+            bandit.recompensar(i, 1.0 if i == 1 else 0.0)
+        self.assertGreater(escolhas[-100:].count(1), 80)
+
+    def test_diversidade(self):
+        inst = cenarios.gerar_instancia(8, semente=0)
+        melhor = [1, 2, 3, 4, 5, 6, 7]
+        self.assertEqual(ag.diversidade_populacao([melhor, melhor[::-1]], melhor, inst), 0.0)
+        self.assertGreater(ag.diversidade_populacao([[1, 3, 5, 7, 2, 4, 6]], melhor, inst), 0.5)
+
+    def test_retomada_adaptativa_identica(self):
+        inst = cenarios.gerar_instancia(40, semente=4)
+        parametros = dict(geracoes=25, tam_populacao=12, verbose=False, semente=2, adaptativo=True)
+        referencia = ag.executar_ga(inst, 100, **parametros)
+
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "ga.npz")
+            chamadas = iter(range(100))
+            with self.assertRaises(ag.ExecucaoInterrompida):
+                ag.executar_ga(
+                    inst, 100, checkpoint=caminho, interromper=lambda: next(chamadas) >= 11, **parametros
+                )
+            self.assertEqual(ag.executar_ga(inst, 100, checkpoint=caminho, **parametros), referencia)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import time
+import unittest
+import alns
+import cenarios
+import solvers
+
+
+class TestALNS(unittest.TestCase):
+    def setUp(self):
+        self.inst = cenarios.gerar_instancia(40, semente=7)
+        self.capacidade = 150
+
+    def test_solucao_viavel(self):
+        rotas, historico = alns.executar_alns(
+            self.inst, self.capacidade, iteracoes=300, semente=1, verbose=False
+        )
+        deposito = int(self.inst.ids[self.inst.deposito])
+        cargas = dict(zip(self.inst.ids.tolist(), self.inst.cargas.tolist()))
+
+        visitados = []
+        for rota in rotas:
+            self.assertEqual((rota[0], rota[-1]), (deposito, deposito))
+            self.assertLessEqual(sum(cargas[i] for i in rota[1:-1]), self.capacidade)
+            visitados.extend(rota[1:-1])
+        self.assertEqual(sorted(visitados), sorted(i for i in cargas if i != deposito))
+        # O histórico guarda o melhor custo, então nunca piora
+        self.assertEqual(historico, sorted(historico, reverse=True))
+
+    def test_reproduzivel_por_iteracoes(self):
+        # Sem tempo_limite, o resfriamento segue as iterações (não o relógio)
+        opcoes = dict(tempo_limite=None, iteracoes=200, semente=3, verbose=False)
+        a = alns.executar_alns(self.inst, self.capacidade, **opcoes)
+        b = alns.executar_alns(self.inst, self.capacidade, **opcoes)
+        self.assertEqual(a, b)
+
+    def test_respeita_tempo_limite(self):
+        inst = cenarios.gerar_instancia(1000, semente=5)
+        inicio = time.perf_counter()
+        rotas, _ = alns.executar_alns(inst, self.capacidade, tempo_limite=1.0, semente=0, verbose=False)
+        # Construção, prazo e uma última reconstrução das rotas com folga pequena
+        self.assertLess(time.perf_counter() - inicio, 1.5)
+        self.assertEqual(sum(len(r) - 2 for r in rotas), len(inst) - 1)
+
+    def test_registro_de_motores(self):
+        self.assertEqual(solvers.listar_motores(), ["alns", "ga"])
+        rotas, historico = solvers.resolver(
+            self.inst, self.capacidade, motor="alns", iteracoes=100, semente=0, verbose=False
+        )
+        self.assertTrue(rotas)
+        with self.assertRaises(solvers.MotorDesconhecido):
+            solvers.resolver(self.inst, self.capacidade, motor="tabu")
+        # O ALNS guarda matrizes n x n: instâncias grandes demais são recusadas
+        solvers.validar("alns", alns.MAXIMO_LOCAIS)
+        solvers.validar("ga", alns.MAXIMO_LOCAIS + 1)
+        with self.assertRaises(solvers.InstanciaGrandeDemais):
+            solvers.validar("alns", alns.MAXIMO_LOCAIS + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
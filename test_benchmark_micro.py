@@ -0,0 +1,26 @@
+import unittest
+import benchmark_micro as micro
+
+
+class TestBenchmarkMicro(unittest.TestCase):
+    def test_casos_cobrem_funcoes_criticas(self):
+        pontos, capacidade = micro.gerar_instancia_sintetica(20)
+        casos = micro.preparar_casos(pontos, capacidade)
+        for nome in ["funcao_fitness_vrp", "separar_rotas_por_capacidade", "crossover",
+                     "mutacao", "selecao_torneio", "aplicar_2opt"]:
+            self.assertIn(nome, casos)
+            casos[nome]()
+
+    def test_comparacao_com_limite(self):
+        base = {"resultados": [{"funcao": "crossover", "n": 50, "min_s": 1.0},
+                               {"funcao": "mutacao", "n": 50, "min_s": 1.0}]}
+        atual = {"resultados": [{"funcao": "crossover", "n": 50, "min_s": 1.05},
+                                {"funcao": "mutacao", "n": 50, "min_s": 1.2},
+                                {"funcao": "mutacao", "n": 200, "min_s": 9.0}]}
+        comparacoes = micro.comparar(atual, base, limite=10)
+        # O caso sem linha de base (n=200) é ignorado
+        self.assertEqual([c["regressao"] for c in comparacoes], [False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
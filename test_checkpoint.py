@@ -0,0 +1,97 @@
+import os
+import tempfile
+import time
+import unittest
+import algoritmo_genetico as ag
+import cenarios
+import tarefas
+from checkpoint import CheckpointIncompativel
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.inst = cenarios.gerar_instancia(40, semente=4)
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, "ga.npz")
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def executar(self, **kwargs):
+        return ag.executar_ga(
+            self.inst, 100, geracoes=30, tam_populacao=12, verbose=False, semente=3, **kwargs
+        )
+
+    def test_retomada_identica(self):
+        referencia = self.executar()
+
+        chamadas = iter(range(100))
+        with self.assertRaises(ag.ExecucaoInterrompida) as ctx:
+            self.executar(
+                checkpoint=self.caminho,
+                intervalo_checkpoint=4,
+                interromper=lambda: next(chamadas) >= 13,
+            )
+        self.assertEqual(ctx.exception.geracao, 13)
+
+        self.assertEqual(self.executar(checkpoint=self.caminho), referencia)
+
+    def test_checkpoint_de_outra_instancia(self):
+        self.executar(checkpoint=self.caminho)
+        outra = cenarios.gerar_instancia(40, semente=5)
+        with self.assertRaises(CheckpointIncompativel):
+            ag.executar_ga(outra, 100, geracoes=30, tam_populacao=12, verbose=False, checkpoint=self.caminho)
+
+    def test_tarefa_pausada_e_retomada(self):
+        gerenciador = tarefas.GerenciadorTarefas(self.pasta.name, intervalo_checkpoint=5)
+        registro = gerenciador.criar(self.inst, 100, geracoes=30, tam_populacao=12, semente=3)
+        gerenciador.preemptar(registro["id"])
+        with self.assertRaises(tarefas.TransicaoInvalida):
+            gerenciador.preemptar(registro["id"])
+
+        gerenciador.retomar(registro["id"])
+        gerenciador.iniciar()
+        try:
+            limite = time.time() + 30
+            while gerenciador.consultar(registro["id"])["status"] != tarefas.CONCLUIDA:
+                self.assertLess(time.time(), limite)
+                time.sleep(0.05)
+        finally:
+            gerenciador.parar()
+
+        rotas, historico = self.executar()
+        resultado = gerenciador.consultar(registro["id"])["resultado"]
+        self.assertEqual(resultado["rotas_otimizadas"], rotas)
+        self.assertEqual(resultado["historico_convergencia"], historico)
+
+    def test_preemptar_em_execucao(self):
+        gerenciador = tarefas.GerenciadorTarefas(self.pasta.name, intervalo_checkpoint=5)
+        registro = gerenciador.criar(self.inst, 100, geracoes=10**6, tam_populacao=12, semente=3)
+
+        def aguardar(status):
+            limite = time.time() + 30
+            while gerenciador.consultar(registro["id"])["status"] != status:
+                self.assertLess(time.time(), limite)
+                time.sleep(0.01)
+
+        gerenciador.iniciar()
+        try:
+            aguardar(tarefas.EXECUTANDO)
+            # Retomar logo após preemptar cancela a pausa (a tarefa não termina pausada)
+            self.assertEqual(gerenciador.preemptar(registro["id"])["status"], tarefas.PAUSANDO)
+            self.assertEqual(gerenciador.retomar(registro["id"])["status"], tarefas.EXECUTANDO)
+            time.sleep(0.2)
+            self.assertEqual(gerenciador.consultar(registro["id"])["status"], tarefas.EXECUTANDO)
+
+            gerenciador.preemptar(registro["id"])
+            aguardar(tarefas.PAUSADA)
+            self.assertIn("geracao_checkpoint", gerenciador.consultar(registro["id"]))
+            gerenciador.retomar(registro["id"])
+            aguardar(tarefas.EXECUTANDO)
+        finally:
+            gerenciador.parar()
+        self.assertEqual(gerenciador.consultar(registro["id"])["status"], tarefas.PENDENTE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import algoritmo_genetico as ag
+import cenarios
+import exportar_animacao
+import visualizacao_pygame as vis_pg
+
+
+class TestExportarAnimacao(unittest.TestCase):
+    def setUp(self):
+        self.inst = cenarios.gerar_instancia(8, semente=2)
+        ids = [int(i) for i in self.inst.ids if i != self.inst.ids[self.inst.deposito]]
+        self.rotas = ag.separar_rotas_por_capacidade(ids, self.inst, 100)
+        self.pasta = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_frames_png(self):
+        # Poucos frames, sem ffmpeg: um PNG por frame no diretório de destino
+        planos = [
+            {"rotas": self.rotas, "pontos": self.inst, "destino": os.path.join(self.pasta.name, nome)}
+            for nome in ("a", "b")
+        ]
+        resumos = exportar_animacao.exportar_planos(planos, processos=2, fps=2, duracao_max_s=2)
+        for plano, resumo in zip(planos, resumos):
+            self.assertEqual(resumo["destino"], plano["destino"])
+            self.assertEqual(resumo["frames"], 4)
+            self.assertEqual(len(os.listdir(plano["destino"])), 4)
+
+    def test_erro_no_render_nao_e_mascarado(self):
+        # O codificador falha ao fechar a entrada, mas o erro original é o que propaga
+        destino = os.path.join(self.pasta.name, "replay.mp4")
+        with mock.patch.object(vis_pg, "desenhar_veiculos", side_effect=KeyError("render")):
+            with self.assertRaises(KeyError):
+                exportar_animacao.renderizar_animacao(
+                    self.rotas, self.inst, [], destino, fps=2, duracao_max_s=1, ffmpeg="false"
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import ia_relatorios as ia
+from instancia import InstanciaVRP
+
+
+class TestFabricaModelo(unittest.TestCase):
+    def setUp(self):
+        self.pontos = [
+            {"id": 0, "nome": "Depósito", "coord": (0, 0), "tipo": "deposito", "carga": 0},
+            {"id": 1, "nome": "A", "coord": (1, 1), "tipo": "entrega", "carga": 10},
+            {"id": 2, "nome": "B", "coord": (2, 2), "tipo": "entrega", "carga": 20},
+        ]
+        self.rotas = [[0, 1, 0], [0, 2, 0]]
+
+    def tearDown(self):
+        ia.definir_fabrica_modelo(None)
+
+    def test_modelo_falso(self):
+        ia.definir_fabrica_modelo(ia.ModeloFalso(latencia_s=0, variacao_s=0))
+        analise = ia.gerar_instrucoes_llm_v2(self.rotas, self.pontos, [])
+        self.assertEqual([a["veiculo_id"] for a in analise], [1, 2])
+
+    def test_instancia_em_colunas(self):
+        prompts = []
+        modelo = ia.ModeloFalso(latencia_s=0, variacao_s=0)
+        gerar = modelo.generate_content
+        modelo.generate_content = lambda prompt: prompts.append(prompt) or gerar(prompt)
+        ia.definir_fabrica_modelo(modelo)
+
+        ia.gerar_instrucoes_llm_v2(self.rotas, InstanciaVRP.de_pontos(self.pontos), [])
+        ia.gerar_instrucoes_llm_v2(self.rotas, self.pontos, [])
+        self.assertEqual(prompts[0], prompts[1])
+        self.assertIn('"carga_total_kg": 20', prompts[0])
+
+    def test_falha_do_modelo(self):
+        modelo = ia.ModeloFalso(latencia_s=0, variacao_s=0, taxa_falha=1.0)
+        ia.definir_fabrica_modelo(modelo)
+        analise = ia.gerar_instrucoes_llm_v2(self.rotas, self.pontos, [])
+        self.assertIn("erro", analise[0])
+        self.assertEqual(modelo.falhas, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+import numpy as np
+from indice_espacial import GradeEspacial, agrupar_pontos
+
+
+class TestGradeEspacial(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.coords = rng.uniform(0, 1000, size=(5000, 2))
+        self.grade = GradeEspacial(self.coords, 15)
+
+    def test_mais_proximo_igual_forca_bruta(self):
+        rng = np.random.default_rng(1)
+        for x, y, raio in zip(*rng.uniform(0, 1000, (2, 200)), rng.uniform(1, 60, 200)):
+            dist = np.hypot(*(self.coords - (x, y)).T)
+            esperado = int(np.argmin(dist)) if dist.min() < raio else None
+            self.assertEqual(self.grade.mais_proximo(x, y, raio), esperado)
+
+    def test_no_retangulo(self):
+        idx = self.grade.no_retangulo(100, 200, 400, 350)
+        x, y = self.coords[:, 0], self.coords[:, 1]
+        esperado = np.nonzero((x >= 100) & (x <= 400) & (y >= 200) & (y <= 350))[0]
+        self.assertEqual(sorted(idx.tolist()), esperado.tolist())
+
+    def test_agrupar_preserva_total(self):
+        centroides, contagens, _ = agrupar_pontos(self.coords, 100)
+        self.assertEqual(contagens.sum(), len(self.coords))
+        self.assertLessEqual(len(centroides), 121)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import algoritmo_genetico as ag
+import cenarios
+from instancia import CRITICA, InstanciaVRP
+
+
+class TestInstancia(unittest.TestCase):
+    def test_gerador_reproduzivel(self):
+        a = cenarios.gerar_instancia(500, semente=3, distribuicao="agrupada", demanda="realista")
+        b = cenarios.gerar_instancia(500, semente=3, distribuicao="agrupada", demanda="realista")
+        self.assertTrue(np.array_equal(a.coords, b.coords))
+        self.assertTrue(np.array_equal(a.cargas, b.cargas))
+        # Depósito no centro, sem carga; entregas dentro dos limites de carga
+        self.assertEqual(a.cargas[0], 0)
+        self.assertTrue(((a.cargas[1:] >= 5) & (a.cargas[1:] <= 25)).all())
+
+    def test_salvar_e_carregar(self):
+        inst = cenarios.gerar_instancia(200, semente=1, capacidade=150)
+        with tempfile.TemporaryDirectory() as pasta:
+            for destino in (os.path.join(pasta, "cenario.npz"), os.path.join(pasta, "cenario")):
+                inst.salvar(destino)
+                lida = InstanciaVRP.carregar(destino)
+                self.assertTrue(np.array_equal(lida.coords, inst.coords))
+                self.assertTrue(np.array_equal(lida.prioridades, inst.prioridades))
+                self.assertEqual(lida.capacidade, 150)
+                self.assertEqual(lida.nomes, inst.nomes)
+                del lida  # Libera o mapeamento antes de apagar a pasta
+
+    def test_conversao_pontos(self):
+        pontos = [
+            {"id": 0, "nome": "Hub", "coord": (0, 0), "tipo": "deposito", "carga": 0},
+            {"id": 7, "nome": "A", "coord": (1, 2), "tipo": "entrega", "carga": 9, "prioridade": "critica"},
+        ]
+        inst = InstanciaVRP.de_pontos(pontos)
+        self.assertEqual(inst.prioridades[1], CRITICA)
+        self.assertEqual(inst.posicao(7), 1)
+        self.assertEqual(inst.para_pontos()[1]["nome"], "A")
+        self.assertEqual(inst.para_pontos()[1]["prioridade"], "crítica")
+
+    def test_ids_desconhecidos(self):
+        # IDs fora da instância não podem cair em outro local (inserção/índice negativo)
+        esparsa = InstanciaVRP.de_pontos(
+            [{"id": i, "coord": (i, 0), "carga": 1} for i in (0, 5, 9)]
+        )
+        self.assertEqual(esparsa.posicoes([9, 0, 5]).tolist(), [2, 0, 1])
+        sequencial = cenarios.gerar_instancia(5, semente=0)
+        for inst, ids in ((esparsa, [5, 7]), (esparsa, [10]), (sequencial, [1, -1]), (sequencial, [6])):
+            with self.assertRaises(KeyError):
+                inst.posicoes(ids)
+        with self.assertRaises(KeyError):
+            ag.separar_rotas_por_capacidade([5, 7], esparsa, 10)
+
+    def test_ga_aceita_instancia(self):
+        # IDs fora de ordem: o solver precisa mapear ID -> posição nas colunas
+        pontos = [
+            {"id": 0, "nome": "Hub", "coord": (0, 0), "tipo": "deposito", "carga": 0},
+            {"id": 42, "nome": "A", "coord": (0.01, 0.02), "tipo": "entrega", "carga": 30},
+            {"id": 5, "nome": "B", "coord": (0.03, 0.01), "tipo": "entrega", "carga": 40, "prioridade": "crítica"},
+            {"id": 17, "nome": "C", "coord": (-0.02, 0.01), "tipo": "entrega", "carga": 50},
+        ]
+        inst = InstanciaVRP.de_pontos(pontos)
+        cromossomo = [5, 17, 42]
+        self.assertAlmostEqual(
+            ag.funcao_fitness_vrp(cromossomo, inst, 80),
+            ag.funcao_fitness_vrp(cromossomo, pontos, 80),
+        )
+        self.assertEqual(
+            ag.separar_rotas_por_capacidade(cromossomo, inst, 80),
+            ag.separar_rotas_por_capacidade(cromossomo, pontos, 80),
+        )
+
+        rotas, _ = ag.executar_ga(inst, 80, geracoes=5, tam_populacao=6, verbose=False, semente=1)
+        visitados = sorted(pid for rota in rotas for pid in rota if pid != 0)
+        self.assertEqual(visitados, [5, 17, 42])
+
+
+    def test_deposito_sem_id_zero(self):
+        # Depósito escolhido pelo tipo: a entrega de ID 0 entra nas rotas e o depósito não
+        pontos = [
+            {"id": 0, "nome": "A", "coord": (0.01, 0.02), "tipo": "entrega", "carga": 30},
+            {"id": 3, "nome": "Hub", "coord": (0, 0), "tipo": "deposito"},
+            {"id": 8, "nome": "B", "coord": (0.03, 0.01), "tipo": "entrega", "carga": 40},
+        ]
+        rotas, _ = ag.executar_ga(pontos, 100, geracoes=5, tam_populacao=6, verbose=False, semente=0)
+        self.assertTrue(all(r[0] == r[-1] == 3 for r in rotas))
+        self.assertEqual(sorted(i for r in rotas for i in r[1:-1]), [0, 8])
+
+
+if __name__ == "__main__":
+    unittest.main()
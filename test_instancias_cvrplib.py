@@ -0,0 +1,34 @@
+import os
+import unittest
+import instancias_cvrplib as cvrplib
+
+
+class TestInstanciasCVRPLIB(unittest.TestCase):
+    def setUp(self):
+        caminho = os.path.join(cvrplib.DIR_INSTANCIAS, "A-n32-k5.vrp")
+        self.instancia = cvrplib.ler_vrp(caminho)
+        self.pontos = cvrplib.para_pontos(self.instancia)
+
+    def test_leitura(self):
+        # 31 clientes + depósito (ID 0), capacidade 100
+        self.assertEqual(self.instancia["capacidade"], 100)
+        self.assertEqual(len(self.pontos), 32)
+        self.assertEqual(self.pontos[0]["tipo"], "deposito")
+        self.assertEqual(sum(p["carga"] for p in self.pontos), 410)
+
+    def test_custo_solucao_otima(self):
+        # Solução ótima publicada (nós do arquivo - 1 = IDs do projeto, depósito = 0)
+        rotas = [
+            [21, 31, 19, 17, 13, 7, 26],
+            [12, 1, 16, 30],
+            [27, 24],
+            [29, 18, 8, 9, 22, 15, 10, 25, 5, 20],
+            [14, 28, 11, 4, 23, 3, 2, 6],
+        ]
+        rotas = [[0] + r + [0] for r in rotas]
+        self.assertEqual(cvrplib.custo_cvrplib(rotas, self.pontos), 784)
+        self.assertEqual(cvrplib.carregar_bks()["A-n32-k5"]["bks"], 784)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import random
+import tempfile
+import unittest
+import numpy as np
+import algoritmo_genetico as ag
+import alns
+import cenarios
+import janelas
+from instancia import InstanciaVRP
+
+
+def atraso_total(rotas, inst):
+    return sum(janelas.atraso_rota(inst, inst.posicoes(r)) for r in rotas)
+
+
+class TestJanelas(unittest.TestCase):
+    def setUp(self):
+        self.inst = cenarios.gerar_instancia(60, semente=3, largura_janela=60, tempo_servico=5)
+
+    def test_segmentos_igual_a_simulacao(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            entregas = rng.sample(range(1, len(self.inst)), rng.randint(1, 12))
+            rota = [0] + entregas + [0]
+            pos = self.inst.posicoes(rota)
+            resumo = janelas.segmento(
+                self.inst.janelas_inicio[0], self.inst.janelas_fim[0], 0.0
+            )
+            for a, b in zip(pos, pos[1:]):
+                viagem = np.hypot(*(self.inst.coords[b] - self.inst.coords[a]))
+                servico = 0.0 if b == 0 else self.inst.tempos_servico[b]
+                resumo = janelas.concatenar(
+                    resumo,
+                    janelas.segmento(self.inst.janelas_inicio[b], self.inst.janelas_fim[b], servico),
+                    viagem * self.inst.tempo_por_distancia,
+                )
+            self.assertAlmostEqual(resumo[1], janelas.atraso_rota(self.inst, pos))
+
+    def test_divisao_e_2opt_respeitam_janelas(self):
+        rng = random.Random(1)
+        ids = list(range(1, len(self.inst)))
+        rng.shuffle(ids)
+        rotas = ag.separar_rotas_por_capacidade(ids, self.inst, 150)
+        self.assertEqual(atraso_total(rotas, self.inst), 0.0)
+        self.assertEqual(sorted(i for r in rotas for i in r[1:-1]), sorted(ids))
+
+        # 2-opt só por distância pode quebrar janelas; com janelas, nunca
+        for rota in rotas:
+            nova = ag.aplicar_2opt(rota, self.inst)
+            self.assertEqual(sorted(nova), sorted(rota))
+            self.assertEqual(janelas.atraso_rota(self.inst, self.inst.posicoes(nova)), 0.0)
+
+    def test_solvers_sem_atraso(self):
+        rotas, _ = ag.executar_ga(self.inst, 150, geracoes=20, verbose=False, semente=0)
+        self.assertEqual(atraso_total(rotas, self.inst), 0.0)
+        rotas, _ = alns.executar_alns(self.inst, 150, iteracoes=200, semente=0, verbose=False)
+        self.assertEqual(atraso_total(rotas, self.inst), 0.0)
+
+    def test_divisao_abre_rota_por_horario(self):
+        pontos = [
+            {"id": 0, "coord": (0, 0), "tipo": "deposito", "janela_fim": 480},
+            {"id": 1, "coord": (0.01, 0), "carga": 10, "janela_inicio": 0, "janela_fim": 2},
+            {"id": 2, "coord": (0.02, 0), "carga": 10},
+        ]
+        inst = InstanciaVRP.de_pontos(pontos)
+        sem_janelas = InstanciaVRP.de_pontos(
+            [{k: v for k, v in p.items() if not k.startswith("janela")} for p in pontos]
+        )
+        # ~1,67 min de ida: a entrega 1 chega a tempo, mas não depois da entrega 2
+        self.assertEqual(ag.separar_rotas_por_capacidade([2, 1], inst, 100), [[0, 2, 0], [0, 1, 0]])
+        self.assertEqual(ag.separar_rotas_por_capacidade([1, 2], inst, 100), [[0, 1, 2, 0]])
+        self.assertAlmostEqual(
+            ag.funcao_fitness_vrp([1, 2], inst, 100),
+            ag.funcao_fitness_vrp([1, 2], sem_janelas, 100),
+        )
+        # Inalcançável mesmo sozinha: o horário volta ao fim da janela e o atraso é penalizado
+        inst.janelas_fim[1] = 1.0
+        self.assertEqual(ag.separar_rotas_por_capacidade([1, 2], inst, 100), [[0, 1, 2, 0]])
+        atraso = 0.01 * janelas.TEMPO_POR_GRAU - 1.0
+        self.assertAlmostEqual(
+            ag.funcao_fitness_vrp([1, 2], inst, 100),
+            ag.funcao_fitness_vrp([1, 2], sem_janelas, 100) + janelas.penalidade(inst, atraso),
+        )
+
+    def test_conversoes_e_arquivos(self):
+        pontos = self.inst.para_pontos()
+        self.assertEqual(pontos[0]["janela_fim"], 480.0)
+        self.assertEqual(pontos[1]["tempo_servico"], 5.0)
+        volta = InstanciaVRP.de_pontos(pontos)
+        self.assertTrue(np.array_equal(volta.janelas_fim, self.inst.janelas_fim))
+        with tempfile.TemporaryDirectory() as pasta:
+            for destino in (os.path.join(pasta, "vrptw.npz"), os.path.join(pasta, "vrptw")):
+                self.inst.salvar(destino)
+                lida = InstanciaVRP.carregar(destino)
+                self.assertTrue(lida.tem_janelas)
+                self.assertTrue(np.array_equal(lida.tempos_servico, self.inst.tempos_servico))
+                del lida
+            # Sem janelas, o diretório regravado não herda as colunas de tempo
+            cenarios.gerar_instancia(60, semente=3).salvar(os.path.join(pasta, "vrptw"))
+            self.assertFalse(InstanciaVRP.carregar(os.path.join(pasta, "vrptw")).tem_janelas)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import unittest
+import main
+
+
+class TestModoLote(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.quebrado = os.path.join(self.pasta.name, "quebrado.json")
+        with open(self.quebrado, "w", encoding="utf-8") as f:
+            f.write("{ nao e json")
+        self.arquivos = [os.path.join("instancias", "P-n16-k8.vrp"), self.quebrado]
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def executar(self, processos):
+        saida = os.path.join(self.pasta.name, f"resultados_{processos}.jsonl")
+        codigo = main.main(
+            ["lote", *self.arquivos, "-j", str(processos), "--sem-llm",
+             "--semente", "7", "--geracoes", "15", "-o", saida]
+        )
+        with open(saida, "r", encoding="utf-8") as f:
+            registros = [json.loads(linha) for linha in f]
+        return codigo, {r["indice"]: r for r in registros}
+
+    def test_lote_grava_um_registro_por_arquivo(self):
+        codigo, registros = self.executar(processos=2)
+        # Um arquivo falhou: código de saída 1, mas o lote inteiro é gravado
+        self.assertEqual(codigo, 1)
+        self.assertEqual(sorted(registros), [0, 1])
+
+        ok = registros[0]
+        self.assertEqual(ok["status"], "ok")
+        self.assertEqual(ok["arquivo"], self.arquivos[0])
+        self.assertEqual(ok["semente"], 7)
+        self.assertEqual(ok["qtd_pontos"], 16)
+        # Cada rota sai do depósito (id 0) e volta a ele
+        self.assertTrue(all(rota[0] == rota[-1] == 0 for rota in ok["rotas"]))
+        visitados = sorted(i for rota in ok["rotas"] for i in rota[1:-1])
+        self.assertEqual(visitados, list(range(1, 16)))
+        self.assertEqual(ok["custo_final"], ok["historico_convergencia"][-1])
+        self.assertEqual(ok["tempos"]["ga_s"], ok["tempos"]["otimizacao_s"])
+        self.assertNotIn("analise_inteligente", ok)
+
+        erro = registros[1]
+        self.assertEqual(erro["status"], "erro")
+        self.assertEqual(erro["semente"], 8)
+        self.assertTrue(erro["erro"])
+        self.assertEqual(list(erro["tempos"]), ["total_s"])
+
+    def test_pool_reproduz_execucao_sequencial(self):
+        # Cada arquivo recebe sua própria semente: o número de processos não muda o resultado
+        _, paralelo = self.executar(processos=2)
+        _, sequencial = self.executar(processos=1)
+        self.assertEqual(paralelo[0]["rotas"], sequencial[0]["rotas"])
+        self.assertEqual(
+            paralelo[0]["historico_convergencia"], sequencial[0]["historico_convergencia"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import tempfile
+import unittest
+import algoritmo_genetico as ag
+from instancia import InstanciaVRP
+import metricas
+import tarefas
+
+
+class TestMetricas(unittest.TestCase):
+    def tearDown(self):
+        metricas.habilitar(False)
+
+    def test_exportacao_histograma(self):
+        registro = metricas.Registro()
+        h = registro.histograma("teste_segundos", "Teste.", rotulos=("fase",), buckets=(0.1, 1))
+        h.observar(0.05, "a")
+        h.observar(0.5, "a")
+        h.observar(5, "a")
+        texto = registro.exportar()
+        self.assertIn("# TYPE teste_segundos histogram", texto)
+        self.assertIn('teste_segundos_bucket{fase="a",le="0.1"} 1', texto)
+        self.assertIn('teste_segundos_bucket{fase="a",le="1"} 2', texto)
+        self.assertIn('teste_segundos_bucket{fase="a",le="+Inf"} 3', texto)
+        self.assertIn('teste_segundos_count{fase="a"} 3', texto)
+
+    def test_instrumentacao_do_ga(self):
+        pontos = [{"id": 0, "coord": (0, 0), "tipo": "deposito", "carga": 0}] + [
+            {"id": i, "coord": (i, i % 3), "tipo": "entrega", "carga": 10} for i in range(1, 8)
+        ]
+        avaliacoes = metricas.AVALIACOES_FITNESS.valor()
+        ag.executar_ga(pontos, 30, geracoes=3, tam_populacao=10, verbose=False, semente=1)
+        # Desligada, a instrumentação não registra nada
+        self.assertEqual(metricas.AVALIACOES_FITNESS.valor(), avaliacoes)
+
+        metricas.habilitar()
+        fases = metricas.FASES.contagem("avaliacao")
+        ag.executar_ga(pontos, 30, geracoes=3, tam_populacao=10, verbose=False, semente=1)
+        self.assertEqual(metricas.FASES.contagem("avaliacao"), fases + 3)
+        self.assertGreater(metricas.AVALIACOES_FITNESS.valor(), avaliacoes)
+        # Os competidores do torneio já foram avaliados na geração
+        self.assertGreater(metricas.ACERTOS_CACHE_FITNESS.valor(), 0)
+
+
+    def test_tarefas_por_estado(self):
+        pontos = [{"id": 0, "coord": (0, 0), "tipo": "deposito", "carga": 0}] + [
+            {"id": i, "coord": (i, 1), "tipo": "entrega", "carga": 10} for i in range(1, 4)
+        ]
+        instancia = InstanciaVRP.de_pontos(pontos)
+        with tempfile.TemporaryDirectory() as pasta:
+            # Sem `iniciar`: as tarefas ficam na fila, sem trabalhador
+            gerenciador = tarefas.GerenciadorTarefas(pasta=pasta)
+            primeira = gerenciador.criar(instancia, 100)
+            gerenciador.criar(instancia, 100)
+            gerenciador.preemptar(primeira["id"])
+            gerenciador.publicar_metricas()
+        self.assertEqual(metricas.TAREFAS.valor("pendente"), 1)
+        self.assertEqual(metricas.TAREFAS.valor("pausada"), 1)
+        self.assertEqual(metricas.TAREFAS.valor("executando"), 0)
+        self.assertIn('vrp_tarefas{status="pendente"} 1', metricas.REGISTRO.exportar())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import tempfile
+import unittest
+import perfilamento
+
+
+class TestPerfilamento(unittest.TestCase):
+    def test_perfilar_retorna_resultado_e_artefato(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            resultado, resumo = perfilamento.perfilar(sorted, [3, 1, 2], pasta=pasta)
+            self.assertEqual(resultado, [1, 2, 3])
+            self.assertTrue(resumo["funcoes"])
+            self.assertIsNotNone(perfilamento.caminho_artefato(resumo["id"], pasta))
+        self.assertIsNone(perfilamento.caminho_artefato("../config"))
+
+    def test_controle_token_e_intervalo(self):
+        controle = perfilamento.ControlePerfil(token="segredo", intervalo_s=60)
+        self.assertFalse(controle.autorizado("errado"))
+        self.assertTrue(controle.autorizado("segredo"))
+        self.assertFalse(perfilamento.ControlePerfil(token=None).autorizado(""))
+
+        self.assertTrue(controle.reservar())
+        self.assertFalse(controle.reservar())  # Perfil em andamento
+        controle.liberar()
+        self.assertFalse(controle.reservar())  # Intervalo mínimo
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from simulacao_frota import FATOR_VELOCIDADE_MINIMO, KM_POR_GRAU, SimuladorFrota
+
+
+class TestSimuladorFrota(unittest.TestCase):
+    def setUp(self):
+        # Trechos de 0.1 grau (~11 km) em linha reta
+        self.pontos = [
+            {"id": 0, "coord": (0.0, 0.0), "tipo": "deposito", "carga": 0},
+            {"id": 1, "coord": (0.0, 0.1), "tipo": "entrega", "carga": 10},
+            {"id": 2, "coord": (0.0, 0.2), "tipo": "entrega", "carga": 10},
+        ]
+
+    def test_chegadas_independem_do_passo(self):
+        # Sem trânsito, o instante de chegada não deve depender de dt
+        rotas = [[0, 1, 2, 0]]
+        fino = SimuladorFrota(rotas, self.pontos, velocidade_kmh=40, dt=1).executar()
+        grosso = SimuladorFrota(rotas, self.pontos, velocidade_kmh=40, dt=500).executar()
+
+        esperado = 0.1 * KM_POR_GRAU / 40 * 3600
+        self.assertAlmostEqual(fino[0]["chegada_s"], esperado, places=6)
+        for a, b in zip(fino, grosso):
+            self.assertAlmostEqual(a["chegada_s"], b["chegada_s"], places=6)
+            self.assertAlmostEqual(b["velocidade_media_kmh"], 40, places=6)
+
+    def test_zona_de_transito_reduz_velocidade(self):
+        zonas = [{"nome": "Centro", "coord": (0.0, 0.0), "raio_km": 1.0, "intensidade": 0.5}]
+        sim = SimuladorFrota([[0, 1, 0]], self.pontos, zonas, velocidade_kmh=40, dt=10)
+        self.assertTrue(sim.no_transito[0])
+
+        resultados = sim.executar()
+        self.assertTrue(sim.concluido.all())
+        self.assertAlmostEqual(resultados[0]["velocidade_media_kmh"], 20, delta=0.5)
+
+    def test_zona_bloqueada_nao_trava_a_simulacao(self):
+        # Intensidade >= 1 pararia o veículo: a velocidade fica no piso e ele chega
+        for intensidade in (1.0, 1.5):
+            zonas = [{"coord": (0.0, 0.0), "raio_km": 1.0, "intensidade": intensidade}]
+            sim = SimuladorFrota([[0, 1, 0]], self.pontos, zonas, velocidade_kmh=40, dt=10)
+            resultados = sim.executar()
+            self.assertTrue(sim.concluido.all())
+            self.assertTrue(all(r["chegada_s"] > 0 for r in resultados))
+            self.assertAlmostEqual(
+                resultados[0]["velocidade_media_kmh"], 40 * FATOR_VELOCIDADE_MINIMO, delta=0.5
+            )
+
+    def test_substituir_rota_preserva_trecho_percorrido(self):
+        sim = SimuladorFrota([[0, 1, 0]], self.pontos, velocidade_kmh=40, dt=60)
+        sim.passo()  # Em andamento na primeira perna (0 -> 1)
+
+        with self.assertRaises(ValueError):
+            sim.substituir_rota(0, [0, 2, 1, 0])
+
+        sim.substituir_rota(0, [0, 1, 2, 0])
+        resultados = sim.executar()
+        self.assertEqual([r["id_ponto"] for r in resultados], [1, 2, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import algoritmo_genetico as ag
+import cenarios
+import visualizacao_pygame as vis_pg
+
+
+class TestVisualizacaoPygame(unittest.TestCase):
+    FRAMES = 40
+
+    def setUp(self):
+        self.inst = cenarios.gerar_instancia(8, semente=2)
+        ids = [int(i) for i in self.inst.ids if i != self.inst.ids[self.inst.deposito]]
+        self.rotas = ag.separar_rotas_por_capacidade(ids, self.inst, 100)
+
+    def executar(self):
+        # Relógio determinístico: muda a cada 10 frames, independente do tempo real
+        relogios = [f"08:{i // 10:02d}" for i in range(self.FRAMES)]
+        paineis = []
+
+        def registrar_painel(superficie, veiculos, status, tempo_str, fontes, cache_texto):
+            paineis.append((tempo_str, tuple(txt for txt, _ in status)))
+
+        saida = io.StringIO()
+        with mock.patch.object(vis_pg, "relogio_simulado", side_effect=relogios), \
+                mock.patch.object(vis_pg, "desenhar_painel", side_effect=registrar_painel), \
+                mock.patch.object(
+                    vis_pg, "desenhar_camada_estatica", wraps=vis_pg.desenhar_camada_estatica
+                ) as estatica, \
+                mock.patch.object(
+                    vis_pg, "relatorio_frames", wraps=vis_pg.relatorio_frames
+                ) as relatorio_frames, \
+                contextlib.redirect_stdout(saida):
+            relatorio = vis_pg.visualizar_rotas_pygame(
+                self.rotas, self.inst, medir_frames=self.FRAMES
+            )
+        return relogios, paineis, estatica, relatorio_frames, relatorio, saida.getvalue()
+
+    def test_fundo_em_cache(self):
+        relogios, paineis, estatica, _, _, _ = self.executar()
+        # Sem zoom, pan ou reroteamento, o mapa estático é desenhado uma única vez
+        self.assertEqual(estatica.call_count, 1)
+        # O painel só é refeito quando o relógio ou algum status muda...
+        self.assertLess(len(paineis), self.FRAMES)
+        for anterior, atual in zip(paineis, paineis[1:]):
+            self.assertNotEqual(anterior, atual)
+        # ...e toda mudança do relógio chega ao painel
+        self.assertEqual(
+            list(dict.fromkeys(t for t, _ in paineis)), list(dict.fromkeys(relogios))
+        )
+
+    def test_medir_frames_reporta_percentis(self):
+        _, _, _, relatorio_frames, relatorio, saida = self.executar()
+        tempos = sorted(relatorio_frames.call_args.args[0])
+        self.assertEqual(len(tempos), self.FRAMES)
+        self.assertEqual(relatorio["frames"], self.FRAMES)
+        self.assertEqual(relatorio["p50_ms"], tempos[self.FRAMES // 2] * 1000)
+        self.assertEqual(relatorio["p99_ms"], tempos[int(0.99 * self.FRAMES)] * 1000)
+        self.assertEqual(relatorio["max_ms"], tempos[-1] * 1000)
+        self.assertLessEqual(relatorio["p50_ms"], relatorio["p99_ms"])
+        self.assertIn(f"p50: {relatorio['p50_ms']:.2f} ms", saida)
+        self.assertIn(f"p99: {relatorio['p99_ms']:.2f} ms", saida)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+import argparse
+import contextlib
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ia_relatorios import ModeloFalso
+from main import carregar_configuracoes, gerar_cenario
+
+ENDPOINTS_PADRAO = ["/otimizar", "/solucao-completa"]
+CONCORRENCIA_PADRAO = [1, 2, 4, 8]
+
+
+# --- GERADOR DE REQUISIÇÕES ---
+def gerar_requisicoes(qtd, qtd_pontos=30, geracoes=20, semente=0, config=None):
+    """
+    Gera corpos de requisição com cenários aleatórios (mesmo gerador do modo interativo).
+
+    Returns:
+        list: Dicionários no formato de `ConfigOtimizacao` da API.
+    """
+    config = dict(config or carregar_configuracoes())
+    config["qtd_pontos"] = qtd_pontos
+
+    requisicoes = []
+    for i in range(qtd):
+        pontos = gerar_cenario(config, semente + i).para_pontos()
+        requisicoes.append(
+            {
+                "pontos": [dict(p, coord=list(p["coord"])) for p in pontos],
+                "capacidade_veiculo": config["capacidade_veiculo"],
+                "geracoes": geracoes,
+                "zonas_transito": config.get("zonas_transito", []),
+            }
+        )
+    return requisicoes
+
+
+# --- SERVIDOR EM PROCESSO ---
+@contextlib.contextmanager
+def servidor_local(modelo=None, porta=None):
+    """
+    Sobe a API em uma thread deste processo (uvicorn) e, se informado, instala
+    o `modelo` falso no lugar do Gemini. Gera a URL base do servidor.
+
+    A fila de tarefas longas usa um diretório temporário (e não o TAREFAS_DIR
+    da API), para o teste não criar nem retomar tarefas na pasta atual.
+    """
+    import uvicorn
+    import api_main
+    import ia_relatorios as ia
+    import tarefas
+
+    if porta is None:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            porta = s.getsockname()[1]
+
+    pasta_tarefas = tempfile.TemporaryDirectory()
+    gerenciador_original = api_main.GERENCIADOR_TAREFAS
+    api_main.GERENCIADOR_TAREFAS = tarefas.GerenciadorTarefas(pasta=pasta_tarefas.name)
+
+    if modelo is not None:
+        ia.definir_fabrica_modelo(modelo)
+
+    servidor = uvicorn.Server(
+        uvicorn.Config(api_main.app, host="127.0.0.1", port=porta, log_level="warning")
+    )
+    thread = threading.Thread(target=servidor.run, daemon=True)
+    thread.start()
+    try:
+        while not servidor.started:
+            if not thread.is_alive():
+                raise RuntimeError(f"Falha ao iniciar o servidor na porta {porta}.")
+            time.sleep(0.05)
+        yield f"http://127.0.0.1:{porta}"
+    finally:
+        servidor.should_exit = True
+        thread.join(timeout=10)
+        ia.definir_fabrica_modelo(None)
+        api_main.GERENCIADOR_TAREFAS = gerenciador_original
+        pasta_tarefas.cleanup()
+
+
+# --- EXECUÇÃO DA CARGA ---
+def enviar(url, corpo, timeout=300):
+    """
+    Envia um POST JSON e mede a latência.
+
+    Returns:
+        tuple: (latência em segundos, status HTTP ou None em erro de conexão)
+    """
+    dados = json.dumps(corpo).encode("utf-8")
+    req = urllib.request.Request(url, data=dados, headers={"Content-Type": "application/json"})
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resposta:
+            resposta.read()
+            status = resposta.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return time.perf_counter() - inicio, status
+
+
+def executar_nivel(url, requisicoes, concorrencia, qtd):
+    """
+    Envia `qtd` requisições com `concorrencia` clientes simultâneos.
+
+    Returns:
+        dict: Vazão (req/s), percentis de latência (ms) e contagem de erros.
+    """
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        resultados = list(
+            executor.map(lambda i: enviar(url, requisicoes[i % len(requisicoes)]), range(qtd))
+        )
+    duracao = time.perf_counter() - inicio
+
+    latencias = np.array([lat for lat, _ in resultados]) * 1000
+    erros = sum(1 for _, status in resultados if status != 200)
+    return {
+        "concorrencia": concorrencia,
+        "requisicoes": qtd,
+        "erros": erros,
+        "duracao_s": duracao,
+        "vazao_rps": qtd / duracao,
+        "p50_ms": float(np.percentile(latencias, 50)),
+        "p90_ms": float(np.percentile(latencias, 90)),
+        "p99_ms": float(np.percentile(latencias, 99)),
+        "max_ms": float(latencias.max()),
+    }
+
+
+def executar_teste_carga(
+    url_base,
+    endpoints=ENDPOINTS_PADRAO,
+    niveis=CONCORRENCIA_PADRAO,
+    requisicoes_por_nivel=None,
+    requisicoes=None,
+):
+    """
+    Mede cada endpoint com concorrência crescente.
+
+    Args:
+        url_base (str): URL do servidor (ex: http://127.0.0.1:8000).
+        requisicoes_por_nivel (int): Requisições por nível (padrão: 4x a concorrência).
+        requisicoes (list): Corpos de requisição (padrão: `gerar_requisicoes(10)`).
+
+    Returns:
+        list: Um registro por endpoint e nível (ver `executar_nivel`).
+    """
+    requisicoes = requisicoes or gerar_requisicoes(10)
+    relatorio = []
+    for endpoint in endpoints:
+        enviar(url_base + endpoint, requisicoes[0])  # Aquecimento
+        for concorrencia in niveis:
+            qtd = requisicoes_por_nivel or 4 * concorrencia
+            r = executar_nivel(url_base + endpoint, requisicoes, concorrencia, qtd)
+            r["endpoint"] = endpoint
+            relatorio.append(r)
+            print(
+                f"[CARGA] {endpoint:<18} c={concorrencia:<3} {r['vazao_rps']:7.2f} req/s "
+                f"p50 {r['p50_ms']:8.1f} ms  p90 {r['p90_ms']:8.1f} ms  "
+                f"p99 {r['p99_ms']:8.1f} ms  erros {r['erros']}",
+                file=sys.stderr,
+            )
+    return relatorio
+
+
+def main(argv=None):
+    """
+    Linha de comando, ex:
+
+        python teste_carga.py --concorrencia 1 2 4 8 16 --latencia-llm 1.5 --taxa-falha 0.05
+    """
+    parser = argparse.ArgumentParser(
+        description="Teste de carga da API com um substituto local do Gemini."
+    )
+    parser.add_argument("--url", default=None, help="Servidor externo (padrão: sobe a API localmente).")
+    parser.add_argument("--endpoints", nargs="+", default=ENDPOINTS_PADRAO)
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=CONCORRENCIA_PADRAO)
+    parser.add_argument("--requisicoes", type=int, default=None, help="Requisições por nível.")
+    parser.add_argument("--pontos", type=int, default=30, help="Locais por cenário.")
+    parser.add_argument("--geracoes", type=int, default=20)
+    parser.add_argument("--latencia-llm", type=float, default=1.0, help="Latência do modelo falso (s).")
+    parser.add_argument("--variacao-llm", type=float, default=0.2)
+    parser.add_argument("--taxa-falha", type=float, default=0.0, help="Falhas do modelo falso (0 a 1).")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("-o", "--saida", default=None, help="Relatório JSON.")
+    args = parser.parse_args(argv)
+
+    requisicoes = gerar_requisicoes(10, args.pontos, args.geracoes, args.semente)
+    modelo = ModeloFalso(args.latencia_llm, args.variacao_llm, args.taxa_falha, args.semente)
+
+    # Os logs por geração do GA iriam para o stdout a cada requisição
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        if args.url:
+            resultados = executar_teste_carga(
+                args.url, args.endpoints, args.concorrencia, args.requisicoes, requisicoes
+            )
+        else:
+            with servidor_local(modelo) as url:
+                resultados = executar_teste_carga(
+                    url, args.endpoints, args.concorrencia, args.requisicoes, requisicoes
+                )
+
+    relatorio = {
+        "parametros": {
+            **{k: v for k, v in vars(args).items() if k != "saida"},
+            "chamadas_llm": modelo.chamadas,
+            "falhas_llm": modelo.falhas,
+        },
+        "resultados": resultados,
+    }
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())